@@ -0,0 +1,125 @@
+"""
+Connection profile benchmark - dashboard reads under each connection profile
+
+Builds a database from the corpus, then replays the dashboard's database
+reads (get_aggregated_visa_class_data for every category/country/action
+combination) through the default connection under each profile from
+django_config/sqlite_profiles.py:
+
+- per-request: the connection is closed after every page, as Django does
+  with CONN_MAX_AGE=0, so each page pays connect + PRAGMAs + cold page cache
+- persistent: one connection for the whole run
+
+Each is timed for the full page aggregation and for the series query alone
+(rows fetched, no aggregation), which isolates what the PRAGMAs can change.
+
+Profiles alternate round by round so all see the same OS page cache. The
+replica profile reads the in-memory copy, so its "per-request" connect is
+an attach to memory rather than a file open.
+
+Usage:
+    python -m benchmarks.bench_db_profiles [--rounds N]
+"""
+
+import os
+
+# Setup Django early (migrations and dashboard reads need it)
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'django_config.settings')
+import django
+django.setup()
+
+import argparse
+import itertools
+import statistics
+import tempfile
+import time
+from datetime import date
+from pathlib import Path
+
+from django.db import connections
+
+from benchmarks.corpus import load_corpus
+from benchmarks.database import create_corpus_database
+from benchmarks.timing import percentile
+from django_config.sqlite_profiles import READER, REPLICA, WRITER, sqlite_database
+from extractors.bulletin_extractor import parse_bulletin
+from lib.dashboard_service import get_aggregated_visa_class_data
+from lib.series_repository import series_rows
+from models.enums.action_type import ActionType
+from models.enums.country import Country
+from models.enums.visa_category import VisaCategory
+
+SUBMISSION_DATE = date(2015, 6, 1)
+PROFILES = (WRITER, READER, REPLICA)
+COMBOS = list(itertools.product(VisaCategory.values, Country.values, ActionType.values))
+
+
+def use_profile(db_path: Path, profile: str) -> None:
+    """Point the default connection at db_path with the given profile"""
+    connections['default'].close()
+    # The replica profile switches ENGINE, so build a fresh wrapper
+    del connections['default']
+    connections.settings['default'].update(sqlite_database(db_path, profile))
+
+
+def read_page(combo) -> None:
+    get_aggregated_visa_class_data(*combo, SUBMISSION_DATE)
+
+
+def read_series(combo) -> None:
+    list(series_rows(*combo))
+
+
+def run_round(read, per_request: bool) -> list[float]:
+    """Seconds per read for one pass over every combination"""
+    connection = connections['default']
+    latencies = []
+    for combo in COMBOS:
+        started = time.perf_counter()
+        read(combo)
+        if per_request:
+            connection.close()
+        latencies.append(time.perf_counter() - started)
+    connection.close()
+    return latencies
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--rounds', type=int, default=5, help='Passes over all pages per profile')
+    args = parser.parse_args()
+
+    parsed_bulletins = [parse_bulletin(page) for page in load_corpus()]
+    modes = [
+        ('page', 'per-request', read_page, True),
+        ('page', 'persistent', read_page, False),
+        ('query', 'per-request', read_series, True),
+        ('query', 'persistent', read_series, False),
+    ]
+    samples = {(read_name, mode, profile): [] for read_name, mode, _, _ in modes for profile in PROFILES}
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = Path(tmp_dir) / 'visa_bulletin.db'
+        create_corpus_database(db_path, parsed_bulletins)
+
+        for profile in PROFILES:  # Warm-up
+            use_profile(db_path, profile)
+            run_round(read_page, per_request=False)
+        for _ in range(args.rounds):
+            for read_name, mode, read, per_request in modes:
+                for profile in PROFILES:
+                    use_profile(db_path, profile)
+                    samples[(read_name, mode, profile)].extend(run_round(read, per_request))
+        connections['default'].close()
+
+    print(f"{len(COMBOS)} dashboard pages x {args.rounds} rounds per profile")
+    print(f"  {'read':<6} {'connection':<12} {'profile':<8} {'mean ms':>8} {'p50 ms':>8} {'p99 ms':>8}")
+    for (read_name, mode, profile), latencies in samples.items():
+        latencies.sort()
+        print(f"  {read_name:<6} {mode:<12} {profile:<8} {statistics.mean(latencies) * 1000:>8.2f} "
+              f"{percentile(latencies, 50) * 1000:>8.2f} {percentile(latencies, 99) * 1000:>8.2f}")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
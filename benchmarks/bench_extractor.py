@@ -0,0 +1,145 @@
+"""
+Extractor micro-benchmark - per-cell vs per-table country resolution
+
+Parses every saved bulletin once, then times BulletinExtractor over all
+tables in two modes:
+
+- per-cell: the previous behaviour, resolving Country.from_header inside
+  the row loop with an uncompiled, unmemoized pattern scan
+- per-table: the current column plan (resolve_country_columns), cold and warm
+
+Both modes must produce identical rows; the benchmark aborts otherwise.
+
+Usage:
+    python -m benchmarks.bench_extractor [--repeat N]
+"""
+
+import argparse
+import re
+import time
+
+from benchmarks.corpus import load_corpus
+from extractors.bulletin_extractor import BulletinExtractor, resolve_country_columns
+from lib.bulletin_parser import extract_tables
+from lib.visa_class_utils import canonical_visa_class
+from models.enums.action_type import ActionType
+from models.enums.country import Country, _country_from_header
+from models.enums.visa_category import VisaCategory
+
+
+def legacy_country_from_header(header: str):
+    """Country.from_header as it was before memoization (reference only)"""
+    normalized = re.sub(r'[\s\xa0\n]+', ' ', header).strip().upper()
+    patterns = [
+        (r'CHINA.*MAINLAND', Country.CHINA),
+        (r'^INDIA$', Country.INDIA),
+        (r'^MEXICO$', Country.MEXICO),
+        (r'^PHILIPPINES$', Country.PHILIPPINES),
+        (r'EL SALVADOR.*GUATEMALA.*HONDURAS', Country.EL_SALVADOR_GUATEMALA_HONDURAS),
+        (r'ALL.*CHARGEABILITY.*EXCEPT', Country.ALL),
+    ]
+    for pattern, country in patterns:
+        if re.search(pattern, normalized):
+            return country
+    exact_mappings = {
+        'ALL CHARGEABILITY AREAS EXCEPT THOSE LISTED': Country.ALL,
+        'ALL AREAS': Country.ALL,
+    }
+    return exact_mappings.get(normalized)
+
+
+def legacy_extract_from_table(extractor: BulletinExtractor, table) -> list[dict]:
+    """BulletinExtractor.extract_from_table with per-cell header resolution"""
+    results = []
+    visa_category = VisaCategory.from_table_title(table.title)
+    action_type = ActionType.from_table_title(table.title)
+    if not visa_category or not action_type:
+        return results
+    country_headers = table.headers[1:]
+    for row in table.rows:
+        canonical_class = canonical_visa_class(visa_category.value, row[0])
+        for country_header, cutoff_value in zip(country_headers, row[1:]):
+            country = legacy_country_from_header(country_header)
+            if not country:
+                continue
+            results.append({
+                'visa_category': visa_category.value,
+                'visa_class': row[0],
+                'canonical_class': canonical_class,
+                'action_type': action_type.value,
+                'country': country.value,
+                **extractor._parse_cutoff_value(cutoff_value)
+            })
+    return results
+
+
+def run_legacy(parsed_pages) -> list[dict]:
+    rows = []
+    for extractor, tables in parsed_pages:
+        for table in tables:
+            rows.extend(legacy_extract_from_table(extractor, table))
+    return rows
+
+
+def run_current(parsed_pages) -> list[dict]:
+    rows = []
+    for extractor, tables in parsed_pages:
+        for table in tables:
+            rows.extend(extractor.extract_from_table(table))
+    return rows
+
+
+def clear_caches() -> None:
+    resolve_country_columns.cache_clear()
+    _country_from_header.cache_clear()
+
+
+def best_of(repeat: int, func, *args, before=None) -> tuple[float, list]:
+    """Fastest wall time over `repeat` runs, plus the last result"""
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        if before:
+            before()
+        started = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per mode (best is reported)')
+    args = parser.parse_args()
+
+    pages = load_corpus()
+    parsed_pages = [(BulletinExtractor(page), extract_tables(page.content)) for page in pages]
+    tables = sum(len(page_tables) for _, page_tables in parsed_pages)
+    cells = sum(
+        len(row) - 1 for _, page_tables in parsed_pages for table in page_tables for row in table.rows
+    )
+
+    legacy_seconds, legacy_rows = best_of(args.repeat, run_legacy, parsed_pages)
+    cold_seconds, cold_rows = best_of(args.repeat, run_current, parsed_pages, before=clear_caches)
+    warm_seconds, warm_rows = best_of(args.repeat, run_current, parsed_pages)
+
+    if not (legacy_rows == cold_rows == warm_rows):
+        print("❌ Row mismatch between per-cell and per-table extraction")
+        return 1
+
+    plan_info = resolve_country_columns.cache_info()
+    print(f"Corpus: {len(pages)} bulletins, {tables} tables, {cells} cells, {len(warm_rows)} rows")
+    print(f"Distinct header layouts: {plan_info.currsize}")
+    print(f"  {'mode':<20} {'seconds':>8} {'µs/cell':>8} {'speedup':>8}")
+    for name, seconds in [
+        ('per-cell (legacy)', legacy_seconds),
+        ('per-table (cold)', cold_seconds),
+        ('per-table (warm)', warm_seconds),
+    ]:
+        print(f"  {name:<20} {seconds:>8.3f} {seconds / cells * 1e6:>8.2f} "
+              f"{legacy_seconds / seconds:>7.1f}x")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,180 @@
+"""
+Ingest contention harness - dashboard read latency during an ingest
+
+Seeds a migrated database with the bulletins published before --split,
+then for each scenario copies it, starts reader processes that replay the
+dashboard's database reads (get_aggregated_visa_class_data for every
+category/country/action combination, round-robin) and measures them:
+
+- idle: no ingest, readers only (baseline)
+- unthrottled: ingest the remaining bulletins in pipeline-sized batches,
+  one transaction per batch (the previous behaviour)
+- throttled: the same ingest with a WriteThrottle (--max-hold-ms, --pause-ms)
+
+Only reads that start while the ingest is running count. Readers are
+separate processes so they contend for the database the way gunicorn
+workers do, not for the GIL.
+
+Usage:
+    python -m benchmarks.bench_ingest_contention [--readers N] [--max-hold-ms MS] [--pause-ms MS]
+"""
+
+import os
+
+# Setup Django early (the ORM writer, migrations and dashboard reads need it)
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'django_config.settings')
+import django
+django.setup()
+
+import argparse
+import contextlib
+import io
+import itertools
+import multiprocessing
+import shutil
+import tempfile
+import time
+from datetime import date, datetime
+from functools import partial
+from pathlib import Path
+
+from django.db import connections
+
+from benchmarks.corpus import load_corpus
+from benchmarks.database import create_corpus_database, register_database
+from benchmarks.timing import percentile
+from extractors.bulletin_extractor import parse_bulletin
+from extractors.bulletin_handler import save_parsed_bulletins
+from extractors.sqlite_writer import SQLiteBulletinWriter
+from extractors.write_throttle import WriteThrottle
+from lib.dashboard_service import get_aggregated_visa_class_data
+from models.enums.action_type import ActionType
+from models.enums.country import Country
+from models.enums.visa_category import VisaCategory
+
+SUBMISSION_DATE = date(2015, 6, 1)
+
+
+def reader_loop(db_path: str, ready, stop, results) -> None:
+    """Reader process: replay dashboard reads until stop is set"""
+    connection = connections['default']
+    connection.close()
+    connection.settings_dict['NAME'] = db_path
+
+    combos = itertools.cycle(itertools.product(VisaCategory.values, Country.values, ActionType.values))
+    get_aggregated_visa_class_data(*next(combos), SUBMISSION_DATE)  # Connect and warm up
+    ready.set()
+
+    samples = []
+    while not stop.is_set():
+        started = time.perf_counter()
+        get_aggregated_visa_class_data(*next(combos), SUBMISSION_DATE)
+        samples.append((started, time.perf_counter() - started))
+    connection.close()
+    results.put(samples)
+
+
+def ingest(db_path: Path, parsed_bulletins, throttle: WriteThrottle, writer: str, batch_size: int) -> None:
+    """Save parsed_bulletins in pipeline-sized batches"""
+    if writer == 'sqlite':
+        with SQLiteBulletinWriter(db_path, throttle=throttle) as sqlite_writer:
+            save_batch = sqlite_writer.save_batch
+            for start in range(0, len(parsed_bulletins), batch_size):
+                save_batch(parsed_bulletins[start:start + batch_size])
+        return
+
+    alias = register_database(f'bench_{db_path.stem}', db_path)
+    save_batch = partial(save_parsed_bulletins, using=alias, throttle=throttle)
+    # The ORM writer logs every bulletin; keep console I/O out of the run
+    with contextlib.redirect_stdout(io.StringIO()):
+        for start in range(0, len(parsed_bulletins), batch_size):
+            save_batch(parsed_bulletins[start:start + batch_size])
+    connections[alias].close()
+
+
+def run_scenario(name: str, seed_path: Path, parsed_bulletins, throttle, args) -> dict:
+    """Copy the seed database, run readers (and the ingest) and collect latencies"""
+    db_path = seed_path.with_name(f'{name}.db')
+    shutil.copyfile(seed_path, db_path)
+
+    context = multiprocessing.get_context('fork')
+    stop = context.Event()
+    results = context.Queue()
+    readies = [context.Event() for _ in range(args.readers)]
+    connections.close_all()
+    readers = [
+        context.Process(target=reader_loop, args=(str(db_path), ready, stop, results))
+        for ready in readies
+    ]
+    for reader in readers:
+        reader.start()
+    for ready in readies:
+        ready.wait()
+
+    started = time.perf_counter()
+    if throttle is None:
+        time.sleep(args.idle_seconds)
+    else:
+        ingest(db_path, parsed_bulletins, throttle, args.writer, args.batch_size)
+    finished = time.perf_counter()
+
+    stop.set()
+    samples = [sample for _ in readers for sample in results.get()]
+    for reader in readers:
+        reader.join()
+
+    latencies = sorted(seconds for read_started, seconds in samples if started <= read_started < finished)
+    return {
+        'name': name,
+        'seconds': finished - started,
+        'reads': len(latencies),
+        'p50': percentile(latencies, 50),
+        'p99': percentile(latencies, 99),
+        'max': latencies[-1] if latencies else 0.0,
+        'throttle': throttle,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--readers', type=int, default=2, help='Reader processes')
+    parser.add_argument('--writer', choices=['orm', 'sqlite'], default='orm', help='Ingest writer')
+    parser.add_argument('--batch-size', type=int, default=12, help='Bulletins per save_batch call')
+    parser.add_argument('--max-hold-ms', type=float, default=50, help='Throttled: max write-lock hold')
+    parser.add_argument('--pause-ms', type=float, default=20, help='Throttled: pause between commits')
+    parser.add_argument('--split', default='2012-01-01',
+                        help='Seed with bulletins before this date, ingest the rest')
+    parser.add_argument('--idle-seconds', type=float, default=3.0, help='Length of the idle baseline')
+    args = parser.parse_args()
+
+    split = datetime.strptime(args.split, '%Y-%m-%d')
+    parsed_bulletins = [parse_bulletin(page) for page in reversed(load_corpus())]
+    seed = [parsed for parsed in parsed_bulletins if parsed.publication_data.publication_date < split]
+    new = [parsed for parsed in parsed_bulletins if parsed.publication_data.publication_date >= split]
+
+    scenarios = [
+        ('idle', None),
+        ('unthrottled', WriteThrottle()),
+        ('throttled', WriteThrottle(args.max_hold_ms / 1000, args.pause_ms / 1000)),
+    ]
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        seed_path = Path(tmp_dir) / 'seed.db'
+        create_corpus_database(seed_path, seed)
+        results = [run_scenario(name, seed_path, new, throttle, args) for name, throttle in scenarios]
+
+    print(f"Seeded {len(seed)} bulletins, ingesting {len(new)} with the {args.writer} writer; "
+          f"{args.readers} reader processes on {os.cpu_count()} CPU(s)")
+    print(f"  {'scenario':<12} {'seconds':>8} {'reads':>6} {'p50 ms':>8} {'p99 ms':>8} "
+          f"{'max ms':>8} {'txns':>5} {'longest hold ms':>16}")
+    for result in results:
+        throttle = result['throttle']
+        txns = f"{throttle.transactions:>5}" if throttle else f"{'-':>5}"
+        hold = f"{throttle.longest_hold_seconds * 1000:>16.1f}" if throttle else f"{'-':>16}"
+        print(f"  {result['name']:<12} {result['seconds']:>8.2f} {result['reads']:>6} "
+              f"{result['p50'] * 1000:>8.2f} {result['p99'] * 1000:>8.2f} "
+              f"{result['max'] * 1000:>8.2f} {txns} {hold}")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,113 @@
+"""
+Ingest writer benchmark - Django ORM vs SQLiteBulletinWriter
+
+Parses every saved bulletin once, then saves the whole corpus into two
+fresh, migrated databases in batches (as the ingest pipeline does):
+
+- orm: extractors.bulletin_handler.save_parsed_bulletins
+- sqlite: extractors.sqlite_writer.SQLiteBulletinWriter.save_batch
+
+Both databases must end up with identical cutoff rows; the benchmark
+aborts otherwise. Parsing is excluded from the timings.
+
+Usage:
+    python -m benchmarks.bench_ingest_writer [--batch-size N]
+"""
+
+import os
+
+# Setup Django early (the ORM writer and migrations need it)
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'django_config.settings')
+import django
+django.setup()
+
+import argparse
+import contextlib
+import io
+import sqlite3
+import tempfile
+import time
+from functools import partial
+from pathlib import Path
+
+from django.core.management import call_command
+from django.db import connections
+
+from benchmarks.corpus import load_corpus
+from extractors.bulletin_extractor import CUTOFF_ROW_COLUMNS, parse_bulletin
+from extractors.bulletin_handler import save_parsed_bulletins
+from extractors.sqlite_writer import SQLiteBulletinWriter
+
+SELECT_ROWS = (
+    f"SELECT b.publication_date, b.url, {', '.join(f'v.{name}' for name in CUTOFF_ROW_COLUMNS)} "
+    f"FROM visa_cutoff_date v JOIN bulletin b ON b.id = v.bulletin_id"
+)
+
+
+def create_database(alias: str, db_path: Path) -> None:
+    """Register a Django alias for db_path and run the migrations into it"""
+    db_settings = connections.settings['default'].copy()
+    db_settings['NAME'] = db_path
+    connections.settings[alias] = db_settings
+    call_command('migrate', database=alias, interactive=False, verbosity=0)
+
+
+def save_in_batches(save_batch, parsed_bulletins, batch_size: int) -> float:
+    """Save every bulletin through save_batch; returns wall seconds"""
+    started = time.perf_counter()
+    for start in range(0, len(parsed_bulletins), batch_size):
+        save_batch(parsed_bulletins[start:start + batch_size])
+    return time.perf_counter() - started
+
+
+def read_rows(db_path: Path) -> list[tuple]:
+    conn = sqlite3.connect(db_path)
+    try:
+        return sorted(conn.execute(SELECT_ROWS).fetchall())
+    finally:
+        conn.close()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--batch-size', type=int, default=12, help='Bulletins per transaction')
+    args = parser.parse_args()
+
+    parsed_bulletins = [parse_bulletin(page) for page in load_corpus()]
+    total_rows = sum(len(parsed.rows) for parsed in parsed_bulletins)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        orm_path = Path(tmp_dir) / 'orm.db'
+        sqlite_path = Path(tmp_dir) / 'sqlite.db'
+        create_database('bench_orm', orm_path)
+        create_database('bench_sqlite', sqlite_path)
+        connections['bench_sqlite'].close()
+
+        # The ORM writer logs every bulletin; keep console I/O out of the timing
+        with contextlib.redirect_stdout(io.StringIO()):
+            orm_seconds = save_in_batches(
+                partial(save_parsed_bulletins, using='bench_orm'), parsed_bulletins, args.batch_size
+            )
+        connections['bench_orm'].close()
+
+        with SQLiteBulletinWriter(sqlite_path) as writer:
+            sqlite_seconds = save_in_batches(writer.save_batch, parsed_bulletins, args.batch_size)
+
+        orm_rows = read_rows(orm_path)
+        sqlite_rows = read_rows(sqlite_path)
+
+    if orm_rows != sqlite_rows:
+        print("❌ Row mismatch between ORM and SQLite writer databases")
+        return 1
+
+    bulletins = len(parsed_bulletins)
+    print(f"Corpus: {bulletins} bulletins, {total_rows} extracted rows, {len(orm_rows)} stored rows")
+    print(f"  {'writer':<8} {'seconds':>8} {'bulletins/s':>12} {'rows/s':>9} {'speedup':>8}")
+    for name, seconds in [('orm', orm_seconds), ('sqlite', sqlite_seconds)]:
+        print(f"  {name:<8} {seconds:>8.2f} {bulletins / seconds:>12.1f} "
+              f"{len(orm_rows) / seconds:>9.0f} {orm_seconds / seconds:>7.1f}x")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
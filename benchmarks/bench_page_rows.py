@@ -0,0 +1,150 @@
+"""
+Page rows benchmark - ORM model hydration vs tuple streaming
+
+Builds a database from the corpus, then reads the rows behind the India
+employment-based final action page in four ways, each consumed the same
+way (the page's values collected per class):
+
+- models+join: the original dashboard query, full VisaCutoffDate and
+  Bulletin instances via select_related (reference only)
+- models-only: VisaCutoffDate instances deferred to the page's columns
+- tuples: the same cutoff rows as values_list tuples fetched in chunks
+  (the page read before VisaSeries, reference only)
+- series: lib.series_repository.series_rows, the packed rows the page
+  actually reads now
+
+Latency is the median of the timed runs; allocations are measured in a
+separate run under tracemalloc (peak bytes traced during the read).
+
+Usage:
+    python -m benchmarks.bench_page_rows [--repeat N]
+"""
+
+import os
+
+# Setup Django early (migrations and repository reads need it)
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'django_config.settings')
+import django
+django.setup()
+
+import argparse
+import statistics
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from django.db import connections
+
+from benchmarks.corpus import load_corpus
+from benchmarks.database import create_corpus_database
+from django_config.sqlite_profiles import READER, sqlite_database
+from extractors.bulletin_extractor import parse_bulletin
+from lib.series_repository import ROW_CHUNK_SIZE, series_rows
+from models.visa_cutoff_date import VisaCutoffDate
+
+PAGE = ('employment_based', 'india', 'final_action')
+
+# Columns of the cutoff rows behind the page (the series source)
+CUTOFF_FIELDS = (
+    'canonical_class', 'visa_class', 'publication_date', 'bulletin_url',
+    'cutoff_date', 'is_current', 'is_unavailable',
+)
+
+
+def cutoff_rows():
+    """The page's cutoff rows, grouped by canonical class, as an unevaluated QuerySet"""
+    return VisaCutoffDate.objects.filter(
+        visa_category=PAGE[0], country=PAGE[1], action_type=PAGE[2]
+    ).exclude(canonical_class='').order_by('canonical_class', 'publication_date', 'visa_class')
+
+
+def models_with_join() -> dict:
+    """The dashboard's query before VisaSeries (reference only)"""
+    rows = VisaCutoffDate.objects.filter(
+        visa_category=PAGE[0], country=PAGE[1], action_type=PAGE[2]
+    ).select_related('bulletin').order_by('visa_class', 'bulletin__publication_date')
+    return collect(
+        (row.canonical_class, row.bulletin.publication_date, row.cutoff_date, row.is_current,
+         row.bulletin.get_bulletin_url())
+        for row in rows
+    )
+
+
+def models_only() -> dict:
+    """The cutoff read as deferred model instances (reference only)"""
+    return collect(
+        (row.canonical_class, row.publication_date, row.cutoff_date, row.is_current, row.bulletin_url)
+        for row in cutoff_rows().only(*CUTOFF_FIELDS)
+    )
+
+
+def tuples() -> dict:
+    rows = cutoff_rows().values_list(*CUTOFF_FIELDS).iterator(chunk_size=ROW_CHUNK_SIZE)
+    return collect(
+        (canonical_class, published, cutoff, is_current, url)
+        for canonical_class, _, published, url, cutoff, is_current, _ in rows
+    )
+
+
+def series() -> dict:
+    return {row[0]: (bytes(row[2]), bytes(row[3]), bytes(row[4]), row[5]) for row in series_rows(*PAGE)}
+
+
+def collect(values) -> dict:
+    """{canonical class: [(publication date, cutoff, current, URL)]}"""
+    by_class = {}
+    for canonical_class, *point in values:
+        by_class.setdefault(canonical_class, []).append(tuple(point))
+    return by_class
+
+
+MODES = {'models+join': models_with_join, 'models-only': models_only, 'tuples': tuples, 'series': series}
+
+
+def measure(read, repeat: int) -> tuple[float, int]:
+    """(median seconds, peak traced bytes) of one read"""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        read()
+        samples.append(time.perf_counter() - started)
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        read()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return statistics.median(samples), peak
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--repeat', type=int, default=20, help='Timed reads per mode')
+    args = parser.parse_args()
+
+    parsed_bulletins = [parse_bulletin(page) for page in load_corpus()]
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = Path(tmp_dir) / 'visa_bulletin.db'
+        create_corpus_database(db_path, parsed_bulletins)
+        connections['default'].close()
+        del connections['default']
+        connections.settings['default'].update(sqlite_database(db_path, READER))
+
+        rows = cutoff_rows().count()
+        for name, read in MODES.items():
+            read()  # Warm-up
+            results[name] = measure(read, args.repeat)
+        connections['default'].close()
+
+    print(f"{'/'.join(PAGE)}: {rows:,} cutoff rows, {args.repeat} timed reads per mode")
+    print(f"  {'mode':<12} {'median ms':>10} {'peak KiB':>10}")
+    for name, (seconds, peak) in results.items():
+        print(f"  {name:<12} {seconds * 1000:>10.2f} {peak / 1024:>10.1f}")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
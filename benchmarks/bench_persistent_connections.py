@@ -0,0 +1,133 @@
+"""
+Persistent connection benchmark - per-request overhead removed by CONN_MAX_AGE
+
+Builds a database from the corpus, then replays requests through Django's
+request lifecycle: request_started, the dataset version lookup and the
+packed series read of one dashboard page, request_finished. Those signals
+run close_old_connections(), exactly as under gunicorn, for each read
+profile from django_config/sqlite_profiles.py:
+
+- per-request: CONN_MAX_AGE=0, so every request connects, runs the
+  profile's PRAGMAs and starts from a cold SQLite page cache
+- persistent: the profile's CONN_MAX_AGE with health checks, so a request
+  pays one is_usable() check (a stat of the file, or a replica URI
+  comparison) instead
+
+Modes alternate round by round so both see the same OS page cache.
+"saved" is the mean per-request latency minus the persistent one.
+
+Usage:
+    python -m benchmarks.bench_persistent_connections [--rounds N]
+"""
+
+import os
+
+# Setup Django early (migrations and dashboard reads need it)
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'django_config.settings')
+import django
+django.setup()
+
+import argparse
+import itertools
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from django.core.signals import request_finished, request_started
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+from benchmarks.corpus import load_corpus
+from benchmarks.database import create_corpus_database
+from benchmarks.timing import percentile
+from django_config.sqlite_profiles import READER, REPLICA, sqlite_database
+from extractors.bulletin_extractor import parse_bulletin
+from lib.series_repository import series_rows
+from lib.dataset_version import current_dataset_version
+from models.enums.action_type import ActionType
+from models.enums.country import Country
+from models.enums.visa_category import VisaCategory
+
+PROFILES = (READER, REPLICA)
+MODES = ('per-request', 'persistent')
+COMBOS = list(itertools.product(VisaCategory.values, Country.values, ActionType.values))
+
+
+def use_profile(db_path: Path, profile: str, mode: str) -> None:
+    """Point the default connection at db_path with the given profile and mode"""
+    connections['default'].close()
+    # The profiles use different ENGINEs, so build a fresh wrapper
+    del connections['default']
+    connections.settings['default'].update(sqlite_database(db_path, profile))
+    if mode == 'per-request':
+        connections.settings['default']['CONN_MAX_AGE'] = 0
+
+
+def handle_request(combo) -> None:
+    request_started.send(sender=None)
+    try:
+        current_dataset_version()
+        list(series_rows(*combo))
+    finally:
+        request_finished.send(sender=None)
+
+
+def run_round() -> list[float]:
+    """Seconds per request for one pass over every dashboard page"""
+    latencies = []
+    for combo in COMBOS:
+        started = time.perf_counter()
+        handle_request(combo)
+        latencies.append(time.perf_counter() - started)
+    connections['default'].close()
+    return latencies
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--rounds', type=int, default=5, help='Passes over all pages per profile and mode')
+    args = parser.parse_args()
+
+    connects = {}
+    current = {}
+
+    def count_connect(sender, connection, **kwargs):
+        key = current.get('key')
+        if key is not None:
+            connects[key] = connects.get(key, 0) + 1
+
+    connection_created.connect(count_connect)
+    parsed_bulletins = [parse_bulletin(page) for page in load_corpus()]
+    samples = {(profile, mode): [] for profile in PROFILES for mode in MODES}
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = Path(tmp_dir) / 'visa_bulletin.db'
+        create_corpus_database(db_path, parsed_bulletins)
+
+        for profile in PROFILES:  # Warm-up
+            use_profile(db_path, profile, 'persistent')
+            run_round()
+        for _ in range(args.rounds):
+            for key in samples:
+                use_profile(db_path, *key)
+                current['key'] = key
+                samples[key].extend(run_round())
+                current['key'] = None
+        connections['default'].close()
+
+    print(f"{len(COMBOS)} requests x {args.rounds} rounds per profile and mode")
+    print(f"  {'profile':<8} {'connection':<12} {'connects':>8} {'mean ms':>8} {'p50 ms':>8} {'p99 ms':>8}")
+    for (profile, mode), latencies in samples.items():
+        latencies.sort()
+        print(f"  {profile:<8} {mode:<12} {connects.get((profile, mode), 0):>8} "
+              f"{statistics.mean(latencies) * 1000:>8.3f} {percentile(latencies, 50) * 1000:>8.3f} "
+              f"{percentile(latencies, 99) * 1000:>8.3f}")
+    for profile in PROFILES:
+        saved = statistics.mean(samples[(profile, 'per-request')]) - statistics.mean(samples[(profile, 'persistent')])
+        print(f"  {profile}: {saved * 1000:.3f} ms saved per request")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
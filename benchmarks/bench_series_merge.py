@@ -0,0 +1,116 @@
+"""
+Series merge micro-benchmark - list-scan vs hash-keyed variant merge
+
+Builds a synthetic series: one row per spelling variant of a class for
+every monthly bulletin (100 variants x 300 bulletins by default, with
+some spellings listed twice), shuffled. Then times two ways of turning
+the rows into one point per bulletin, sorted by publication date:
+
+- list-scan: the dashboard aggregation as it used to be, skipping a row
+  when `pub_date in dates` and sorting an index permutation at the end;
+  the first row seen for a date wins, so the result depends on row order
+- hash-keyed: lib.series_codec.group_series_points, a dict keyed by
+  publication date where the lowest point_precedence() wins, encoded
+  with encode_points
+
+It also times merge_points re-applying every bulletin to the stored
+series. The hash-keyed result must be identical for every shuffle; the
+benchmark aborts otherwise.
+
+Usage:
+    python -m benchmarks.bench_series_merge [--variants N] [--months N] [--repeat N]
+"""
+
+import argparse
+import random
+import statistics
+import time
+from datetime import date
+
+from lib.bulletin_url import resolve_bulletin_url
+from lib.series_codec import encode_points, group_series_points, merge_points, point_from_row
+
+KEY = ('employment_based', 'india', 'final_action', 'EB-2')
+
+
+def synthetic_rows(variants: int, months: int, seed: int) -> list[tuple]:
+    """Rows in SERIES_ROW_COLUMNS order, every variant of every bulletin, shuffled by seed"""
+    values = random.Random(0)
+    rows = []
+    for month in range(months):
+        published = date(2000 + month // 12, month % 12 + 1, 1)
+        url = resolve_bulletin_url(published)
+        for variant in range(variants):
+            # Every tenth spelling is listed twice with another cutoff
+            spelling = f"EB-2 variant {variant // 2 * 2 if variant % 10 == 9 else variant:03d}"
+            cutoff = date(1995 + month // 24, values.randint(1, 12), 1)
+            rows.append((*KEY, published, spelling, cutoff, False, False, url))
+    random.Random(seed).shuffle(rows)
+    return rows
+
+
+def list_scan(rows: list[tuple]) -> tuple[list[date], list[date | None], list[str]]:
+    """The previous _append_records_to_data/_finalize_aggregated_data pair (reference only)"""
+    dates, cutoff_dates, urls = [], [], []
+    for row in rows:
+        point = point_from_row(row)
+        if point.publication_date in dates:
+            continue
+        dates.append(point.publication_date)
+        cutoff_dates.append(point.cutoff_date)
+        urls.append(point.bulletin_url)
+    order = sorted(range(len(dates)), key=lambda i: dates[i])
+    return [dates[i] for i in order], [cutoff_dates[i] for i in order], [urls[i] for i in order]
+
+
+def hash_keyed(rows: list[tuple]) -> dict:
+    return encode_points(group_series_points(rows)[KEY])
+
+
+def time_call(function, argument, repeat: int) -> tuple[float, object]:
+    """Median seconds per call and the last result"""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function(argument)
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples), result
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--variants', type=int, default=100, help='Spelling variants per bulletin')
+    parser.add_argument('--months', type=int, default=300, help='Monthly bulletins in the series')
+    parser.add_argument('--repeat', type=int, default=5, help='Timed runs per mode')
+    args = parser.parse_args()
+
+    shuffles = [synthetic_rows(args.variants, args.months, seed) for seed in range(3)]
+    rows = shuffles[0]
+    scan_seconds, (dates, _, _) = time_call(list_scan, rows, args.repeat)
+    hash_seconds, columns = time_call(hash_keyed, rows, args.repeat)
+
+    if any(hash_keyed(shuffled) != columns for shuffled in shuffles[1:]):
+        print("hash-keyed merge depends on row order")
+        return 1
+    if columns['first_publication_date'] != dates[0] or len(columns['statuses']) != len(dates):
+        print("list-scan and hash-keyed merge disagree on the dates")
+        return 1
+
+    points = group_series_points(rows)[KEY]
+    updates = {point.publication_date: point._replace(status=1, cutoff_date=None) for point in points}
+    merge_seconds, merged = time_call(lambda stored: merge_points(stored, updates), columns, args.repeat)
+    if merged['statuses'] != bytes([1]) * len(points):
+        print("merge_points lost an update")
+        return 1
+
+    print(f"{len(rows):,} rows ({args.variants} variants x {args.months} bulletins) -> {len(dates)} points")
+    print(f"  {'mode':<22} {'median ms':>10}")
+    print(f"  {'list-scan':<22} {scan_seconds * 1000:>10.2f}")
+    print(f"  {'hash-keyed':<22} {hash_seconds * 1000:>10.2f}")
+    print(f"  {'merge_points (all)':<22} {merge_seconds * 1000:>10.2f}")
+    print(f"  speedup: {scan_seconds / hash_seconds:.1f}x")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,33 @@
+"""
+Benchmark corpus - every saved bulletin page, loaded once
+
+Benchmarks run against saved_pages/ so results are reproducible offline
+and cover both the modern and legacy page layouts.
+"""
+
+import os
+from datetime import datetime
+from pathlib import Path
+
+from lib.bulletin_url import resolve_bulletin_url
+from lib.publication_data import PublicationData
+
+# Set when using 'bazel run'; falls back to the repository root
+WORKSPACE_DIR = Path(os.environ.get('BUILD_WORKSPACE_DIRECTORY', Path(__file__).parent.parent))
+SAVED_PAGES_DIR = WORKSPACE_DIR / 'saved_pages'
+
+
+def load_corpus(saved_pages_dir: Path = SAVED_PAGES_DIR) -> list[PublicationData]:
+    """
+    Load every saved bulletin page, newest first
+    
+    Returns:
+        List of PublicationData with content and publication date
+    """
+    pages = []
+    for path in saved_pages_dir.glob('visa-bulletin-for-*.html'):
+        date_str = path.stem.replace('visa-bulletin-for-', '')
+        publication_date = datetime.strptime(date_str, '%B-%Y')
+        url = resolve_bulletin_url(publication_date.date())
+        pages.append(PublicationData(url, path.read_text(encoding='utf-8'), publication_date))
+    return sorted(pages, key=lambda page: page.publication_date, reverse=True)
@@ -0,0 +1,32 @@
+"""
+Benchmark databases - migrated SQLite files built from the corpus
+
+Benchmarks never touch visa_bulletin.db: each builds its own database in a
+temporary directory with the real migrations and the bulk writer.
+"""
+
+from pathlib import Path
+
+from django.core.management import call_command
+from django.db import connections
+
+from extractors.sqlite_writer import SQLiteBulletinWriter
+
+
+def register_database(alias: str, db_path: Path) -> str:
+    """Register a Django alias for db_path (writer profile, like the default)"""
+    db_settings = connections.settings['default'].copy()
+    db_settings['NAME'] = db_path
+    connections.settings[alias] = db_settings
+    return alias
+
+
+def create_corpus_database(db_path: Path, parsed_bulletins) -> None:
+    """Migrated database holding parsed_bulletins, checkpointed into one file"""
+    alias = register_database(f'bench_{db_path.stem}', db_path)
+    call_command('migrate', database=alias, interactive=False, verbosity=0)
+    connections[alias].close()
+
+    with SQLiteBulletinWriter(db_path) as writer:
+        writer.save_batch(parsed_bulletins)
+        writer.connection.execute('PRAGMA wal_checkpoint(TRUNCATE);')
@@ -0,0 +1,33 @@
+"""
+Default database shared by the settings modules
+
+The SQLite file (django_config/sqlite_profiles.py) unless DATABASE_URL
+names a PostgreSQL server (django_config/postgres_profiles.py). Either
+way DB_PROFILE selects the writer or reader profile.
+
+Example:
+    DATABASES = {'default': default_database(WORKSPACE_DIR / 'visa_bulletin.db')}
+    connection_created.connect(configure_connection)
+"""
+
+import os
+from pathlib import Path
+
+from django_config.postgres_profiles import configure_postgres_connection, postgres_database
+from django_config.sqlite_profiles import configure_sqlite_connection, sqlite_database
+
+DATABASE_URL_ENV = 'DATABASE_URL'
+
+
+def default_database(sqlite_path: Path) -> dict:
+    """DATABASES['default']: PostgreSQL if DATABASE_URL is set, else the SQLite file"""
+    url = os.environ.get(DATABASE_URL_ENV, '').strip()
+    if url:
+        return postgres_database(url)
+    return sqlite_database(sqlite_path)
+
+
+def configure_connection(sender, connection, **kwargs):
+    """connection_created hook: per-profile PRAGMAs or session settings"""
+    configure_sqlite_connection(sender, connection, **kwargs)
+    configure_postgres_connection(sender, connection, **kwargs)
@@ -0,0 +1,43 @@
+"""
+Django database backend that reads from a per-process in-memory replica
+
+Selected with DB_PROFILE=replica (see django_config/sqlite_profiles.py).
+NAME is the SQLite file to replicate; every connection Django opens
+attaches to the process's in-memory copy instead (see replica.py).
+Read-only: the copy is discarded on refresh and never written back.
+
+Connections are persistent (CONN_MAX_AGE). Django's health check
+(CONN_HEALTH_CHECKS) calls is_usable() once per request; once the replica
+has loaded a newer copy, a connection still attached to the previous one
+reports itself unusable and the next query attaches to the new copy.
+
+OPTIONS:
+    replica_refresh_interval: Seconds between dataset marker checks (default 5)
+"""
+
+from django.db.backends.sqlite3 import base as sqlite_base
+
+from django_config.replica_backend.replica import replica_for
+
+
+class DatabaseWrapper(sqlite_base.DatabaseWrapper):
+    """SQLite backend whose connections open the in-memory replica"""
+
+    replica_uri = None
+
+    def get_connection_params(self):
+        options = self.settings_dict['OPTIONS']
+        refresh_interval = options.get('replica_refresh_interval', 5.0)
+        params = super().get_connection_params()
+        params.pop('replica_refresh_interval', None)
+        params['database'] = replica_for(self.settings_dict['NAME'], refresh_interval).uri
+        return params
+
+    def get_new_connection(self, conn_params):
+        self.replica_uri = conn_params['database']
+        return super().get_new_connection(conn_params)
+
+    def is_usable(self):
+        options = self.settings_dict['OPTIONS']
+        replica = replica_for(self.settings_dict['NAME'], options.get('replica_refresh_interval', 5.0))
+        return replica.uri == self.replica_uri
@@ -0,0 +1,126 @@
+"""
+In-memory replica of the SQLite database, one per worker process
+
+The whole dataset is a few MB, so each gunicorn worker can hold a private
+copy in RAM and never read the disk file the refresh scripts write to.
+
+The copy is a shared-cache in-memory database, loaded with the sqlite3
+backup API. An anchor connection owned by the replica keeps it alive, and
+every Django connection attaches to it by URI. Opening one costs no disk
+I/O and no WAL or lock traffic.
+
+Freshness is driven by a dataset marker: the inode, size and mtime of the
+database file and its -wal. Any commit or shadow swap changes it. The
+marker is checked at most once per refresh interval. When it changes, the
+new data is loaded under a fresh URI and new connections switch to it.
+Connections still open on the previous copy finish their request
+undisturbed, and SQLite frees that copy when the last one closes.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+
+def dataset_marker(db_path: Path) -> tuple:
+    """Changes whenever the database file or its WAL is written or replaced"""
+    marker = []
+    for suffix in ('', '-wal'):
+        try:
+            stat = os.stat(f"{db_path}{suffix}")
+        except FileNotFoundError:
+            marker.append(None)
+            continue
+        if suffix and not stat.st_size:
+            # Opening the file (even read-only) creates an empty WAL
+            marker.append(None)
+        else:
+            marker.append((stat.st_ino, stat.st_size, stat.st_mtime_ns))
+    return tuple(marker)
+
+
+class InMemoryReplica:
+    """Process-private, auto-refreshing in-memory copy of a SQLite file"""
+
+    def __init__(self, source_path: Path, refresh_interval: float = 5.0):
+        """
+        Args:
+            source_path: SQLite database file to copy
+            refresh_interval: Minimum seconds between dataset marker checks
+        """
+        self.source_path = Path(source_path)
+        self.refresh_interval = refresh_interval
+        self.loads = 0
+        self._lock = threading.Lock()
+        self._anchor: sqlite3.Connection | None = None
+        self._uri: str | None = None
+        self._marker: tuple | None = None
+        self._next_check = 0.0
+        self._pid = os.getpid()
+
+    @property
+    def uri(self) -> str:
+        """URI of the current copy (refreshed first if the source changed)"""
+        self.refresh()
+        return self._uri
+
+    def refresh(self, force: bool = False) -> bool:
+        """
+        Reload the copy if the dataset marker changed
+
+        Returns:
+            True if a new copy was loaded
+        """
+        now = time.monotonic()
+        if not force and self._uri and self._pid == os.getpid() and now < self._next_check:
+            return False
+        with self._lock:
+            if self._pid != os.getpid():
+                # Forked worker: the parent's anchor is not ours to use
+                self._anchor = self._uri = self._marker = None
+                self._pid = os.getpid()
+            marker = dataset_marker(self.source_path)
+            loaded = force or marker != self._marker or self._uri is None
+            if loaded:
+                self._load(marker)
+            self._next_check = now + self.refresh_interval
+            return loaded
+
+    def _load(self, marker: tuple) -> None:
+        # Marker is read before the copy: a write during the copy triggers
+        # another reload on the next check instead of being missed
+        self.loads += 1
+        uri = f"file:visa_replica_{self._pid}_{id(self)}_{self.loads}?mode=memory&cache=shared"
+        anchor = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        source = sqlite3.connect(f"file:{self.source_path}?mode=ro", uri=True)
+        try:
+            source.backup(anchor)
+        finally:
+            source.close()
+
+        previous = self._anchor
+        self._anchor, self._uri, self._marker = anchor, uri, marker
+        if previous is not None:
+            previous.close()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._anchor is not None:
+                self._anchor.close()
+            self._anchor = self._uri = self._marker = None
+
+
+_replicas: dict[Path, InMemoryReplica] = {}
+_replicas_lock = threading.Lock()
+
+
+def replica_for(source_path: Path, refresh_interval: float = 5.0) -> InMemoryReplica:
+    """The process-wide replica of source_path (created on first use)"""
+    source_path = Path(source_path).resolve()
+    with _replicas_lock:
+        replica = _replicas.get(source_path)
+        if replica is None:
+            replica = _replicas[source_path] = InMemoryReplica(source_path, refresh_interval)
+        return replica
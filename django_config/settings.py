@@ -13,28 +13,21 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 WORKSPACE_DIR = Path(os.environ.get('BUILD_WORKSPACE_DIRECTORY', BASE_DIR))
 
 # Database
+# DB_PROFILE=reader gives web workers a read-only, mmap-tuned connection;
+# the default writer profile (WAL) is for refresh scripts and migrations.
+# DATABASE_URL=postgres://... switches to PostgreSQL (persistent per-worker connections)
+from django_config.databases import configure_connection, default_database
+
 DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': WORKSPACE_DIR / 'visa_bulletin.db',
-        # Enable WAL mode for concurrent reads during writes
-        'OPTIONS': {
-            'timeout': 20,  # Wait up to 20 seconds for locks
-        },
-    }
+    'default': default_database(WORKSPACE_DIR / 'visa_bulletin.db'),
 }
 
-# Database connection initialization
-def setup_sqlite_wal(sender, connection, **kwargs):
-    """Enable WAL mode for SQLite to allow concurrent reads/writes"""
-    if connection.vendor == 'sqlite':
-        cursor = connection.cursor()
-        cursor.execute('PRAGMA journal_mode=WAL;')
-        cursor.execute('PRAGMA synchronous=NORMAL;')  # Faster writes
-        cursor.execute('PRAGMA cache_size=-64000;')   # 64MB cache
-
+# Database connection initialization (per-profile PRAGMAs / session settings)
 from django.db.backends.signals import connection_created
-connection_created.connect(setup_sqlite_wal)
+connection_created.connect(configure_connection)
+
+# Packed series exported after each ingest and mmapped by web workers (lib/series_file.py)
+SERIES_FILE = WORKSPACE_DIR / 'visa_bulletin.series'
 
 # Application definition
 INSTALLED_APPS = [
@@ -89,6 +82,10 @@ ALLOWED_HOSTS = [
 # WSGI application
 ROOT_URLCONF = 'django_config.urls'
 
+# QUERY_BUDGET_LOG=1 logs requests over the query budget (lib/query_budget.py)
+from lib.query_budget import query_budget_enabled
+MIDDLEWARE = ['webapp.middleware.QueryBudgetMiddleware'] if query_budget_enabled() else []
+
 # Caching configuration
 CACHES = {
     'default': {
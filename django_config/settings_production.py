@@ -18,28 +18,20 @@ DEBUG = os.environ.get('DEBUG', 'False') == 'True'
 
 ALLOWED_HOSTS = os.environ.get('ALLOWED_HOSTS', 'localhost,127.0.0.1').split(',')
 
-# Database
+# Database (DB_PROFILE=reader for web workers; DATABASE_URL for PostgreSQL,
+# see django_config/databases.py)
+from django_config.databases import configure_connection, default_database
+
 DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': WORKSPACE_DIR / 'visa_bulletin.db',
-        'OPTIONS': {
-            'timeout': 20,
-        },
-    }
+    'default': default_database(WORKSPACE_DIR / 'visa_bulletin.db'),
 }
 
-# Database connection initialization (WAL mode)
-def setup_sqlite_wal(sender, connection, **kwargs):
-    """Enable WAL mode for SQLite to allow concurrent reads/writes"""
-    if connection.vendor == 'sqlite':
-        cursor = connection.cursor()
-        cursor.execute('PRAGMA journal_mode=WAL;')
-        cursor.execute('PRAGMA synchronous=NORMAL;')
-        cursor.execute('PRAGMA cache_size=-64000;')
-
+# Database connection initialization (per-profile PRAGMAs / session settings)
 from django.db.backends.signals import connection_created
-connection_created.connect(setup_sqlite_wal)
+connection_created.connect(configure_connection)
+
+# Packed series exported after each ingest and mmapped by web workers (lib/series_file.py)
+SERIES_FILE = WORKSPACE_DIR / 'visa_bulletin.series'
 
 # Application definition
 INSTALLED_APPS = [
@@ -74,6 +66,10 @@ USE_TZ = True
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 ROOT_URLCONF = 'django_config.urls'
 
+# QUERY_BUDGET_LOG=1 logs requests over the query budget (lib/query_budget.py)
+from lib.query_budget import query_budget_enabled
+MIDDLEWARE = ['webapp.middleware.QueryBudgetMiddleware'] if query_budget_enabled() else []
+
 # Production security settings
 if not DEBUG:
     SECURE_SSL_REDIRECT = True
@@ -0,0 +1,50 @@
+"""
+Django SQLite backend whose persistent connections notice a file swap
+
+Selected by the reader profile (see django_config/sqlite_profiles.py).
+Web workers keep their connection between requests (CONN_MAX_AGE), but
+a shadow rebuild replaces visa_bulletin.db with os.replace(): an open
+connection keeps reading the old, unlinked file forever. Each connection
+records the device and inode of the file it opened; Django's health check
+(CONN_HEALTH_CHECKS) calls is_usable() once per request, and a changed
+identity closes the stale handle so the next query opens the new file.
+Commits to the same file need no reconnect: WAL readers see them.
+"""
+
+import os
+from pathlib import Path
+from urllib.parse import unquote, urlsplit
+
+from django.db.backends.sqlite3 import base as sqlite_base
+
+
+def database_file(name) -> Path:
+    """Filesystem path of a NAME that may be a plain path or a file: URI"""
+    name = str(name)
+    if name.startswith('file:'):
+        return Path(unquote(urlsplit(name).path))
+    return Path(name)
+
+
+def file_identity(path: Path) -> tuple | None:
+    """(device, inode) of path, or None if it does not exist"""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (stat.st_dev, stat.st_ino)
+
+
+class DatabaseWrapper(sqlite_base.DatabaseWrapper):
+    """SQLite backend that drops connections to a replaced database file"""
+
+    opened_identity = None
+
+    def get_new_connection(self, conn_params):
+        # Read before connecting: a swap in between costs one extra reconnect
+        self.opened_identity = file_identity(database_file(conn_params['database']))
+        return super().get_new_connection(conn_params)
+
+    def is_usable(self):
+        identity = file_identity(database_file(self.settings_dict['NAME']))
+        return identity is not None and identity == self.opened_identity
@@ -0,0 +1,124 @@
+"""
+SQLite connection profiles shared by the settings modules
+
+Web workers only ever read, while refresh scripts and migrations write.
+They get different connections:
+
+- writer (default): read-write, WAL with synchronous=NORMAL, 64MB page
+  cache. Used by refresh scripts, manage.py and the dev server.
+- reader: opened with `mode=ro` and `query_only`, so a bug cannot write.
+  It maps the database into memory (`mmap_size`), which shares the OS page
+  cache across workers and lets a per-request connection skip re-reading
+  pages. It also gets a bigger page cache and in-memory temp storage for
+  sorts.
+- replica: each worker process copies the database into memory with the
+  backup API and reloads it when the file changes
+  (django_config/replica_backend). Reads never touch the disk file or its
+  WAL locks; costs one copy of the dataset in RAM per worker.
+
+Select the profile with the DB_PROFILE environment variable (gunicorn runs
+with DB_PROFILE=reader). Neither read profile can run migrations. The
+replica checks for new data at most every DB_REPLICA_REFRESH_SECONDS
+(default 5).
+
+Read connections are persistent: each gunicorn thread keeps its connection
+for DB_CONN_MAX_AGE seconds (default 600), so the PRAGMAs below run once per
+connection instead of once per request. Django health-checks a connection
+before a request reuses it, and the read backends report it unusable once
+a shadow rebuild has swapped the file or the replica has reloaded
+(django_config/sqlite_backend). The writer keeps Django's per-request
+connections; refresh scripts manage their own.
+
+Example:
+    DATABASES = {'default': sqlite_database(WORKSPACE_DIR / 'visa_bulletin.db')}
+    connection_created.connect(configure_sqlite_connection)
+"""
+
+import os
+from pathlib import Path
+
+DB_PROFILE_ENV = 'DB_PROFILE'
+DB_REPLICA_REFRESH_ENV = 'DB_REPLICA_REFRESH_SECONDS'
+CONN_MAX_AGE_ENV = 'DB_CONN_MAX_AGE'
+
+WRITER = 'writer'
+READER = 'reader'
+REPLICA = 'replica'
+
+PROFILE_PRAGMAS = {
+    WRITER: (
+        'journal_mode=WAL',      # Concurrent reads during writes
+        'synchronous=NORMAL',    # Faster writes
+        'cache_size=-64000',     # 64MB cache
+    ),
+    READER: (
+        'query_only=ON',         # Refuse writes even if the URI mode changes
+        'mmap_size=268435456',   # 256MB: read pages straight from the OS cache
+        'cache_size=-131072',    # 128MB cache
+        'temp_store=MEMORY',     # Sorts and temp B-trees never touch disk
+    ),
+    REPLICA: (
+        'query_only=ON',         # The copy is discarded on refresh, never saved
+        'temp_store=MEMORY',
+    ),
+}
+
+
+def current_profile() -> str:
+    """Profile named by DB_PROFILE (default: writer)"""
+    profile = os.environ.get(DB_PROFILE_ENV, WRITER).strip().lower() or WRITER
+    if profile not in PROFILE_PRAGMAS:
+        raise ValueError(f"{DB_PROFILE_ENV} must be one of {sorted(PROFILE_PRAGMAS)}, got {profile!r}")
+    return profile
+
+
+def conn_max_age() -> int:
+    """Seconds a persistent connection is kept, from DB_CONN_MAX_AGE (default 600)"""
+    return int(os.environ.get(CONN_MAX_AGE_ENV, '600'))
+
+
+def sqlite_database(db_path: Path, profile: str | None = None) -> dict:
+    """
+    DATABASES entry for the SQLite file at db_path
+
+    Args:
+        db_path: Database file
+        profile: WRITER, READER or REPLICA (default: current_profile())
+
+    Returns:
+        Settings dict; the extra PROFILE key tells configure_sqlite_connection
+        which PRAGMAs to apply
+    """
+    profile = profile or current_profile()
+    engine = 'django.db.backends.sqlite3'
+    name = db_path
+    options = {
+        'timeout': 20,  # Wait up to 20 seconds for locks
+    }
+    if profile == READER:
+        # Django always opens SQLite with uri=True
+        engine = 'django_config.sqlite_backend'
+        name = f"file:{Path(db_path).resolve()}?mode=ro"
+    elif profile == REPLICA:
+        engine = 'django_config.replica_backend'
+        options['replica_refresh_interval'] = float(os.environ.get(DB_REPLICA_REFRESH_ENV, '5'))
+    database = {
+        'ENGINE': engine,
+        'NAME': name,
+        'OPTIONS': options,
+        'PROFILE': profile,
+    }
+    if profile != WRITER:
+        database['CONN_MAX_AGE'] = conn_max_age()
+        database['CONN_HEALTH_CHECKS'] = True
+    return database
+
+
+def configure_sqlite_connection(sender, connection, **kwargs):
+    """connection_created hook: apply the PRAGMAs of the connection's profile"""
+    if connection.vendor != 'sqlite':
+        return
+    profile = connection.settings_dict.get('PROFILE', WRITER)
+    with connection.cursor() as cursor:
+        for pragma in PROFILE_PRAGMAS[profile]:
+            cursor.execute(f'PRAGMA {pragma};')
@@ -6,6 +6,7 @@ Usage:
     python explore_db.py                    # Show summary
     python explore_db.py --bulletins        # List all bulletins
     python explore_db.py --query "F1 China" # Search for specific data
+    python explore_db.py --db visa_bulletin.compact.db  # Any of the above on another file
 """
 
 import sqlite3
@@ -16,9 +17,13 @@ from models.enums.action_type import ActionType
 from models.enums.country import Country
 
 
+# --db selects another file, e.g. the compact copy (lib/compact_schema.py)
+DB_PATH = 'visa_bulletin.db'
+
+
 def connect_db():
     """Connect to the database"""
-    return sqlite3.connect('visa_bulletin.db')
+    return sqlite3.connect(DB_PATH)
 
 
 def show_summary():
@@ -173,6 +178,15 @@ def query_data(search_term: str):
 
 def main():
     """Main entry point"""
+    global DB_PATH
+    if '--db' in sys.argv:
+        idx = sys.argv.index('--db')
+        if idx + 1 >= len(sys.argv):
+            print("❌ Please provide a database file after --db")
+            return
+        DB_PATH = sys.argv[idx + 1]
+        del sys.argv[idx:idx + 2]
+    
     if len(sys.argv) == 1:
         show_summary()
     elif '--bulletins' in sys.argv:
@@ -188,6 +202,7 @@ def main():
         print("  python explore_db.py                    # Show summary")
         print("  python explore_db.py --bulletins        # List all bulletins")
         print("  python explore_db.py --query 'F1 China' # Search for specific data")
+        print("  python explore_db.py --db FILE ...      # Explore another database file")
 
 
 if __name__ == '__main__':
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Export the compact copy of the database (lib/compact_schema.py)
+
+Enums are stored as small integers and dates as day ordinals; views named
+bulletin and visa_cutoff_date keep the original columns, so explore_db.py
+and ad-hoc SQL work on the copy unchanged.
+
+Usage:
+    python export_compact_db.py                          # visa_bulletin.db -> visa_bulletin.compact.db
+    python export_compact_db.py path/to/visa_bulletin.db # Copy next to that database
+    python export_compact_db.py DB --out compact.db      # Copy at a chosen path
+"""
+
+import os
+import sys
+import time
+from pathlib import Path
+
+from lib.compact_schema import export_compact_database
+
+# Same default as the settings (set when using 'bazel run')
+WORKSPACE_DIR = Path(os.environ.get('BUILD_WORKSPACE_DIRECTORY', Path(__file__).parent))
+
+
+def main():
+    """Main entry point"""
+    args = sys.argv[1:]
+    out_path = None
+    if '--out' in args:
+        idx = args.index('--out')
+        if idx + 1 >= len(args):
+            print("❌ Please provide a file name after --out")
+            return 1
+        out_path = Path(args[idx + 1])
+        del args[idx:idx + 2]
+    db_path = Path(args[0]) if args else WORKSPACE_DIR / 'visa_bulletin.db'
+    if not db_path.exists():
+        print(f"❌ No database at {db_path}")
+        return 1
+
+    started = time.perf_counter()
+    report = export_compact_database(db_path, out_path)
+    seconds = time.perf_counter() - started
+
+    print(f"🗜️  {report.format()}")
+    print(f"   File: {report.path.stat().st_size / 1024:.0f} KiB, exported in {seconds * 1000:.0f} ms")
+    print(f"   Explore it with: python explore_db.py --db {report.path}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Export the columnar snapshot of the database (lib/columnar_snapshot.py)
+
+The refresh scripts run this after every ingest that saved data; run it by
+hand after restoring a database or to write a copy elsewhere.
+
+Usage:
+    python export_snapshot.py                          # visa_bulletin.db -> visa_bulletin.npz
+    python export_snapshot.py path/to/visa_bulletin.db # Snapshot next to that database
+    python export_snapshot.py DB --out snapshot.npz    # Snapshot at a chosen path
+"""
+
+import os
+import sys
+import time
+from pathlib import Path
+
+from lib.columnar_snapshot import export_snapshot, load_snapshot, snapshot_path_for
+
+# Same default as the settings (set when using 'bazel run')
+WORKSPACE_DIR = Path(os.environ.get('BUILD_WORKSPACE_DIRECTORY', Path(__file__).parent))
+
+
+def main():
+    """Main entry point"""
+    args = sys.argv[1:]
+    out_path = None
+    if '--out' in args:
+        idx = args.index('--out')
+        if idx + 1 >= len(args):
+            print("❌ Please provide a file name after --out")
+            return 1
+        out_path = Path(args[idx + 1])
+        del args[idx:idx + 2]
+    db_path = Path(args[0]) if args else WORKSPACE_DIR / 'visa_bulletin.db'
+    if not db_path.exists():
+        print(f"❌ No database at {db_path}")
+        return 1
+    out_path = out_path or snapshot_path_for(db_path)
+
+    started = time.perf_counter()
+    manifest = export_snapshot(db_path, out_path)
+    export_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    load_snapshot(out_path)
+    load_seconds = time.perf_counter() - started
+
+    print(f"📦 {out_path}: {manifest['rows']:,} rows, {out_path.stat().st_size / 1024:.0f} KiB")
+    print(f"   Dataset version {manifest['dataset_version']} (latest bulletin {manifest['latest_bulletin_date']})")
+    print(f"   Exported in {export_seconds * 1000:.0f} ms, loads in {load_seconds * 1000:.1f} ms")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
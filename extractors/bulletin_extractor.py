@@ -5,12 +5,51 @@ Extracts time-series data from visa bulletin tables and prepares it
 for database storage.
 """
 
+import time
+from dataclasses import dataclass, field
 from datetime import date
+from functools import lru_cache
 
 from models.enums.visa_category import VisaCategory
 from models.enums.action_type import ActionType
 from models.enums.country import Country
+from lib.bulletin_parser import PARSE_PATH_NONE, extract_tables_with_path
 from lib.publication_data import PublicationData
+from lib.visa_class_utils import canonical_visa_class
+
+
+# Column order of the flat rows produced by extract_rows_from_table()
+CUTOFF_VALUE_COLUMNS = ('cutoff_value', 'cutoff_date', 'is_current', 'is_unavailable')
+CUTOFF_ROW_COLUMNS = (
+    'visa_category', 'visa_class', 'canonical_class', 'action_type', 'country',
+    *CUTOFF_VALUE_COLUMNS,
+)
+
+
+@lru_cache(maxsize=256)
+def resolve_country_columns(country_headers: tuple[str, ...]) -> tuple[tuple[int, str], ...]:
+    """
+    Resolve a table's country headers into a column plan
+    
+    Bulletins reuse a handful of header layouts, so the plan is computed
+    once per distinct layout instead of once per cell.
+    
+    Args:
+        country_headers: Table headers after the class-name column
+        
+    Returns:
+        (column index, Country value) pairs for recognized columns, in order
+        
+    Example:
+        resolve_country_columns(('All Chargeability Areas Except Those Listed', 'INDIA', 'Notes'))
+        # ((0, 'all'), (1, 'india'))
+    """
+    plan = []
+    for index, header in enumerate(country_headers):
+        country = Country.from_header(header)
+        if country:
+            plan.append((index, country.value))
+    return tuple(plan)
 
 
 class BulletinExtractor:
@@ -39,6 +78,18 @@ class BulletinExtractor:
         Returns:
             List of dicts ready for VisaCutoffDate model creation
         """
+        return [dict(zip(CUTOFF_ROW_COLUMNS, row)) for row in self.extract_rows_from_table(table)]
+    
+    def extract_rows_from_table(self, table) -> list[tuple]:
+        """
+        Extract flat cutoff rows from a parsed Table object
+        
+        Args:
+            table: Table object from lib.table
+            
+        Returns:
+            List of tuples in CUTOFF_ROW_COLUMNS order
+        """
         results = []
         
         # Get category and action type from table title using enums
@@ -50,29 +101,29 @@ class BulletinExtractor:
             return results
         
         # Skip first column (it's the class name), rest are countries
-        country_headers = table.headers[1:]
+        column_plan = resolve_country_columns(tuple(table.headers[1:]))
+        category_value = visa_category.value
+        action_value = action_type.value
+        cutoff_columns = self._cutoff_columns
         
         for row in table.rows:
             visa_class = row[0]
+            canonical_class = canonical_visa_class(category_value, visa_class)
             cutoff_values = row[1:]
             
-            # Create entry for each country
-            for country_header, cutoff_value in zip(country_headers, cutoff_values):
-                country = Country.from_header(country_header)
-                
-                if not country:
-                    # Unknown country, skip
-                    continue
-                
-                data = {
-                    'visa_category': visa_category.value,
-                    'visa_class': visa_class,
-                    'action_type': action_type.value,
-                    'country': country.value,
-                    **self._parse_cutoff_value(cutoff_value)
-                }
+            # Create entry for each recognized country column
+            for index, country_value in column_plan:
+                if index >= len(cutoff_values):
+                    break
                 
-                results.append(data)
+                results.append((
+                    category_value,
+                    visa_class,
+                    canonical_class,
+                    action_value,
+                    country_value,
+                    *cutoff_columns(cutoff_values[index]),
+                ))
         
         return results
     
@@ -86,34 +137,68 @@ class BulletinExtractor:
         Returns:
             Dict with cutoff_value, cutoff_date, is_current, is_unavailable
         """
+        return dict(zip(CUTOFF_VALUE_COLUMNS, self._cutoff_columns(value)))
+    
+    def _cutoff_columns(self, value) -> tuple:
+        """Cutoff value as a (cutoff_value, cutoff_date, is_current, is_unavailable) tuple"""
         if isinstance(value, date):
-            return {
-                'cutoff_value': value.strftime('%Y-%m-%d'),
-                'cutoff_date': value,
-                'is_current': False,
-                'is_unavailable': False,
-            }
+            return (value.strftime('%Y-%m-%d'), value, False, False)
         elif value == 'C':
             # 'C' means Current - use the bulletin's publication date
-            return {
-                'cutoff_value': 'C',
-                'cutoff_date': self.publication_date,
-                'is_current': True,
-                'is_unavailable': False,
-            }
+            return ('C', self.publication_date, True, False)
         elif value == 'U':
-            return {
-                'cutoff_value': 'U',
-                'cutoff_date': None,
-                'is_current': False,
-                'is_unavailable': True,
-            }
+            return ('U', None, False, True)
         else:
             # Fallback: treat as string
-            return {
-                'cutoff_value': str(value),
-                'cutoff_date': None,
-                'is_current': False,
-                'is_unavailable': False,
-            }
+            return (str(value), None, False, False)
+
+
+@dataclass
+class ParsedBulletin:
+    """Cutoff rows extracted from one bulletin page, plus parse diagnostics"""
+    publication_data: PublicationData
+    rows: list[tuple]
+    tables_by_type: dict[str, int] = field(default_factory=dict)
+    parse_path: str = PARSE_PATH_NONE
+    timings: dict[str, float] = field(default_factory=dict)
+    
+    @property
+    def cutoff_data(self) -> list[dict[str, any]]:
+        """Rows as dicts keyed by VisaCutoffDate field name"""
+        return [dict(zip(CUTOFF_ROW_COLUMNS, row)) for row in self.rows]
+
 
+def parse_bulletin(publication_data: PublicationData) -> ParsedBulletin:
+    """
+    Parse a bulletin page and extract cutoff rows from all its tables
+    
+    Pure CPU work with no database access, so it is safe to run in a
+    worker process (see extractors.ingest_pipeline).
+    
+    Args:
+        publication_data: PublicationData object with URL, content, and date
+        
+    Returns:
+        ParsedBulletin with flat rows in CUTOFF_ROW_COLUMNS order
+    """
+    started = time.perf_counter()
+    tables, parse_path = extract_tables_with_path(publication_data.content)
+    parsed_at = time.perf_counter()
+    
+    extractor = BulletinExtractor(publication_data)
+    rows = []
+    tables_by_type: dict[str, int] = {}
+    for table in tables:
+        rows.extend(extractor.extract_rows_from_table(table))
+        tables_by_type[table.title] = tables_by_type.get(table.title, 0) + 1
+    
+    return ParsedBulletin(
+        publication_data=publication_data,
+        rows=rows,
+        tables_by_type=tables_by_type,
+        parse_path=parse_path,
+        timings={
+            'parse': parsed_at - started,
+            'extract': time.perf_counter() - parsed_at,
+        },
+    )
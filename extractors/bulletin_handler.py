@@ -5,10 +5,18 @@ Handles the complete pipeline:
 1. Create or get Bulletin record
 2. Extract data from all tables
 3. Save VisaCutoffDate records (idempotent)
+4. Refresh the bulletin's point in each affected VisaSeries
+5. Bump the dataset version when anything changed
+6. Report what changed as an IngestResult
 """
 
 import os
+import time
+from contextlib import contextmanager
+from functools import partial
+
 import django
+from django.db import DEFAULT_DB_ALIAS, transaction
 
 # Setup Django if not already configured
 if not os.environ.get('DJANGO_SETTINGS_MODULE'):
@@ -19,15 +27,26 @@ from django.apps import apps as django_apps
 if not django_apps.ready:
     django.setup()
 
-from extractors.bulletin_extractor import BulletinExtractor
-from lib.bulletin_parser import extract_tables
+from extractors.bulletin_extractor import ParsedBulletin, parse_bulletin
+from extractors.ingest_result import IngestResult
+from extractors.write_throttle import WriteThrottle
+from lib.dataset_version import bump_dataset_version
 from lib.publication_data import PublicationData
+from lib.query_budget import BULLETIN_BUDGET, collect_queries, log_over_budget, query_budget_enabled
+from lib.series_store import refresh_bulletin_series
 
 # Track whether tables have been created
 _TABLES_CREATED = False
 
 
-def save_bulletin_to_db(publication_data: PublicationData):
+# Natural key of a cutoff row (the model's unique_together)
+CUTOFF_KEY_FIELDS = ('bulletin', 'visa_category', 'visa_class', 'action_type', 'country')
+
+# Fields compared to decide whether an existing row changed
+CUTOFF_VALUE_FIELDS = ('canonical_class', 'cutoff_value', 'cutoff_date', 'is_current', 'is_unavailable')
+
+
+def save_bulletin_to_db(publication_data: PublicationData) -> IngestResult:
     """
     Save a bulletin and all its tables to the database (idempotent)
     
@@ -35,61 +54,191 @@ def save_bulletin_to_db(publication_data: PublicationData):
         publication_data: PublicationData object with URL, content, and date
         
     Returns:
-        Bulletin instance (created or retrieved)
+        IngestResult with row counts, tables found, parse path and timings;
+        the Bulletin instance is available as result.bulletin
         
     Example:
-        save_bulletin_to_db(publication_data)
+        result = save_bulletin_to_db(publication_data)
+        print(result.summary())
+    """
+    return save_parsed_bulletin(parse_bulletin(publication_data))
+
+
+def save_parsed_bulletin(
+    parsed: ParsedBulletin,
+    using: str = DEFAULT_DB_ALIAS,
+    pending_series: list | None = None
+) -> IngestResult:
+    """
+    Save already-extracted cutoff rows for one bulletin (idempotent)
+    
+    Only the URL and publication date of parsed.publication_data are used,
+    so the page content may already have been dropped.
+    
+    Existing rows are loaded once and diffed in memory; only new rows are
+    inserted and only rows whose values changed are updated.
+    
+    Args:
+        parsed: ParsedBulletin produced by parse_bulletin()
+        using: Database alias to write to (e.g. a shadow rebuild)
+        pending_series: Queue the VisaSeries refresh here; the caller
+            refreshes once per transaction and bumps the dataset version.
+            Without it the bulletin is saved through save_parsed_bulletins()
+            so rows, series and version commit together.
+        
+    Returns:
+        IngestResult describing what was written
     """
-    # Extract date and tables from PublicationData
+    if pending_series is None:
+        return save_parsed_bulletins([parsed], using=using)[0]
+    
+    started = time.perf_counter()
+    publication_data = parsed.publication_data
     publication_date = publication_data.publication_date.date()
-    tables = extract_tables(publication_data.content)
     
     # Import models here to ensure Django is fully set up
     from models.bulletin import Bulletin
     from models.visa_cutoff_date import VisaCutoffDate
     
     # Get or create bulletin with URL
-    bulletin, created = Bulletin.objects.get_or_create(
+    bulletin, created = Bulletin.objects.using(using).get_or_create(
         publication_date=publication_date,
         defaults={'url': publication_data.url}
     )
     
     # Update URL if bulletin exists but URL is missing
-    if not created and not bulletin.url and publication_data.url:
+    url_filled = not created and not bulletin.url and bool(publication_data.url)
+    if url_filled:
         bulletin.url = publication_data.url
-        bulletin.save()
+        bulletin.save(using=using)
+        # Keep the denormalized copy on existing rows in sync
+        VisaCutoffDate.objects.using(using).filter(bulletin=bulletin).update(
+            bulletin_url=bulletin.get_bulletin_url()
+        )
     
     if created:
         print(f"Created new bulletin: {publication_date}")
     else:
         print(f"Bulletin already exists: {publication_date}")
     
-    # Create extractor - pass PublicationData if available, else date
-    extractor = BulletinExtractor(publication_data)
+    # Later rows win, matching repeated update_or_create calls
+    incoming = {_row_key(cutoff_data): cutoff_data for cutoff_data in parsed.cutoff_data}
+    existing = {} if created else {
+        (row.visa_category, row.visa_class, row.action_type, row.country): row
+        for row in VisaCutoffDate.objects.using(using).filter(bulletin=bulletin)
+    }
+    # Series the rows fed before any canonical_class changes below
+    previous_series = {
+        (row.visa_category, row.country, row.action_type, row.canonical_class)
+        for row in existing.values() if row.canonical_class
+    }
     
-    # Process each table
-    for table in tables:
-        cutoff_data_list = extractor.extract_from_table(table)
-        
-        # Save each cutoff date (update_or_create for idempotency)
-        for cutoff_data in cutoff_data_list:
-            VisaCutoffDate.objects.update_or_create(
+    bulletin_url = bulletin.get_bulletin_url()
+    to_create = []
+    to_update = []
+    unchanged = 0
+    for key, cutoff_data in incoming.items():
+        row = existing.get(key)
+        if row is None:
+            to_create.append(VisaCutoffDate(
                 bulletin=bulletin,
-                visa_category=cutoff_data['visa_category'],
-                visa_class=cutoff_data['visa_class'],
-                action_type=cutoff_data['action_type'],
-                country=cutoff_data['country'],
-                defaults={
-                    'cutoff_value': cutoff_data['cutoff_value'],
-                    'cutoff_date': cutoff_data['cutoff_date'],
-                    'is_current': cutoff_data['is_current'],
-                    'is_unavailable': cutoff_data['is_unavailable'],
-                }
-            )
-    
-    # Print summary
-    cutoff_count = VisaCutoffDate.objects.filter(bulletin=bulletin).count()
-    print(f"  Saved {cutoff_count} cutoff date records")
-    
-    return bulletin
+                publication_date=publication_date,
+                bulletin_url=bulletin_url,
+                **cutoff_data
+            ))
+        elif any(getattr(row, name) != cutoff_data[name] for name in CUTOFF_VALUE_FIELDS):
+            for name in CUTOFF_VALUE_FIELDS:
+                setattr(row, name, cutoff_data[name])
+            to_update.append(row)
+        else:
+            unchanged += 1
+    
+    # Upsert (INSERT ... ON CONFLICT DO UPDATE): on PostgreSQL another writer
+    # may insert the same rows after we read; the later values win either way
+    VisaCutoffDate.objects.using(using).bulk_create(
+        to_create,
+        update_conflicts=True,
+        unique_fields=CUTOFF_KEY_FIELDS,
+        update_fields=CUTOFF_VALUE_FIELDS,
+    )
+    VisaCutoffDate.objects.using(using).bulk_update(to_update, CUTOFF_VALUE_FIELDS)
+    if to_create or to_update or url_filled:
+        pending_series.append((bulletin, previous_series))
+    
+    result = IngestResult(
+        publication_date=publication_date,
+        url=bulletin.url,
+        bulletin_created=created,
+        rows_inserted=len(to_create),
+        rows_updated=len(to_update),
+        rows_unchanged=unchanged,
+        tables_by_type=parsed.tables_by_type,
+        parse_path=parsed.parse_path,
+        timings={**parsed.timings, 'save': time.perf_counter() - started},
+        bulletin=bulletin,
+    )
+    print(f"  Saved {result.summary()}")
+    return result
+
+
+def save_parsed_bulletins(
+    parsed_bulletins,
+    using: str = DEFAULT_DB_ALIAS,
+    throttle: WriteThrottle | None = None
+) -> list[IngestResult]:
+    """
+    Save a batch of pre-parsed bulletins in a single transaction
+    
+    Used as the writer stage of extractors.ingest_pipeline.IngestPipeline.
+    
+    Args:
+        parsed_bulletins: List of ParsedBulletin objects
+        using: Database alias to write to
+        throttle: Optional limit on how long one transaction holds the
+            write lock; the batch is then committed in several transactions
+        
+    Returns:
+        List of IngestResult objects, in batch order
+    """
+    throttle = throttle or WriteThrottle()
+    pending_series = []
+    
+    @contextmanager
+    def series_transaction():
+        # Series touched by the transaction's bulletins are rewritten once, before
+        # commit, and the dataset version moves with them. Bumping first takes
+        # the version row lock, which serializes the series read-modify-write
+        # between concurrent writers on PostgreSQL (SQLite has one writer anyway)
+        try:
+            with transaction.atomic(using=using):
+                yield
+                if pending_series:
+                    bump_dataset_version(using=using)
+                    refresh_bulletin_series(pending_series, using=using)
+        finally:
+            pending_series.clear()
+    
+    save = partial(save_parsed_bulletin, using=using, pending_series=pending_series)
+    if query_budget_enabled():
+        save = partial(_save_counting_queries, save, using=using)
+    return throttle.run(parsed_bulletins, series_transaction, save)
 
+
+def _save_counting_queries(save, parsed: ParsedBulletin, using: str) -> IngestResult:
+    """save(parsed), recording its queries in the result and logging outliers"""
+    with collect_queries(using) as stats:
+        result = save(parsed)
+    result.queries = stats.count
+    result.timings['sql'] = stats.seconds
+    log_over_budget(stats, BULLETIN_BUDGET, f"Bulletin {result.publication_date}")
+    return result
+
+
+def _row_key(cutoff_data: dict) -> tuple:
+    """Natural key of a cutoff row (matches the model's unique_together)"""
+    return (
+        cutoff_data['visa_category'],
+        cutoff_data['visa_class'],
+        cutoff_data['action_type'],
+        cutoff_data['country'],
+    )
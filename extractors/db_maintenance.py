@@ -0,0 +1,142 @@
+"""
+Database maintenance - statistics, WAL checkpoint and compacted copies
+
+Neither a shadow rebuild nor the incremental ingests ever analyze or
+checkpoint the SQLite file, so the planner runs without statistics and
+the WAL grows between automatic checkpoints. maintain_database() runs:
+
+1. ANALYZE and PRAGMA optimize, refreshing sqlite_stat1 for the planner
+2. PRAGMA wal_checkpoint(TRUNCATE), folding the WAL back into the file
+3. Optionally VACUUM INTO a new file: a compacted, defragmented copy for
+   backups and deploys, taken from one read transaction so readers and
+   the live file are unaffected
+
+The refresh scripts call it after every run that saved data, while they
+hold the ingest lock; `python manage.py maintain_db` runs it by hand.
+
+Example:
+    report = maintain_database(db_path, vacuum_into=Path('backups/visa_bulletin.db'))
+    print(report.format())
+"""
+
+import os
+import sqlite3
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+
+@dataclass
+class FileSizes:
+    """Bytes on disk for a database and its WAL"""
+    database: int
+    wal: int
+
+    @property
+    def total(self) -> int:
+        return self.database + self.wal
+
+
+@dataclass
+class MaintenanceReport:
+    """What maintain_database() did"""
+    db_path: Path
+    before: FileSizes
+    after: FileSizes
+    analyze_seconds: float
+    checkpoint_busy: bool
+    vacuum_path: Path | None = None
+    vacuum_bytes: int = 0
+    vacuum_seconds: float = 0.0
+
+    def format(self) -> str:
+        """Human-readable summary"""
+        lines = [
+            f"{self.db_path.name}: {format_size(self.before.database)} + "
+            f"{format_size(self.before.wal)} WAL -> {format_size(self.after.database)} + "
+            f"{format_size(self.after.wal)} WAL",
+            f"ANALYZE + optimize in {self.analyze_seconds * 1000:.0f} ms",
+        ]
+        if self.checkpoint_busy:
+            lines.append("A reader held the WAL; the checkpoint could not truncate it")
+        if self.vacuum_path:
+            lines.append(
+                f"VACUUM INTO {self.vacuum_path}: {format_size(self.vacuum_bytes)} "
+                f"in {self.vacuum_seconds * 1000:.0f} ms"
+            )
+        return '\n'.join(lines)
+
+
+def wal_path_for(db_path: Path) -> Path:
+    return db_path.with_name(db_path.name + '-wal')
+
+
+def file_sizes(db_path: Path) -> FileSizes:
+    """Current size of the database file and its WAL (0 if absent)"""
+    def size(path):
+        try:
+            return path.stat().st_size
+        except FileNotFoundError:
+            return 0
+    return FileSizes(database=size(db_path), wal=size(wal_path_for(db_path)))
+
+
+def format_size(size: int) -> str:
+    if size < 1024:
+        return f"{size} B"
+    if size < 1024 * 1024:
+        return f"{size / 1024:.1f} KiB"
+    return f"{size / 1024 / 1024:.1f} MiB"
+
+
+def maintain_database(db_path: Path, vacuum_into: Path | None = None) -> MaintenanceReport:
+    """
+    Analyze, checkpoint and optionally write a compacted copy of a database
+
+    Args:
+        db_path: Live SQLite file (the caller should hold its ingest lock)
+        vacuum_into: Also write a compacted copy here, replacing any file
+            already there only once the copy is complete
+
+    Returns:
+        MaintenanceReport with file and WAL sizes before and after
+    """
+    db_path = Path(db_path)
+    before = file_sizes(db_path)
+    conn = sqlite3.connect(db_path, timeout=20, isolation_level=None)
+    try:
+        started = time.perf_counter()
+        conn.execute('ANALYZE;')
+        conn.execute('PRAGMA optimize;')
+        analyze_seconds = time.perf_counter() - started
+
+        # busy=1: a reader's snapshot still needs the WAL, so it could not be reset
+        busy = conn.execute('PRAGMA wal_checkpoint(TRUNCATE);').fetchone()[0]
+        report = MaintenanceReport(
+            db_path=db_path,
+            before=before,
+            after=file_sizes(db_path),
+            analyze_seconds=analyze_seconds,
+            checkpoint_busy=bool(busy),
+        )
+
+        if vacuum_into is not None:
+            started = time.perf_counter()
+            report.vacuum_path = Path(vacuum_into)
+            report.vacuum_bytes = vacuum_copy(conn, report.vacuum_path)
+            report.vacuum_seconds = time.perf_counter() - started
+    finally:
+        conn.close()
+    return report
+
+
+def vacuum_copy(conn: sqlite3.Connection, out_path: Path) -> int:
+    """VACUUM INTO a temporary file, fsync it and rename it to out_path"""
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = out_path.with_name(out_path.name + '.tmp')
+    tmp_path.unlink(missing_ok=True)
+    conn.execute('VACUUM INTO ?;', (str(tmp_path),))
+    with open(tmp_path, 'rb') as f:
+        os.fsync(f.fileno())
+    os.replace(tmp_path, out_path)
+    return out_path.stat().st_size
@@ -0,0 +1,102 @@
+"""
+Ingest Lock - only one refresh writes to a database at a time
+
+Cron runs of refresh_data_incremental.py, a manual `refresh_data.py
+--save-to-db` and a `--rebuild` shadow swap can all target the same
+database. Run concurrently they fight for the SQLite write lock, and an
+incremental save that lands while a rebuild is being built is silently
+lost when the shadow file is swapped in.
+
+The lock is an advisory fcntl.flock() on a file next to the database. The
+kernel drops it when the holding process exits, so a crashed or killed
+refresh never leaves a stale lock behind. The holder writes its PID and
+start time into the file for diagnostics only.
+
+Example:
+    with IngestLock(lock_path_for(db_path)):
+        save_all_to_db(urls)
+"""
+
+import fcntl
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+
+
+class IngestLockHeld(RuntimeError):
+    """Another process is already ingesting into this database"""
+
+    def __init__(self, lock_path: Path, holder: dict | None):
+        self.lock_path = lock_path
+        self.holder = holder
+        detail = ''
+        if holder:
+            detail = f" by PID {holder.get('pid')} since {holder.get('started_at')}"
+        super().__init__(f"Ingest lock {lock_path} is held{detail}")
+
+
+def lock_path_for(db_path: Path) -> Path:
+    """Lock file lives next to the database it protects"""
+    db_path = Path(db_path)
+    return db_path.with_name(db_path.name + '.ingest.lock')
+
+
+class IngestLock:
+    """Cross-process exclusive lock around a refresh run"""
+
+    def __init__(self, lock_path: Path, wait: bool = False):
+        """
+        Args:
+            lock_path: Lock file (see lock_path_for)
+            wait: Block until the lock is free instead of raising IngestLockHeld
+        """
+        self.lock_path = Path(lock_path)
+        self.wait = wait
+        self._fd: int | None = None
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+    @property
+    def held(self) -> bool:
+        return self._fd is not None
+
+    def acquire(self) -> None:
+        """Take the lock; raises IngestLockHeld if busy and wait is False"""
+        if self.held:
+            return
+        self.lock_path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX if self.wait else fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            raise IngestLockHeld(self.lock_path, read_holder(self.lock_path)) from None
+
+        holder = json.dumps({'pid': os.getpid(), 'started_at': datetime.now().isoformat(timespec='seconds')})
+        os.ftruncate(fd, 0)
+        os.pwrite(fd, holder.encode(), 0)
+        self._fd = fd
+
+    def release(self) -> None:
+        """Release the lock (the file itself is left in place)"""
+        if self._fd is None:
+            return
+        # Clear the holder before unlocking so nobody reads stale details
+        os.ftruncate(self._fd, 0)
+        fcntl.flock(self._fd, fcntl.LOCK_UN)
+        os.close(self._fd)
+        self._fd = None
+
+
+def read_holder(lock_path: Path) -> dict | None:
+    """PID and start time written by the current holder, if any"""
+    try:
+        return json.loads(Path(lock_path).read_text()) or None
+    except (OSError, ValueError):
+        return None
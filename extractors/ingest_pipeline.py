@@ -0,0 +1,274 @@
+"""
+Ingest Pipeline - staged fetch → parse → save for full rebuilds
+
+Runs the three ingestion stages concurrently instead of strictly in
+sequence per bulletin:
+
+1. Fetch: a pool of I/O-bound threads loads pages (network or saved_pages)
+2. Parse: a process pool turns HTML into cutoff rows (CPU-bound)
+3. Save: a single writer (the calling thread) commits rows in batches
+
+Stages are connected by bounded queues, so a fast stage blocks instead of
+buffering the whole corpus in memory. A full rebuild therefore runs at
+roughly the speed of its slowest stage rather than the sum of all three.
+
+This module does not touch Django; the writer callable is injected so
+worker processes never need to boot the ORM.
+"""
+
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, replace
+from typing import Callable
+
+from extractors.bulletin_extractor import ParsedBulletin, parse_bulletin
+from lib.publication_data import PublicationData
+
+# Marks the end of a queue's input
+_DONE = object()
+
+
+@dataclass
+class StageStats:
+    """Throughput and backpressure counters for one pipeline stage"""
+    name: str
+    workers: int
+    items: int = 0
+    errors: int = 0
+    busy_seconds: float = 0.0
+    max_queue_depth: int = 0
+    queue_depth_total: int = 0
+    queue_samples: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def record(self, seconds: float, ok: bool = True) -> None:
+        """Record one processed item (thread-safe)"""
+        with self._lock:
+            self.busy_seconds += seconds
+            if ok:
+                self.items += 1
+            else:
+                self.errors += 1
+
+    def sample_queue(self, depth: int) -> None:
+        """Record the depth of this stage's output queue after a put"""
+        with self._lock:
+            self.max_queue_depth = max(self.max_queue_depth, depth)
+            self.queue_depth_total += depth
+            self.queue_samples += 1
+
+    @property
+    def avg_queue_depth(self) -> float:
+        return self.queue_depth_total / self.queue_samples if self.queue_samples else 0.0
+
+    def throughput(self, wall_seconds: float) -> float:
+        """Items per second of pipeline wall time"""
+        return self.items / wall_seconds if wall_seconds > 0 else 0.0
+
+    def capacity(self) -> float:
+        """Items per second this stage could sustain if never starved"""
+        if self.busy_seconds <= 0:
+            return 0.0
+        return self.items * self.workers / self.busy_seconds
+
+
+@dataclass
+class PipelineReport:
+    """Result of a pipeline run"""
+    wall_seconds: float
+    stages: list[StageStats]
+    errors: list[tuple[str, str]]
+
+    @property
+    def saved(self) -> int:
+        return self.stages[-1].items
+
+    def format(self) -> str:
+        """Human-readable per-stage summary"""
+        lines = [
+            f"Pipeline finished in {self.wall_seconds:.1f}s "
+            f"({self.saved} bulletins saved, {len(self.errors)} errors)",
+            f"  {'stage':<7} {'workers':>7} {'items':>6} {'items/s':>8} "
+            f"{'capacity/s':>10} {'max queue':>9} {'avg queue':>9}",
+        ]
+        for stage in self.stages:
+            lines.append(
+                f"  {stage.name:<7} {stage.workers:>7} {stage.items:>6} "
+                f"{stage.throughput(self.wall_seconds):>8.1f} {stage.capacity():>10.1f} "
+                f"{stage.max_queue_depth:>9} {stage.avg_queue_depth:>9.1f}"
+            )
+        return "\n".join(lines)
+
+
+def parse_publication(publication_data: PublicationData) -> ParsedBulletin:
+    """
+    Parse stage worker (runs in a child process)
+
+    Returns the rows with a content-free copy of publication_data so that
+    only the small result is pickled back to the parent.
+    """
+    parsed = parse_bulletin(publication_data)
+    light_data = PublicationData(publication_data.url, '', publication_data.publication_date)
+    return replace(parsed, publication_data=light_data)
+
+
+class IngestPipeline:
+    """
+    Staged bulletin ingestion with bounded queues
+
+    Example:
+        pipeline = IngestPipeline(fetch=load_publication_data, save_batch=save_batch)
+        report = pipeline.run(publication_urls)
+        print(report.format())
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[str], PublicationData],
+        save_batch: Callable[[list[ParsedBulletin]], None],
+        fetch_workers: int = 4,
+        parse_workers: int | None = None,
+        batch_size: int = 12,
+        queue_size: int = 16,
+    ):
+        """
+        Args:
+            fetch: Loads one bulletin URL into a PublicationData (thread-safe)
+            save_batch: Persists a batch of parsed bulletins in one transaction;
+                only ever called from the thread that calls run()
+            fetch_workers: Number of fetch threads
+            parse_workers: Number of parser processes (default: CPU count)
+            batch_size: Bulletins per writer commit
+            queue_size: Capacity of each inter-stage queue
+        """
+        self.fetch = fetch
+        self.save_batch = save_batch
+        self.fetch_workers = fetch_workers
+        self.parse_workers = parse_workers or os.cpu_count() or 1
+        self.batch_size = batch_size
+        self.queue_size = queue_size
+
+    def run(self, publication_urls: list[str]) -> PipelineReport:
+        """Run all stages to completion and return per-stage statistics"""
+        url_queue: queue.Queue = queue.Queue()
+        fetched_queue: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        parsed_queue: queue.Queue = queue.Queue(maxsize=self.queue_size)
+
+        fetch_stats = StageStats('fetch', self.fetch_workers)
+        parse_stats = StageStats('parse', self.parse_workers)
+        save_stats = StageStats('save', 1)
+        errors: list[tuple[str, str]] = []
+        errors_lock = threading.Lock()
+
+        def record_error(url: str, exc: Exception) -> None:
+            with errors_lock:
+                errors.append((url, f"{type(exc).__name__}: {exc}"))
+
+        for url in publication_urls:
+            url_queue.put(url)
+
+        def fetch_worker():
+            while True:
+                try:
+                    url = url_queue.get_nowait()
+                except queue.Empty:
+                    return
+                started = time.perf_counter()
+                try:
+                    publication_data = self.fetch(url)
+                except Exception as e:
+                    fetch_stats.record(time.perf_counter() - started, ok=False)
+                    record_error(url, e)
+                    continue
+                fetch_stats.record(time.perf_counter() - started)
+                fetched_queue.put(publication_data)
+                fetch_stats.sample_queue(fetched_queue.qsize())
+
+        def parse_worker(pool: ProcessPoolExecutor):
+            # One driver thread per process keeps exactly parse_workers pages
+            # in flight and blocks on parsed_queue when the writer lags
+            while True:
+                publication_data = fetched_queue.get()
+                if publication_data is _DONE:
+                    return
+                started = time.perf_counter()
+                try:
+                    parsed = pool.submit(parse_publication, publication_data).result()
+                except Exception as e:
+                    parse_stats.record(time.perf_counter() - started, ok=False)
+                    record_error(publication_data.url, e)
+                    continue
+                parse_stats.record(time.perf_counter() - started)
+                parsed_queue.put(parsed)
+                parse_stats.sample_queue(parsed_queue.qsize())
+
+        started = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=self.parse_workers) as pool:
+            fetchers = [threading.Thread(target=fetch_worker, daemon=True)
+                        for _ in range(self.fetch_workers)]
+            parsers = [threading.Thread(target=parse_worker, args=(pool,), daemon=True)
+                       for _ in range(self.parse_workers)]
+
+            def close_stages():
+                # Propagate end-of-input downstream once each stage drains
+                for thread in fetchers:
+                    thread.join()
+                for _ in parsers:
+                    fetched_queue.put(_DONE)
+                for thread in parsers:
+                    thread.join()
+                parsed_queue.put(_DONE)
+
+            for thread in fetchers + parsers:
+                thread.start()
+            closer = threading.Thread(target=close_stages, daemon=True)
+            closer.start()
+
+            self._run_writer(parsed_queue, save_stats, record_error)
+            closer.join()
+
+        return PipelineReport(
+            wall_seconds=time.perf_counter() - started,
+            stages=[fetch_stats, parse_stats, save_stats],
+            errors=errors,
+        )
+
+    def _run_writer(self, parsed_queue: queue.Queue, stats: StageStats, record_error) -> None:
+        """Single DB writer: drain parsed_queue and commit in batches"""
+        batch: list[ParsedBulletin] = []
+        while True:
+            parsed = parsed_queue.get()
+            if parsed is not _DONE:
+                batch.append(parsed)
+                # Commit early when the queue runs dry so rows don't sit in memory
+                if len(batch) < self.batch_size and not parsed_queue.empty():
+                    continue
+            if batch:
+                self._save(batch, stats, record_error)
+                batch = []
+            if parsed is _DONE:
+                return
+
+    def _save(self, batch: list[ParsedBulletin], stats: StageStats, record_error) -> None:
+        """Save a batch; on failure retry bulletins one at a time to isolate errors"""
+        started = time.perf_counter()
+        try:
+            self.save_batch(batch)
+        except Exception:
+            elapsed = (time.perf_counter() - started) / len(batch)
+            for parsed in batch:
+                item_started = time.perf_counter()
+                try:
+                    self.save_batch([parsed])
+                except Exception as e:
+                    stats.record(elapsed + time.perf_counter() - item_started, ok=False)
+                    record_error(parsed.publication_data.url, e)
+                else:
+                    stats.record(elapsed + time.perf_counter() - item_started)
+            return
+        elapsed = (time.perf_counter() - started) / len(batch)
+        for _ in batch:
+            stats.record(elapsed)
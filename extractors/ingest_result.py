@@ -0,0 +1,58 @@
+"""
+Ingest Result - structured outcome of saving one bulletin
+
+Returned by the bulletin writers instead of a bare Bulletin so callers can
+log and report what actually changed without re-parsing the page.
+"""
+
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Any
+
+
+@dataclass
+class IngestResult:
+    """What happened when one bulletin was written to the database"""
+    publication_date: date
+    url: str | None
+    bulletin_created: bool
+    rows_inserted: int
+    rows_updated: int
+    rows_unchanged: int
+    tables_by_type: dict[str, int]
+    parse_path: str
+    timings: dict[str, float] = field(default_factory=dict)
+    queries: int | None = None
+    bulletin: Any = field(default=None, repr=False, compare=False)
+
+    @property
+    def total_rows(self) -> int:
+        """Cutoff rows present for this bulletin after the write"""
+        return self.rows_inserted + self.rows_updated + self.rows_unchanged
+
+    @property
+    def changed(self) -> bool:
+        return self.bulletin_created or self.rows_inserted > 0 or self.rows_updated > 0
+
+    def to_dict(self) -> dict:
+        """JSON-serializable form for run reports"""
+        return {
+            'publication_date': self.publication_date.isoformat(),
+            'url': self.url,
+            'bulletin_created': self.bulletin_created,
+            'rows_inserted': self.rows_inserted,
+            'rows_updated': self.rows_updated,
+            'rows_unchanged': self.rows_unchanged,
+            'tables_by_type': self.tables_by_type,
+            'parse_path': self.parse_path,
+            'timings': {phase: round(seconds, 4) for phase, seconds in self.timings.items()},
+            'queries': self.queries,
+        }
+
+    def summary(self) -> str:
+        """One-line human-readable summary"""
+        return (
+            f"{self.total_rows} records ({self.rows_inserted} new, "
+            f"{self.rows_updated} updated, {self.rows_unchanged} unchanged; "
+            f"{self.parse_path} parser, {sum(self.tables_by_type.values())} tables)"
+        )
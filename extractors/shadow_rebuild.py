@@ -0,0 +1,258 @@
+"""
+Shadow Rebuild - rebuild the database off to the side and swap it in
+
+A full rebuild written straight into the live database leaves readers
+looking at half-imported data and fights the web workers for locks.
+Instead we:
+
+1. Build a fresh SQLite file next to the live one, with durability
+   PRAGMAs relaxed (a crash only loses the shadow, never live data)
+2. Validate it: row counts and a spot-check of known cutoff dates
+3. Atomically rename it over the live file
+
+Web workers keep persistent connections, but each records the inode of
+the file it opened; Django's per-request health check drops a handle on
+the replaced file, so the next request after the swap reads the new file
+without a restart (django_config/sqlite_backend).
+
+Note: os.replace() needs the database *directory* on one filesystem; a
+single-file Docker bind mount of visa_bulletin.db cannot be replaced.
+"""
+
+import os
+import sqlite3
+from dataclasses import dataclass
+from datetime import date
+from functools import partial
+from pathlib import Path
+
+from django.core.management import call_command
+from django.db import connections
+
+from extractors.bulletin_handler import save_parsed_bulletins
+from extractors.ingest_pipeline import IngestPipeline, PipelineReport
+from extractors.sqlite_writer import SQLiteBulletinWriter
+from lib.dataset_version import bump_dataset_version
+
+SHADOW_ALIAS = 'shadow'
+
+# Nobody else can see the shadow file yet: trade durability for speed
+SHADOW_PRAGMAS = ('journal_mode=OFF', 'synchronous=OFF', 'temp_store=MEMORY')
+
+# (publication_date, visa_category, visa_class, action_type, country, cutoff_date)
+# Values checked by hand against the published bulletins
+KNOWN_CUTOFFS = [
+    (date(2023, 3, 1), 'family_sponsored', 'F1', 'final_action', 'mexico', date(2001, 4, 1)),
+    (date(2021, 10, 1), 'employment_based', '2nd', 'final_action', 'india', date(2011, 9, 1)),
+    (date(2017, 2, 1), 'family_sponsored', 'F4', 'final_action', 'philippines', date(1993, 6, 22)),
+    (date(2005, 1, 1), 'family_sponsored', 'F4', 'final_action', 'india', date(1992, 4, 8)),
+]
+
+
+@dataclass
+class TableCounts:
+    """Row counts used to compare shadow and live databases"""
+    bulletins: int
+    cutoff_dates: int
+
+
+def shadow_path_for(live_path: Path) -> Path:
+    """Shadow file lives in the same directory so os.replace() is atomic"""
+    return live_path.with_name(live_path.name + '.shadow')
+
+
+def open_shadow_database(shadow_path: Path) -> str:
+    """
+    Create an empty shadow database and register it as a Django alias
+    
+    Returns:
+        The database alias to pass as `using=`
+    """
+    for suffix in ('', '-wal', '-shm', '-journal'):
+        Path(f"{shadow_path}{suffix}").unlink(missing_ok=True)
+    
+    shadow_settings = connections.settings['default'].copy()
+    shadow_settings['NAME'] = shadow_path
+    connections.settings[SHADOW_ALIAS] = shadow_settings
+    
+    create_schema(SHADOW_ALIAS)
+    
+    with connections[SHADOW_ALIAS].cursor() as cursor:
+        for pragma in SHADOW_PRAGMAS:
+            cursor.execute(f'PRAGMA {pragma};')
+    return SHADOW_ALIAS
+
+
+def create_schema(alias: str) -> None:
+    """
+    Create the application tables in an empty database
+    
+    Runs the real migrations so the swapped-in file carries its migration
+    history and later `migrate` runs apply cleanly.
+    """
+    call_command('migrate', database=alias, interactive=False, verbosity=0)
+
+
+def build_shadow_database(
+    shadow_path: Path,
+    publication_urls: list[str],
+    fetch,
+    sqlite_writer: bool = False
+) -> PipelineReport:
+    """
+    Run the ingest pipeline into a fresh shadow database
+    
+    Args:
+        shadow_path: Shadow database file to create
+        publication_urls: Bulletins to ingest
+        fetch: Loads one URL into a PublicationData
+        sqlite_writer: Write with the Django-free SQLiteBulletinWriter
+            instead of the ORM
+    """
+    alias = open_shadow_database(shadow_path)
+    if not sqlite_writer:
+        pipeline = IngestPipeline(fetch=fetch, save_batch=partial(save_parsed_bulletins, using=alias))
+        return pipeline.run(publication_urls)
+    
+    with SQLiteBulletinWriter(shadow_path, pragmas=SHADOW_PRAGMAS) as writer:
+        return IngestPipeline(fetch=fetch, save_batch=writer.save_batch).run(publication_urls)
+
+
+def count_rows(db_path: Path) -> TableCounts | None:
+    """Row counts of an existing database file, or None if it has no data yet"""
+    if not db_path.exists():
+        return None
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        bulletins = conn.execute('SELECT COUNT(*) FROM bulletin').fetchone()[0]
+        cutoff_dates = conn.execute('SELECT COUNT(*) FROM visa_cutoff_date').fetchone()[0]
+    except sqlite3.OperationalError:
+        return None
+    finally:
+        conn.close()
+    return TableCounts(bulletins, cutoff_dates)
+
+
+def validate_shadow_database(
+    shadow_path: Path,
+    report: PipelineReport,
+    live_counts: TableCounts | None
+) -> list[str]:
+    """
+    Check the shadow database before it replaces the live one
+    
+    Returns:
+        List of problems; empty if the shadow is safe to swap in
+    """
+    problems = [f"{url}: {error}" for url, error in report.errors]
+    
+    counts = count_rows(shadow_path)
+    if counts is None or counts.bulletins == 0 or counts.cutoff_dates == 0:
+        return problems + ["shadow database is empty"]
+    if counts.bulletins != report.saved:
+        problems.append(f"expected {report.saved} bulletins, found {counts.bulletins}")
+    if live_counts:
+        if counts.bulletins < live_counts.bulletins:
+            problems.append(f"bulletins shrank: {live_counts.bulletins} → {counts.bulletins}")
+        if counts.cutoff_dates < live_counts.cutoff_dates:
+            problems.append(f"cutoff rows shrank: {live_counts.cutoff_dates} → {counts.cutoff_dates}")
+    
+    conn = sqlite3.connect(f"file:{shadow_path}?mode=ro", uri=True)
+    try:
+        for pub_date, category, visa_class, action_type, country, expected in KNOWN_CUTOFFS:
+            has_bulletin = conn.execute(
+                'SELECT 1 FROM bulletin WHERE publication_date = ?', (pub_date.isoformat(),)
+            ).fetchone()
+            if not has_bulletin:
+                continue
+            row = conn.execute(
+                'SELECT v.cutoff_date FROM visa_cutoff_date v '
+                'JOIN bulletin b ON b.id = v.bulletin_id '
+                'WHERE b.publication_date = ? AND v.visa_category = ? AND v.visa_class = ? '
+                'AND v.action_type = ? AND v.country = ?',
+                (pub_date.isoformat(), category, visa_class, action_type, country)
+            ).fetchone()
+            actual = row[0] if row else None
+            if actual != expected.isoformat():
+                problems.append(
+                    f"{pub_date:%B %Y} {visa_class} {country} {action_type}: "
+                    f"expected {expected}, found {actual}"
+                )
+    finally:
+        conn.close()
+    
+    return problems
+
+
+def read_dataset_version(db_path: Path) -> int:
+    """Dataset version of an existing database file (0 if it has none)"""
+    if not db_path.exists():
+        return 0
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        row = conn.execute('SELECT version FROM dataset_version').fetchone()
+    except sqlite3.OperationalError:
+        return 0
+    finally:
+        conn.close()
+    return row[0] if row else 0
+
+
+def continue_dataset_version(live_path: Path, alias: str = SHADOW_ALIAS) -> int:
+    """
+    Move the shadow's dataset version past the live one
+    
+    The shadow counts from zero, so without this the swap would take the
+    version backwards and caches keyed on it could serve stale pages.
+    
+    Returns:
+        The shadow's new version
+    """
+    return bump_dataset_version(using=alias, after=read_dataset_version(live_path))
+
+
+def finalize_shadow_database(alias: str = SHADOW_ALIAS) -> None:
+    """Make the shadow durable and WAL-ready, then release it"""
+    connection = connections[alias]
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA synchronous=FULL;')
+        cursor.execute('PRAGMA journal_mode=WAL;')
+        cursor.execute('PRAGMA wal_checkpoint(TRUNCATE);')
+    connection.close()
+
+
+def swap_into_place(shadow_path: Path, live_path: Path) -> None:
+    """
+    Atomically replace the live database with the shadow
+    
+    The live WAL is checkpointed and truncated first. The old file's
+    -wal/-shm belong to its inode, so once the rename is done they are
+    replaced by the shadow's (if it still has any) or removed: a new
+    connection must never adopt the old wal-index. Readers with an open
+    connection finish on the old inode and its unlinked files; every new
+    connection sees the new database.
+    """
+    if live_path.exists():
+        live = sqlite3.connect(live_path, timeout=20)
+        try:
+            live.execute('PRAGMA wal_checkpoint(TRUNCATE);')
+        finally:
+            live.close()
+    
+    with open(shadow_path, 'rb') as f:
+        os.fsync(f.fileno())
+    os.replace(shadow_path, live_path)
+    for suffix in ('-wal', '-shm'):
+        shadow_side = Path(f"{shadow_path}{suffix}")
+        live_side = Path(f"{live_path}{suffix}")
+        if shadow_side.exists():
+            os.replace(shadow_side, live_side)
+        else:
+            live_side.unlink(missing_ok=True)
+    
+    # Persist the rename itself
+    dir_fd = os.open(live_path.parent, os.O_RDONLY)
+    try:
+        os.fsync(dir_fd)
+    finally:
+        os.close(dir_fd)
@@ -0,0 +1,279 @@
+"""
+SQLite Writer - Django-free bulk writer for parsed bulletins
+
+Writes the flat rows produced by BulletinExtractor.extract_rows_from_table()
+straight into the SQLite database with prepared statements and
+executemany(), without booting Django or building model instances.
+
+Semantics match extractors.bulletin_handler.save_parsed_bulletin():
+existing rows are diffed in memory, only new rows are inserted and only
+changed rows are updated, the bulletin's point in each affected
+visa_series row is refreshed, the dataset version is bumped in the same
+transaction, and the same IngestResult is returned. The
+schema must already exist (`python manage.py migrate`).
+
+Example:
+    with SQLiteBulletinWriter(db_path) as writer:
+        results = writer.save_batch(parsed_bulletins)
+"""
+
+import sqlite3
+import time
+from contextlib import contextmanager
+from datetime import date, datetime, timezone
+from pathlib import Path
+
+from extractors.bulletin_extractor import CUTOFF_ROW_COLUMNS, CUTOFF_VALUE_COLUMNS, ParsedBulletin
+from extractors.ingest_result import IngestResult
+from extractors.write_throttle import WriteThrottle
+from lib.bulletin_url import resolve_bulletin_url
+from lib.series_codec import (
+    SERIES_KEY_COLUMNS,
+    SERIES_ROW_COLUMNS,
+    SERIES_VALUE_COLUMNS,
+    series_changes,
+    series_updates,
+)
+
+# Key columns of a cutoff row (matches the model's unique_together)
+KEY_COLUMNS = ('visa_category', 'visa_class', 'action_type', 'country')
+
+# Columns compared to decide whether an existing row changed
+VALUE_COLUMNS = ('canonical_class', *CUTOFF_VALUE_COLUMNS)
+
+_KEY_INDEXES = tuple(CUTOFF_ROW_COLUMNS.index(name) for name in KEY_COLUMNS)
+_VALUE_INDEXES = tuple(CUTOFF_ROW_COLUMNS.index(name) for name in VALUE_COLUMNS)
+
+# Live database: WAL so web readers keep reading during ingest
+WRITER_PRAGMAS = ('journal_mode=WAL', 'synchronous=NORMAL', 'foreign_keys=ON')
+
+_SELECT_BULLETIN = 'SELECT id, url FROM bulletin WHERE publication_date = ?'
+_INSERT_BULLETIN = 'INSERT INTO bulletin (publication_date, url, fetched_at) VALUES (?, ?, ?)'
+_UPDATE_BULLETIN_URL = 'UPDATE bulletin SET url = ? WHERE id = ?'
+_UPDATE_ROWS_BULLETIN_URL = 'UPDATE visa_cutoff_date SET bulletin_url = ? WHERE bulletin_id = ?'
+_SELECT_ROWS = (
+    f"SELECT id, {', '.join(KEY_COLUMNS + VALUE_COLUMNS)} "
+    f"FROM visa_cutoff_date WHERE bulletin_id = ?"
+)
+# Bulletin-level values are denormalized onto every row
+_INSERT_ROW = (
+    f"INSERT INTO visa_cutoff_date (bulletin_id, publication_date, bulletin_url, "
+    f"{', '.join(CUTOFF_ROW_COLUMNS)}) "
+    f"VALUES (?, ?, ?, {', '.join('?' for _ in CUTOFF_ROW_COLUMNS)})"
+)
+_UPDATE_ROW = (
+    f"UPDATE visa_cutoff_date SET {', '.join(f'{name} = ?' for name in VALUE_COLUMNS)} "
+    f"WHERE id = ?"
+)
+_SELECT_SERIES_ROWS = (
+    f"SELECT {', '.join(SERIES_ROW_COLUMNS)} FROM visa_cutoff_date "
+    f"WHERE bulletin_id = ? AND canonical_class != ''"
+)
+_SERIES_KEY_MATCH = ' AND '.join(f'{name} = ?' for name in SERIES_KEY_COLUMNS)
+_SELECT_SERIES = f"SELECT {', '.join(SERIES_VALUE_COLUMNS)} FROM visa_series WHERE {_SERIES_KEY_MATCH}"
+_UPSERT_SERIES = (
+    f"INSERT INTO visa_series ({', '.join(SERIES_KEY_COLUMNS + SERIES_VALUE_COLUMNS)}) "
+    f"VALUES ({', '.join('?' for _ in SERIES_KEY_COLUMNS + SERIES_VALUE_COLUMNS)}) "
+    f"ON CONFLICT ({', '.join(SERIES_KEY_COLUMNS)}) DO UPDATE SET "
+    f"{', '.join(f'{name} = excluded.{name}' for name in SERIES_VALUE_COLUMNS)}"
+)
+_DELETE_SERIES = f"DELETE FROM visa_series WHERE {_SERIES_KEY_MATCH}"
+# Same as lib.dataset_version.bump_dataset_version()
+_BUMP_DATASET_VERSION = (
+    "INSERT INTO dataset_version (id, version, updated_at, latest_bulletin_date) "
+    "VALUES (1, 1, ?, (SELECT MAX(publication_date) FROM bulletin)) "
+    "ON CONFLICT (id) DO UPDATE SET version = version + 1, "
+    "updated_at = excluded.updated_at, latest_bulletin_date = excluded.latest_bulletin_date"
+)
+
+
+class SQLiteBulletinWriter:
+    """Writes parsed bulletins to SQLite with executemany()"""
+
+    def __init__(
+        self,
+        db_path: Path | str,
+        timeout: float = 20.0,
+        pragmas: tuple[str, ...] = WRITER_PRAGMAS,
+        throttle: WriteThrottle | None = None
+    ):
+        """
+        Args:
+            db_path: Path to the SQLite database file
+            timeout: Seconds to wait for a write lock (same as Django settings)
+            pragmas: PRAGMA assignments applied to the connection
+            throttle: Optional limit on how long one transaction holds the
+                write lock; batches are split into several commits
+        """
+        self.db_path = Path(db_path)
+        self.throttle = throttle or WriteThrottle()
+        # (bulletin id, publication date, previous series keys) saved in the open transaction
+        self._pending_series: list[tuple[int, date, set[tuple]]] = []
+        # Autocommit mode: transactions are explicit BEGIN/COMMIT below
+        self.connection = sqlite3.connect(self.db_path, timeout=timeout, isolation_level=None)
+        for pragma in pragmas:
+            self.connection.execute(f'PRAGMA {pragma};')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def save(self, parsed: ParsedBulletin) -> IngestResult:
+        """Save one parsed bulletin in its own transaction"""
+        return self.save_batch([parsed])[0]
+
+    def save_batch(self, parsed_bulletins: list[ParsedBulletin]) -> list[IngestResult]:
+        """
+        Save a batch of parsed bulletins in a single transaction
+
+        Drop-in save_batch for extractors.ingest_pipeline.IngestPipeline.
+        With a throttle the batch may be committed in several transactions.
+
+        Returns:
+            List of IngestResult objects, in batch order
+        """
+        cursor = self.connection.cursor()
+        return self.throttle.run(
+            parsed_bulletins, self._transaction, lambda parsed: self._save(cursor, parsed)
+        )
+
+    @contextmanager
+    def _transaction(self):
+        # IMMEDIATE takes the write lock up front instead of failing on upgrade
+        self.connection.execute('BEGIN IMMEDIATE')
+        try:
+            yield
+            # Series touched by the transaction's bulletins are rewritten once,
+            # and the dataset version moves with them
+            if self._pending_series:
+                cursor = self.connection.cursor()
+                self._refresh_series(cursor)
+                cursor.execute(_BUMP_DATASET_VERSION, (_utc_now(),))
+        except BaseException:
+            self.connection.execute('ROLLBACK')
+            raise
+        finally:
+            self._pending_series.clear()
+        self.connection.execute('COMMIT')
+
+    def _save(self, cursor: sqlite3.Cursor, parsed: ParsedBulletin) -> IngestResult:
+        started = time.perf_counter()
+        publication_data = parsed.publication_data
+        publication_date = publication_data.publication_date.date()
+
+        bulletin = cursor.execute(_SELECT_BULLETIN, (publication_date.isoformat(),)).fetchone()
+        created = bulletin is None
+        url_filled = False
+        if created:
+            url = publication_data.url
+            cursor.execute(_INSERT_BULLETIN, (publication_date.isoformat(), url, _utc_now()))
+            bulletin_id = cursor.lastrowid
+        else:
+            bulletin_id, url = bulletin
+            # Update URL if bulletin exists but URL is missing
+            url_filled = not url and bool(publication_data.url)
+            if url_filled:
+                url = publication_data.url
+                cursor.execute(_UPDATE_BULLETIN_URL, (url, bulletin_id))
+                cursor.execute(_UPDATE_ROWS_BULLETIN_URL, (url, bulletin_id))
+
+        # Later rows win, matching the ORM writer
+        incoming = {}
+        for row in map(_to_db, parsed.rows):
+            incoming[tuple(row[i] for i in _KEY_INDEXES)] = row
+        key_width = len(KEY_COLUMNS)
+        existing = {} if created else {
+            tuple(stored[1:1 + key_width]): (stored[0], stored[1 + key_width:])
+            for stored in cursor.execute(_SELECT_ROWS, (bulletin_id,))
+        }
+
+        bulletin_columns = (bulletin_id, publication_date.isoformat(), resolve_bulletin_url(publication_date, url))
+        to_insert = []
+        to_update = []
+        unchanged = 0
+        for key, row in incoming.items():
+            stored = existing.get(key)
+            values = tuple(row[i] for i in _VALUE_INDEXES)
+            if stored is None:
+                to_insert.append((*bulletin_columns, *row))
+            elif stored[1] != values:
+                to_update.append((*values, stored[0]))
+            else:
+                unchanged += 1
+
+        cursor.executemany(_INSERT_ROW, to_insert)
+        cursor.executemany(_UPDATE_ROW, to_update)
+        if to_insert or to_update or url_filled:
+            # Series the rows fed before the updates above (KEY_COLUMNS and
+            # VALUE_COLUMNS order to SERIES_KEY_COLUMNS order)
+            previous_series = {
+                (key[0], key[3], key[2], values[0])
+                for key, (_, values) in existing.items() if values[0]
+            }
+            self._pending_series.append((bulletin_id, publication_date, previous_series))
+
+        return IngestResult(
+            publication_date=publication_date,
+            url=url,
+            bulletin_created=created,
+            rows_inserted=len(to_insert),
+            rows_updated=len(to_update),
+            rows_unchanged=unchanged,
+            tables_by_type=parsed.tables_by_type,
+            parse_path=parsed.parse_path,
+            timings={**parsed.timings, 'save': time.perf_counter() - started},
+        )
+
+    def _refresh_series(self, cursor: sqlite3.Cursor) -> None:
+        """Same as lib.series_store.refresh_bulletin_series(), in SQL"""
+        rows = []
+        previous_keys = {}
+        for bulletin_id, publication_date, previous_series in self._pending_series:
+            rows.extend(map(_from_db_series_row, cursor.execute(_SELECT_SERIES_ROWS, (bulletin_id,))))
+            previous_keys.setdefault(publication_date, set()).update(previous_series)
+        updates = series_updates(rows, previous_keys)
+
+        stored = {}
+        for key in updates:
+            packed = cursor.execute(_SELECT_SERIES, key).fetchone()
+            if packed is not None:
+                stored[key] = dict(zip(SERIES_VALUE_COLUMNS, packed))
+
+        to_write, to_delete = series_changes(updates, stored)
+        cursor.executemany(_UPSERT_SERIES, [
+            (*key, *_to_db(tuple(columns[name] for name in SERIES_VALUE_COLUMNS)))
+            for key, columns in to_write.items()
+        ])
+        cursor.executemany(_DELETE_SERIES, to_delete)
+
+
+def _to_db(row: tuple) -> tuple:
+    """Convert a flat row to the values SQLite stores (ISO dates, 0/1 booleans)"""
+    return tuple(
+        value.isoformat() if isinstance(value, date)
+        else int(value) if isinstance(value, bool)
+        else value
+        for value in row
+    )
+
+
+def _from_db_series_row(row: tuple) -> tuple:
+    """Parse the ISO dates of a row in SERIES_ROW_COLUMNS order"""
+    publication_date, cutoff_date = row[4], row[6]
+    return (
+        *row[:4],
+        date.fromisoformat(publication_date),
+        row[5],
+        date.fromisoformat(cutoff_date) if cutoff_date else None,
+        *row[7:],
+    )
+
+
+def _utc_now() -> str:
+    """Timestamp in the format Django stores for DateTimeField with USE_TZ"""
+    return str(datetime.now(timezone.utc).replace(tzinfo=None))
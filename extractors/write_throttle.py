@@ -0,0 +1,98 @@
+"""
+Write Throttle - bound how long an ingest holds the SQLite write lock
+
+WAL lets dashboard readers run alongside the writer, but a long ingest
+transaction still hurts them: the WAL grows until the next checkpoint,
+the checkpoint cannot finish while readers are active, and on a small
+host the writer simply takes the CPU the readers need.
+
+A WriteThrottle splits a batch of bulletins into several transactions.
+The writer commits as soon as a transaction has been open for
+max_hold_seconds and then sleeps for pause_seconds before taking the lock
+again. Bulletins are never split, so readers never see half a bulletin;
+a batch is no longer all-or-nothing, which is safe because every save is
+idempotent.
+
+Configured from the environment (milliseconds):
+    INGEST_MAX_LOCK_HOLD_MS  Commit once a transaction is this old (unset = whole batch)
+    INGEST_LOCK_PAUSE_MS     Sleep between transactions (default 0)
+"""
+
+import os
+import time
+from dataclasses import dataclass
+from typing import Callable, ContextManager, TypeVar
+
+T = TypeVar('T')
+R = TypeVar('R')
+
+
+@dataclass
+class WriteThrottle:
+    """Chunked-commit policy plus counters for what it did"""
+    max_hold_seconds: float | None = None
+    pause_seconds: float = 0.0
+    transactions: int = 0
+    longest_hold_seconds: float = 0.0
+    paused_seconds: float = 0.0
+
+    @classmethod
+    def from_env(cls) -> 'WriteThrottle':
+        max_hold_ms = os.environ.get('INGEST_MAX_LOCK_HOLD_MS')
+        pause_ms = os.environ.get('INGEST_LOCK_PAUSE_MS', '0')
+        return cls(
+            max_hold_seconds=float(max_hold_ms) / 1000 if max_hold_ms else None,
+            pause_seconds=float(pause_ms) / 1000,
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_hold_seconds is not None
+
+    def run(
+        self,
+        items: list[T],
+        transaction: Callable[[], ContextManager],
+        save: Callable[[T], R]
+    ) -> list[R]:
+        """
+        Save items in as many transactions as the hold limit requires
+
+        Args:
+            items: Things to save, in order
+            transaction: Returns a context manager that commits on exit
+                (e.g. partial(django.db.transaction.atomic, using=alias))
+            save: Saves one item inside the open transaction
+
+        Returns:
+            Results of save(), in item order
+        """
+        results: list[R] = []
+        remaining = iter(items)
+        pending = len(items)
+        while pending:
+            if results and self.pause_seconds:
+                time.sleep(self.pause_seconds)
+                self.paused_seconds += self.pause_seconds
+            started = time.perf_counter()
+            with transaction():
+                while pending:
+                    results.append(save(next(remaining)))
+                    pending -= 1
+                    if self.enabled and time.perf_counter() - started >= self.max_hold_seconds:
+                        break
+            self._record_hold(time.perf_counter() - started)
+        return results
+
+    def _record_hold(self, seconds: float) -> None:
+        self.transactions += 1
+        self.longest_hold_seconds = max(self.longest_hold_seconds, seconds)
+
+    def summary(self) -> str:
+        """One-line human-readable summary"""
+        limit = f"{self.max_hold_seconds * 1000:.0f}ms" if self.enabled else "none"
+        return (
+            f"{self.transactions} write transactions, longest hold "
+            f"{self.longest_hold_seconds * 1000:.1f}ms (limit {limit}), "
+            f"paused {self.paused_seconds:.1f}s"
+        )
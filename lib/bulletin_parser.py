@@ -129,23 +129,33 @@ def extract_table_legacy(table):
     return None
 
 
+PARSE_PATH_MODERN = 'modern'  # Underlined table titles (2015+)
+PARSE_PATH_LEGACY = 'legacy'  # Table type in first cell (2001-2015)
+PARSE_PATH_NONE = 'none'      # No recognizable tables
+
+
 def extract_tables(html: str) -> list[Table]:
+    tables, _ = extract_tables_with_path(html)
+    return tables
+
+
+def extract_tables_with_path(html: str) -> tuple[list[Table], str]:
+    """Extract tables and report which parser produced them (PARSE_PATH_*)"""
     soup = BeautifulSoup(html, 'html.parser')
     tables = []
     
     # Try modern format first (2015+)
-    modern_tables_found = False
     for table in soup.find_all('table'):
         extracted_table = extract_table(table)
         if extracted_table:
             tables.append(extracted_table)
-            modern_tables_found = True
+    if tables:
+        return tables, PARSE_PATH_MODERN
     
     # If no modern tables found, try legacy format (2001-2015)
-    if not modern_tables_found:
-        for table in soup.find_all('table'):
-            extracted_table = extract_table_legacy(table)
-            if extracted_table:
-                tables.append(extracted_table)
+    for table in soup.find_all('table'):
+        extracted_table = extract_table_legacy(table)
+        if extracted_table:
+            tables.append(extracted_table)
 
-    return tables
+    return tables, PARSE_PATH_LEGACY if tables else PARSE_PATH_NONE
@@ -0,0 +1,33 @@
+"""Official travel.state.gov URL of a monthly visa bulletin"""
+
+from datetime import date
+
+BULLETIN_URL_PREFIX = 'https://travel.state.gov/content/travel/en/legal/visa-law0/visa-bulletin'
+
+
+def resolve_bulletin_url(publication_date: date, url: str | None = None) -> str:
+    """
+    Stored URL if there is one, otherwise the standard URL for the month
+    
+    Args:
+        publication_date: First day of the publication month
+        url: URL recorded when the bulletin was fetched, if any
+        
+    Returns:
+        Absolute bulletin URL
+        
+    Example:
+        >>> resolve_bulletin_url(date(2025, 12, 1))
+        'https://travel.state.gov/content/travel/en/legal/visa-law0/visa-bulletin/2026/visa-bulletin-for-december-2025.html'
+    """
+    if url:
+        return url
+    
+    # Format: visa-bulletin-for-{month}-{year}.html
+    month_name = publication_date.strftime('%B').lower()  # e.g., "december"
+    year = publication_date.year
+    
+    # Note: The URL uses the fiscal year in the path (typically year+1 for Oct-Dec)
+    fiscal_year = year + 1 if publication_date.month >= 10 else year
+    
+    return f"{BULLETIN_URL_PREFIX}/{fiscal_year}/visa-bulletin-for-{month_name}-{year}.html"
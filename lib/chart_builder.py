@@ -4,8 +4,11 @@ Chart building logic for visa bulletin dashboard
 Creates Plotly charts with historical data and projections.
 """
 
+from dataclasses import dataclass
 from datetime import date
+
 import plotly.graph_objects as go
+from plotly.io.json import to_json_plotly
 
 from models.enums.country import Country
 
@@ -23,6 +26,24 @@ VISA_CLASS_COLORS = [
 ]
 
 
+@dataclass
+class BaseChart:
+    """
+    Priority-date-independent part of a dashboard chart
+    
+    The historical traces and the layout (with its template, the bulk of
+    the JSON) are serialized once per page and dataset version; a request
+    only adds its projection traces and priority date line.
+    """
+    history_json: list[str]
+    layout_json: str
+    trace_info: list[dict]
+    # Per visa class: (label, color, last publication date, last valid cutoff)
+    projection_anchors: list[tuple[str, str, date, date | None]]
+    priority_line_start: date | None = None
+    priority_line_end: date | None = None
+
+
 def build_multi_class_chart_with_projections(
     visa_class_data: list[dict],
     submission_date: date,
@@ -41,72 +62,111 @@ def build_multi_class_chart_with_projections(
     Returns:
         Dict with 'chart_json' and 'trace_info' for checkbox controls
     """
+    base = build_base_chart(visa_class_data, country, category_label)
+    return compose_chart(base, [data.get('projection') for data in visa_class_data], submission_date)
+
+
+def build_base_chart(visa_class_data: list[dict], country: str, category_label: str) -> BaseChart:
+    """
+    Historical traces and layout of a chart (everything but the projections)
+    
+    Args:
+        visa_class_data: List of dicts with visa_class, dates, cutoff_dates, bulletin_urls
+        country: Country code (e.g., 'china', 'all')
+        category_label: Category display name (e.g., 'Family-Sponsored')
+    """
     fig = go.Figure()
     trace_info = []
-    current_trace_idx = 0
-    max_projection_date = None
+    anchors = []
     
-    # Add traces for each visa class
     for idx, data in enumerate(visa_class_data):
         color = VISA_CLASS_COLORS[idx % len(VISA_CLASS_COLORS)]
-        
-        trace_indices, proj_date, current_trace_idx = _add_visa_class_traces(
-            fig, data, color, submission_date, current_trace_idx
-        )
-        
-        if proj_date and (max_projection_date is None or proj_date > max_projection_date):
-            max_projection_date = proj_date
+        visa_class_label = data.get('visa_class_label', data['visa_class'])
+        fig.add_trace(_history_trace(data, visa_class_label, color))
         
         trace_info.append({
             'visa_class': data['visa_class'],
-            'label': data.get('visa_class_label', data['visa_class']),
+            'label': visa_class_label,
             'color': color,
-            'trace_indices': trace_indices
         })
-    
-    # Add priority date line
-    priority_date_trace_idx = current_trace_idx
-    if visa_class_data:
-        _add_priority_date_line(fig, visa_class_data, submission_date, max_projection_date)
+        last_valid_cutoff = next((c for c in reversed(data['cutoff_dates']) if c is not None), None)
+        anchors.append((visa_class_label, color, data['dates'][-1] if data['dates'] else None, last_valid_cutoff))
     
     # Configure layout
     _apply_chart_layout(fig, category_label, country)
+    # Serialized as fig.to_json() does, with '<', '>' and '/' escaped so the
+    # JSON can be inlined in a <script> block
+    figure = fig.to_plotly_json()
+    
+    base = BaseChart(
+        history_json=[to_json_plotly(trace) for trace in figure['data']],
+        layout_json=to_json_plotly(figure['layout']),
+        trace_info=trace_info,
+        projection_anchors=anchors,
+    )
+    if visa_class_data:
+        first_dates = visa_class_data[0]['dates']
+        base.priority_line_start, base.priority_line_end = first_dates[0], first_dates[-1]
+    return base
+
+
+def compose_chart(base: BaseChart, projections: list[dict | None], submission_date: date) -> dict:
+    """
+    Chart data for one priority date from a base chart
+    
+    Args:
+        base: Result of build_base_chart()
+        projections: Projection of each visa class (None where there is none)
+        submission_date: User's application submission date
+    
+    Returns:
+        Dict with 'chart_json' and 'trace_info' for checkbox controls
+    """
+    traces = []
+    trace_info = []
+    current_trace_idx = 0
+    max_projection_date = None
+    
+    # Add traces for each visa class
+    for history, info, anchor, projection in zip(
+        base.history_json, base.trace_info, base.projection_anchors, projections
+    ):
+        traces.append(history)
+        trace_indices = [current_trace_idx]
+        current_trace_idx += 1
+        
+        projection_trace = _projection_trace(anchor, projection, submission_date)
+        if projection_trace:
+            traces.append(to_json_plotly(projection_trace))
+            trace_indices.append(current_trace_idx)
+            current_trace_idx += 1
+            proj_date = projection['estimated_date']
+            if max_projection_date is None or proj_date > max_projection_date:
+                max_projection_date = proj_date
+        
+        trace_info.append({**info, 'trace_indices': trace_indices})
+    
+    # Add priority date line
+    priority_date_trace_idx = current_trace_idx
+    if base.history_json:
+        traces.append(to_json_plotly(_priority_date_line(base, submission_date, max_projection_date)))
     
     return {
-        'chart_json': fig.to_json(),
+        'chart_json': f'{{"data":[{",".join(traces)}],"layout":{base.layout_json}}}',
         'trace_info': trace_info,
         'priority_date_trace_idx': priority_date_trace_idx,
         'submission_date_formatted': submission_date.strftime("%b %d, %Y")
     }
 
 
-def _add_visa_class_traces(
-    fig: go.Figure,
-    data: dict,
-    color: str,
-    submission_date: date,
-    current_idx: int
-) -> tuple[list[int], date | None, int]:
-    """
-    Add historical and projection traces for a single visa class
-    
-    Returns:
-        Tuple of (trace_indices, projection_date, next_trace_idx)
-    """
-    visa_class_label = data.get('visa_class_label', data['visa_class'])
+def _history_trace(data: dict, visa_class_label: str, color: str) -> go.Scatter:
+    """Historical cutoff trace of a single visa class"""
     dates = data['dates']
-    cutoff_dates = data['cutoff_dates']
-    projection = data.get('projection')
     bulletin_urls = data.get('bulletin_urls', [])
-    
-    trace_indices = []
-    projection_date = None
-    
-    # Historical data trace
     customdata = bulletin_urls if bulletin_urls else [None] * len(dates)
-    fig.add_trace(go.Scatter(
+    return go.Scatter(
         x=dates,
-        y=cutoff_dates,
+        y=data['cutoff_dates'],
         mode='lines+markers',
         name=visa_class_label,
         line=dict(color=color, width=2),
@@ -118,48 +178,44 @@ def _add_visa_class_traces(
             f'<b>Priority Date:</b> %{{y|%b %d, %Y}}<br>'
             f'<i>Click to view bulletin</i><extra></extra>'
         )
-    ))
-    trace_indices.append(current_idx)
-    current_idx += 1
-    
-    # Projection trace (if available)
-    if projection and projection.get('estimated_date'):
-        last_valid_cutoff = next((c for c in reversed(cutoff_dates) if c is not None), None)
-        if last_valid_cutoff:
-            projection_date = projection['estimated_date']
-            fig.add_trace(go.Scatter(
-                x=[dates[-1], projection_date],
-                y=[last_valid_cutoff, submission_date],
-                mode='lines+markers',
-                name=f'{visa_class_label} (Projection)',
-                line=dict(color=color, width=2, dash='dash'),
-                marker=dict(size=6, symbol='star'),
-                hovertemplate=f'<b>{visa_class_label}</b><br><b>Estimated:</b> %{{x|%B %Y}}<extra></extra>'
-            ))
-            trace_indices.append(current_idx)
-            current_idx += 1
-    
-    return trace_indices, projection_date, current_idx
+    )
 
 
-def _add_priority_date_line(
-    fig: go.Figure,
-    visa_class_data: list[dict],
-    submission_date: date,
-    max_projection_date: date | None
-) -> None:
-    """Add horizontal line showing user's priority date"""
-    first_dates = visa_class_data[0]['dates']
-    line_end = max_projection_date if max_projection_date else first_dates[-1]
+def _projection_trace(anchor: tuple, projection: dict | None, submission_date: date) -> dict | None:
+    """
+    Projection trace of a single visa class, as Plotly JSON
     
-    fig.add_trace(go.Scatter(
-        x=[first_dates[0], line_end],
-        y=[submission_date, submission_date],
-        mode='lines',
-        name=f'Your Priority Date: {submission_date.strftime("%b %d, %Y")}',
-        line=dict(color='red', width=3, dash='dash'),
-        hovertemplate=f'<b>Your Priority Date:</b> {submission_date.strftime("%b %d, %Y")}<extra></extra>'
-    ))
+    Built as a plain dict: per request this is cheaper than a go.Scatter,
+    and serializes to the same JSON.
+    """
+    visa_class_label, color, last_date, last_valid_cutoff = anchor
+    if not (projection and projection.get('estimated_date')) or not last_valid_cutoff:
+        return None
+    return {
+        'hovertemplate': f'<b>{visa_class_label}</b><br><b>Estimated:</b> %{{x|%B %Y}}<extra></extra>',
+        'line': {'color': color, 'dash': 'dash', 'width': 2},
+        'marker': {'size': 6, 'symbol': 'star'},
+        'mode': 'lines+markers',
+        'name': f'{visa_class_label} (Projection)',
+        'x': [last_date.isoformat(), projection['estimated_date'].isoformat()],
+        'y': [last_valid_cutoff.isoformat(), submission_date.isoformat()],
+        'type': 'scatter',
+    }
+
+
+def _priority_date_line(base: BaseChart, submission_date: date, max_projection_date: date | None) -> dict:
+    """Horizontal line showing user's priority date, as Plotly JSON"""
+    line_end = max_projection_date if max_projection_date else base.priority_line_end
+    label = submission_date.strftime("%b %d, %Y")
+    return {
+        'hovertemplate': f'<b>Your Priority Date:</b> {label}<extra></extra>',
+        'line': {'color': 'red', 'dash': 'dash', 'width': 3},
+        'mode': 'lines',
+        'name': f'Your Priority Date: {label}',
+        'x': [base.priority_line_start.isoformat(), line_end.isoformat()],
+        'y': [submission_date.isoformat(), submission_date.isoformat()],
+        'type': 'scatter',
+    }
 
 
 def _apply_chart_layout(fig: go.Figure, category_label: str, country: str) -> None:
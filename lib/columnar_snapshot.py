@@ -0,0 +1,325 @@
+"""
+Columnar snapshot of the whole dataset (visa_bulletin.npz)
+
+Analysis scripts and batch jobs (backtests, movers) want the full cutoff
+history as columns, not row-by-row SQL over visa_cutoff_date. After each
+ingest the refresh scripts export one snapshot file next to the database:
+
+- an uncompressed NumPy .npz archive, so np.load() reads it as is
+- one .npy member per column, one element per cutoff row
+- text columns dictionary-encoded: small unsigned integer codes plus the
+  category list in manifest.json
+- dates as int32 days since 1970-01-01 (numpy datetime64[D] units), with
+  NO_DATE marking a missing cutoff date
+- status holds lib.series_codec's STATUS_DATE / STATUS_CURRENT /
+  STATUS_UNAVAILABLE codes
+- rows sorted by series (category, country, action type, canonical class),
+  then by publication date
+- manifest.json records the dataset version the snapshot was taken at
+
+load_snapshot() maps the file into memory and returns the columns as
+NumPy arrays without copying them (array.array copies when NumPy is not
+installed). Snapshot.to_pandas() builds a DataFrame with categorical and
+datetime columns.
+
+Django-free: export_snapshot() reads the SQLite file directly, and
+write_snapshot() takes any DB-API cursor (PostgreSQL through Django's
+connection). Only the standard library is needed to write or read a
+snapshot.
+
+Example:
+    snapshot = load_snapshot('visa_bulletin.npz')
+    india = snapshot.columns['country'] == snapshot.code('country', 'india')
+"""
+
+import ast
+import json
+import mmap
+import os
+import sqlite3
+import struct
+import sys
+import zipfile
+from array import array
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+
+from lib.series_codec import STATUS_CURRENT, STATUS_DATE, STATUS_UNAVAILABLE
+
+SNAPSHOT_FORMAT = 1
+
+# Columns in the order Snapshot.records() yields them
+DICTIONARY_COLUMNS = (
+    'visa_category', 'country', 'action_type', 'canonical_class', 'visa_class', 'cutoff_value',
+)
+DATE_COLUMNS = ('publication_date', 'cutoff_date')
+SNAPSHOT_COLUMNS = (
+    'visa_category', 'country', 'action_type', 'canonical_class', 'visa_class',
+    'publication_date', 'cutoff_value', 'cutoff_date', 'status',
+)
+
+# int32 sentinel for a missing date (never a real day offset)
+NO_DATE = -2**31
+EPOCH = date(1970, 1, 1)
+
+_EPOCH_ORDINAL = EPOCH.toordinal()
+_MANIFEST = 'manifest.json'
+_NPY_MAGIC = b'\x93NUMPY\x01\x00'
+
+# .npy dtype descriptor -> array module typecode
+_TYPECODES = {'|u1': 'B', '<u2': 'H', '<u4': 'I', '<i4': 'i'}
+
+_SELECT_ROWS = (
+    "SELECT visa_category, country, action_type, canonical_class, visa_class, publication_date, "
+    "cutoff_value, cutoff_date, is_current, is_unavailable FROM visa_cutoff_date "
+    "ORDER BY visa_category, country, action_type, canonical_class, publication_date, visa_class"
+)
+_SELECT_VERSION = 'SELECT version, updated_at, latest_bulletin_date FROM dataset_version'
+_HAS_VERSION_TABLE = "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'dataset_version'"
+
+
+@dataclass
+class Snapshot:
+    """A loaded snapshot: columns plus the dictionaries that decode them"""
+    columns: dict
+    categories: dict[str, list[str]]
+    manifest: dict = field(default_factory=dict)
+    
+    def __len__(self) -> int:
+        return self.manifest['rows']
+    
+    @property
+    def dataset_version(self) -> int:
+        return self.manifest['dataset_version']
+    
+    def code(self, column: str, value: str) -> int:
+        """Code of value in a dictionary column (ValueError if absent)"""
+        return self.categories[column].index(value)
+    
+    def records(self):
+        """
+        Decoded rows in SNAPSHOT_COLUMNS order, for consumers without NumPy
+        
+        Dates come back as date objects (None when missing), text columns
+        as strings and status as its integer code.
+        """
+        decoders = []
+        for name in SNAPSHOT_COLUMNS:
+            if name in DICTIONARY_COLUMNS:
+                decoders.append(self.categories[name].__getitem__)
+            elif name in DATE_COLUMNS:
+                decoders.append(day_to_date)
+            else:
+                decoders.append(int)
+        columns = [self.columns[name] for name in SNAPSHOT_COLUMNS]
+        for values in zip(*columns):
+            yield tuple(decode(int(value)) for decode, value in zip(decoders, values))
+    
+    def to_pandas(self):
+        """DataFrame with categorical text columns and datetime64 date columns"""
+        import numpy as np
+        import pandas as pd
+        
+        data = {}
+        for name in SNAPSHOT_COLUMNS:
+            values = np.asarray(self.columns[name])
+            if name in DICTIONARY_COLUMNS:
+                data[name] = pd.Categorical.from_codes(values, self.categories[name])
+            elif name in DATE_COLUMNS:
+                dates = values.astype('datetime64[D]')
+                dates[values == NO_DATE] = np.datetime64('NaT')
+                data[name] = dates
+            else:
+                data[name] = values
+        return pd.DataFrame(data)
+
+
+def snapshot_path_for(db_path: Path) -> Path:
+    """Snapshot file exported next to a database (visa_bulletin.npz)"""
+    return Path(db_path).with_suffix('.npz')
+
+
+def date_to_day(value: date | None) -> int:
+    """Days since EPOCH, NO_DATE for None"""
+    return value.toordinal() - _EPOCH_ORDINAL if value else NO_DATE
+
+
+def day_to_date(day: int) -> date | None:
+    """Inverse of date_to_day"""
+    return None if day == NO_DATE else EPOCH + timedelta(days=day)
+
+
+def export_snapshot(db_path: Path, out_path: Path | None = None) -> dict:
+    """
+    Write the columnar snapshot of a SQLite database (atomically replaces out_path)
+    
+    Args:
+        db_path: SQLite database (opened read-only)
+        out_path: Snapshot file (default: snapshot_path_for(db_path))
+    
+    Returns:
+        The snapshot's manifest
+    """
+    conn = sqlite3.connect(f"file:{Path(db_path).resolve()}?mode=ro", uri=True)
+    try:
+        # Databases migrated before 0006 have no version yet
+        has_version = conn.execute(_HAS_VERSION_TABLE).fetchone() is not None
+        return write_snapshot(conn.cursor(), out_path or snapshot_path_for(db_path), has_version)
+    finally:
+        conn.close()
+
+
+def write_snapshot(cursor, out_path: Path, has_version: bool = True) -> dict:
+    """
+    Write the columnar snapshot of the database behind a DB-API cursor
+    
+    Args:
+        cursor: Cursor on any backend; dates may come back as ISO strings
+            (sqlite3) or date objects (PostgreSQL)
+        out_path: Snapshot file (atomically replaced)
+        has_version: Whether the dataset_version table exists
+    
+    Returns:
+        The snapshot's manifest
+    """
+    out_path = Path(out_path)
+    cursor.execute(_SELECT_ROWS)
+    rows = cursor.fetchall()
+    version = None
+    if has_version:
+        cursor.execute(_SELECT_VERSION)
+        version = cursor.fetchone()
+    
+    columns = list(zip(*rows)) or [()] * 10
+    by_name = dict(zip(SNAPSHOT_COLUMNS[:7], columns[:7]))
+    by_name['cutoff_date'] = columns[7]
+    
+    categories = {}
+    members = {}
+    for name in DICTIONARY_COLUMNS:
+        values = by_name[name]
+        categories[name] = sorted(set(values))
+        codes = {value: code for code, value in enumerate(categories[name])}
+        members[name] = _encode_npy(_code_descr(len(codes)), [codes[value] for value in values])
+    for name in DATE_COLUMNS:
+        members[name] = _encode_npy('<i4', [
+            date_to_day(_as_date(value)) for value in by_name[name]
+        ])
+    members['status'] = _encode_npy('|u1', [
+        STATUS_CURRENT if is_current else STATUS_UNAVAILABLE if is_unavailable else STATUS_DATE
+        for is_current, is_unavailable in zip(columns[8], columns[9])
+    ])
+    
+    manifest = {
+        'format': SNAPSHOT_FORMAT,
+        'rows': len(rows),
+        'dataset_version': version[0] if version else 0,
+        'dataset_updated_at': _as_text(version[1]) if version else None,
+        'latest_bulletin_date': _as_text(version[2]) if version else None,
+        'exported_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'columns': list(SNAPSHOT_COLUMNS),
+        'epoch': EPOCH.isoformat(),
+        'no_date': NO_DATE,
+        'categories': categories,
+    }
+    
+    tmp_path = out_path.with_name(out_path.name + '.tmp')
+    with zipfile.ZipFile(tmp_path, 'w', compression=zipfile.ZIP_STORED) as archive:
+        for name in SNAPSHOT_COLUMNS:
+            archive.writestr(f'{name}.npy', members[name])
+        archive.writestr(_MANIFEST, json.dumps(manifest, indent=1))
+    with open(tmp_path, 'rb') as f:
+        os.fsync(f.fileno())
+    os.replace(tmp_path, out_path)
+    return manifest
+
+
+def load_snapshot(path: Path) -> Snapshot:
+    """
+    Map a snapshot file into memory
+    
+    Columns are zero-copy NumPy views of the mapping when NumPy is
+    installed, array.array copies otherwise. The mapping stays valid after
+    a newer export replaces the file.
+    """
+    try:
+        import numpy as np
+    except ImportError:
+        np = None
+    
+    with open(path, 'rb') as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    members = {}
+    with zipfile.ZipFile(path) as archive:
+        for info in archive.infolist():
+            if info.compress_type != zipfile.ZIP_STORED:
+                raise ValueError(f"{path}: {info.filename} is compressed; snapshots are stored uncompressed")
+            members[info.filename] = _member_view(mapped, info)
+    
+    manifest = json.loads(bytes(members[_MANIFEST]))
+    if manifest.get('format') != SNAPSHOT_FORMAT:
+        raise ValueError(f"{path}: unsupported snapshot format {manifest.get('format')!r}")
+    columns = {}
+    for name in manifest['columns']:
+        descr, data = _decode_npy(members[f'{name}.npy'])
+        if np is not None:
+            columns[name] = np.frombuffer(data, dtype=descr)
+        else:
+            values = array(_TYPECODES[descr])
+            values.frombytes(data)
+            if sys.byteorder == 'big' and descr != '|u1':
+                values.byteswap()
+            columns[name] = values
+    return Snapshot(columns=columns, categories=manifest['categories'], manifest=manifest)
+
+
+def _as_date(value) -> date | None:
+    """Date from a driver value (ISO string, date or None)"""
+    if value is None or isinstance(value, date):
+        return value
+    return date.fromisoformat(value)
+
+
+def _as_text(value) -> str | None:
+    """JSON-safe form of a driver date/datetime value"""
+    return value.isoformat() if isinstance(value, date) else value
+
+
+def _code_descr(count: int) -> str:
+    """Narrowest unsigned dtype that holds count codes"""
+    if count <= 2**8:
+        return '|u1'
+    if count <= 2**16:
+        return '<u2'
+    return '<u4'
+
+
+def _encode_npy(descr: str, values: list[int]) -> bytes:
+    """A 1-D .npy file (format 1.0) holding values"""
+    data = array(_TYPECODES[descr], values)
+    if sys.byteorder == 'big' and descr != '|u1':
+        data.byteswap()
+    header = f"{{'descr': '{descr}', 'fortran_order': False, 'shape': ({len(data)},), }}"
+    # Data starts on a 64-byte boundary, as numpy writes it
+    padding = -(len(_NPY_MAGIC) + 2 + len(header) + 1) % 64
+    header = header + ' ' * padding + '\n'
+    return _NPY_MAGIC + struct.pack('<H', len(header)) + header.encode('latin1') + data.tobytes()
+
+
+def _decode_npy(member: memoryview) -> tuple[str, memoryview]:
+    """(dtype descriptor, data buffer) of a 1-D .npy file written by _encode_npy"""
+    if bytes(member[:len(_NPY_MAGIC)]) != _NPY_MAGIC:
+        raise ValueError("not a version 1.0 .npy member")
+    header_length, = struct.unpack_from('<H', member, len(_NPY_MAGIC))
+    start = len(_NPY_MAGIC) + 2
+    header = ast.literal_eval(bytes(member[start:start + header_length]).decode('latin1'))
+    return header['descr'], member[start + header_length:]
+
+
+def _member_view(mapped: mmap.mmap, info: zipfile.ZipInfo) -> memoryview:
+    """Bytes of a stored zip member, straight from the mapping"""
+    # Local file header: 30 fixed bytes, then the name and extra field
+    name_length, extra_length = struct.unpack_from('<HH', mapped, info.header_offset + 26)
+    start = info.header_offset + 30 + name_length + extra_length
+    return memoryview(mapped)[start:start + info.file_size]
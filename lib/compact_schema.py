@@ -0,0 +1,298 @@
+"""
+Compact copy of the database: integer enums and day-ordinal dates
+
+Every visa_cutoff_date row repeats visa_category, action_type and country
+as strings of up to 50 characters, in the table and again in each index,
+and cutoff_value restates cutoff_date as text. export_compact_database()
+writes an optional second SQLite file (visa_bulletin.compact.db) where a
+cutoff row is seven integers:
+
+- category, country, action: small-integer codes mapped through the
+  existing TextChoices (enum_codes); the mapping is stored in compact_enum
+- class_id: row of compact_class (visa_class spelling + canonical class)
+- publication_day, cutoff_day: date.toordinal(), like lib.series_codec
+- status: lib.series_codec's STATUS_DATE / STATUS_CURRENT / STATUS_UNAVAILABLE
+
+compact_cutoff is a WITHOUT ROWID table whose primary key is the series
+order (category, country, action, class, publication day), so one series
+is a range scan of one B-tree with no secondary index; compact_cutoffs()
+reads it comparing integers only.
+
+Views named bulletin and visa_cutoff_date decode the codes back to the
+original columns, so explore_db.py --db visa_bulletin.compact.db and ad-hoc
+SQL keep working. Two columns are derived rather than stored: cutoff_value
+is rebuilt from the status and date exactly as the extractor spells it
+('C', 'U' or the ISO date), and id is synthesized from the key.
+
+Django-free: reads the SQLite file directly; models.enums only supplies
+the TextChoices.
+
+Example:
+    report = export_compact_database(Path('visa_bulletin.db'))
+    conn = sqlite3.connect(report.path)
+    rows = compact_cutoffs(conn, 'employment_based', 'india', 'final_action')
+"""
+
+import os
+import sqlite3
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+from typing import NamedTuple
+
+from lib.series_codec import STATUS_CURRENT, STATUS_DATE, STATUS_UNAVAILABLE
+from models.enums.action_type import ActionType
+from models.enums.country import Country
+from models.enums.visa_category import VisaCategory
+
+COMPACT_FORMAT = 1
+
+# Enum columns and the TextChoices their codes come from
+ENUM_CHOICES = {
+    'visa_category': VisaCategory,
+    'country': Country,
+    'action_type': ActionType,
+}
+
+# date.toordinal() + this = SQLite julianday (0001-01-01 is ordinal 1)
+_JULIAN_DAY_OFFSET = 1721424.5
+
+_SELECT_SOURCE_ROWS = """
+    SELECT b.id, v.visa_category, v.country, v.action_type, v.visa_class, v.canonical_class,
+           v.cutoff_date, v.is_current, v.is_unavailable
+    FROM visa_cutoff_date v JOIN bulletin b ON b.id = v.bulletin_id
+"""
+
+_SELECT_SOURCE_BULLETINS = """
+    SELECT b.id, b.publication_date, b.url, b.fetched_at, MAX(v.bulletin_url)
+    FROM bulletin b LEFT JOIN visa_cutoff_date v ON v.bulletin_id = b.id
+    GROUP BY b.id
+"""
+
+_CREATE_TABLES = (
+    """CREATE TABLE compact_enum (
+        column_name TEXT NOT NULL,
+        code INTEGER NOT NULL,
+        value TEXT NOT NULL,
+        label TEXT NOT NULL,
+        PRIMARY KEY (column_name, code)
+    ) WITHOUT ROWID""",
+    """CREATE TABLE compact_class (
+        id INTEGER PRIMARY KEY,
+        visa_class TEXT NOT NULL,
+        canonical_class TEXT NOT NULL,
+        UNIQUE (visa_class, canonical_class)
+    )""",
+    """CREATE TABLE compact_bulletin (
+        id INTEGER PRIMARY KEY,
+        publication_day INTEGER NOT NULL UNIQUE,
+        url TEXT,
+        bulletin_url TEXT NOT NULL,
+        fetched_at TEXT
+    )""",
+    """CREATE TABLE compact_cutoff (
+        category INTEGER NOT NULL,
+        country INTEGER NOT NULL,
+        action INTEGER NOT NULL,
+        class_id INTEGER NOT NULL,
+        publication_day INTEGER NOT NULL,
+        cutoff_day INTEGER,
+        status INTEGER NOT NULL,
+        PRIMARY KEY (category, country, action, class_id, publication_day)
+    ) WITHOUT ROWID""",
+)
+
+
+class CompactCutoff(NamedTuple):
+    """One decoded compact_cutoff row of a series"""
+    canonical_class: str
+    visa_class: str
+    publication_date: date
+    cutoff_date: date | None
+    status: int
+
+
+@dataclass
+class CompactReport:
+    """What export_compact_database() wrote"""
+    path: Path
+    rows: int
+    # Bytes of the cutoff table plus its indexes (None without SQLite's dbstat)
+    source_bytes: int | None
+    compact_bytes: int | None
+    
+    def format(self) -> str:
+        text = f"{self.path}: {self.rows:,} cutoff rows"
+        if self.source_bytes and self.compact_bytes:
+            text += (
+                f", {self.compact_bytes / 1024:.0f} KiB instead of {self.source_bytes / 1024:.0f} KiB "
+                f"({self.source_bytes / self.compact_bytes:.0f}x smaller)"
+            )
+        return text
+
+
+def enum_codes(choices) -> dict[str, int]:
+    """Code of each TextChoices value: its 1-based position in the class"""
+    return {value: code for code, value in enumerate(choices.values, 1)}
+
+
+def compact_path_for(db_path: Path) -> Path:
+    """The compact copy lives next to the database: visa_bulletin.compact.db"""
+    db_path = Path(db_path)
+    return db_path.with_name(f"{db_path.stem}.compact{db_path.suffix}")
+
+
+def day_to_date(day: int | None) -> date | None:
+    return date.fromordinal(day) if day else None
+
+
+def export_compact_database(db_path: Path, out_path: Path | None = None) -> CompactReport:
+    """
+    Write the compact copy of a SQLite database (atomically replaces out_path)
+    
+    Args:
+        db_path: SQLite database (opened read-only)
+        out_path: Compact file (default: compact_path_for(db_path))
+    
+    Returns:
+        CompactReport with row count and table + index sizes
+    
+    Raises:
+        ValueError: A stored enum value is not in its TextChoices
+    """
+    out_path = Path(out_path or compact_path_for(db_path))
+    source = sqlite3.connect(f"file:{Path(db_path).resolve()}?mode=ro", uri=True)
+    try:
+        rows = source.execute(_SELECT_SOURCE_ROWS).fetchall()
+        bulletins = source.execute(_SELECT_SOURCE_BULLETINS).fetchall()
+        source_bytes = storage_bytes(source, 'visa_cutoff_date')
+    finally:
+        source.close()
+    
+    codes = {column: enum_codes(choices) for column, choices in ENUM_CHOICES.items()}
+    class_ids = {
+        key: class_id for class_id, key in enumerate(sorted({(row[4], row[5]) for row in rows}), 1)
+    }
+    publication_days = {
+        bulletin_id: date.fromisoformat(published).toordinal() for bulletin_id, published, *_ in bulletins
+    }
+    
+    cutoffs = []
+    for bulletin_id, category, country, action, visa_class, canonical, cutoff, is_current, is_unavailable in rows:
+        try:
+            enum_key = (codes['visa_category'][category], codes['country'][country], codes['action_type'][action])
+        except KeyError as e:
+            raise ValueError(f"{e.args[0]!r} is not a known visa_category, country or action_type") from None
+        cutoffs.append((
+            *enum_key,
+            class_ids[visa_class, canonical],
+            publication_days[bulletin_id],
+            date.fromisoformat(cutoff).toordinal() if cutoff else None,
+            STATUS_CURRENT if is_current else STATUS_UNAVAILABLE if is_unavailable else STATUS_DATE,
+        ))
+    cutoffs.sort(key=lambda cutoff: cutoff[:5])
+    
+    tmp_path = out_path.with_name(out_path.name + '.tmp')
+    tmp_path.unlink(missing_ok=True)
+    conn = sqlite3.connect(tmp_path, isolation_level=None)
+    try:
+        conn.execute('PRAGMA journal_mode=OFF;')  # Nobody sees the file until the rename
+        conn.execute('BEGIN')
+        for statement in _CREATE_TABLES:
+            conn.execute(statement)
+        conn.executemany('INSERT INTO compact_enum VALUES (?, ?, ?, ?)', [
+            (column, code, value, ENUM_CHOICES[column](value).label)
+            for column, column_codes in codes.items() for value, code in column_codes.items()
+        ])
+        conn.executemany('INSERT INTO compact_class VALUES (?, ?, ?)', [
+            (class_id, visa_class, canonical) for (visa_class, canonical), class_id in class_ids.items()
+        ])
+        conn.executemany('INSERT INTO compact_bulletin VALUES (?, ?, ?, ?, ?)', [
+            (bulletin_id, publication_days[bulletin_id], url, bulletin_url or url or '', fetched_at)
+            for bulletin_id, _, url, fetched_at, bulletin_url in bulletins
+        ])
+        conn.executemany('INSERT INTO compact_cutoff VALUES (?, ?, ?, ?, ?, ?, ?)', cutoffs)
+        for statement in _compatibility_views(codes):
+            conn.execute(statement)
+        conn.execute(f'PRAGMA user_version = {COMPACT_FORMAT}')
+        conn.execute('COMMIT')
+        conn.execute('ANALYZE')
+        compact_bytes = storage_bytes(conn, 'compact_cutoff')
+    finally:
+        conn.close()
+    with open(tmp_path, 'rb') as f:
+        os.fsync(f.fileno())
+    os.replace(tmp_path, out_path)
+    return CompactReport(path=out_path, rows=len(cutoffs), source_bytes=source_bytes, compact_bytes=compact_bytes)
+
+
+def compact_cutoffs(conn: sqlite3.Connection, visa_category: str, country: str, action_type: str) -> list[CompactCutoff]:
+    """
+    Rows of one page's series from a compact database, in series order
+    
+    The filter and the ordering use the integer primary key only; strings
+    come from the small compact_class table.
+    """
+    key = (
+        enum_codes(VisaCategory).get(visa_category),
+        enum_codes(Country).get(country),
+        enum_codes(ActionType).get(action_type),
+    )
+    classes = {class_id: (visa_class, canonical) for class_id, visa_class, canonical in conn.execute(
+        'SELECT id, visa_class, canonical_class FROM compact_class'
+    )}
+    rows = conn.execute(
+        'SELECT class_id, publication_day, cutoff_day, status FROM compact_cutoff '
+        'WHERE category = ? AND country = ? AND action = ? ORDER BY class_id, publication_day',
+        key
+    )
+    return [
+        CompactCutoff(classes[class_id][1], classes[class_id][0], date.fromordinal(published), day_to_date(cutoff), status)
+        for class_id, published, cutoff, status in rows
+    ]
+
+
+def storage_bytes(conn: sqlite3.Connection, table: str) -> int | None:
+    """Bytes in the pages of a table and its indexes, or None without dbstat"""
+    try:
+        return conn.execute(
+            "SELECT SUM(pgsize) FROM dbstat WHERE name IN "
+            "(SELECT name FROM sqlite_master WHERE tbl_name = ?)",
+            (table,)
+        ).fetchone()[0]
+    except sqlite3.OperationalError:
+        return None
+
+
+def _decode_enum(column: str, codes: dict[str, int], expression: str) -> str:
+    whens = ' '.join(f"WHEN {code} THEN '{value}'" for value, code in codes.items())
+    return f"CASE {expression} {whens} END AS {column}"
+
+
+def _compatibility_views(codes: dict[str, dict[str, int]]) -> list[str]:
+    """bulletin and visa_cutoff_date views with the original columns"""
+    cutoff_date = f"date(c.cutoff_day + {_JULIAN_DAY_OFFSET})"
+    return [
+        f"""CREATE VIEW bulletin AS
+        SELECT id, date(publication_day + {_JULIAN_DAY_OFFSET}) AS publication_date, url, fetched_at
+        FROM compact_bulletin""",
+        f"""CREATE VIEW visa_cutoff_date AS
+        SELECT
+            (c.publication_day << 24) | (c.category << 22) | (c.action << 20) | (c.country << 16) | c.class_id AS id,
+            {_decode_enum('visa_category', codes['visa_category'], 'c.category')},
+            k.visa_class,
+            {_decode_enum('action_type', codes['action_type'], 'c.action')},
+            {_decode_enum('country', codes['country'], 'c.country')},
+            CASE c.status WHEN {STATUS_CURRENT} THEN 'C' WHEN {STATUS_UNAVAILABLE} THEN 'U'
+                ELSE coalesce({cutoff_date}, '') END AS cutoff_value,
+            {cutoff_date} AS cutoff_date,
+            c.status = {STATUS_CURRENT} AS is_current,
+            c.status = {STATUS_UNAVAILABLE} AS is_unavailable,
+            b.id AS bulletin_id,
+            k.canonical_class,
+            b.bulletin_url,
+            date(c.publication_day + {_JULIAN_DAY_OFFSET}) AS publication_date
+        FROM compact_cutoff c
+        JOIN compact_class k ON k.id = c.class_id
+        JOIN compact_bulletin b ON b.publication_day = c.publication_day""",
+    ]
@@ -2,20 +2,31 @@
 Dashboard business logic service
 
 Extracts data aggregation and processing logic from views to keep them thin.
+
+A page is computed in two layers. Decoding the series, fitting their
+projection trends and building the historical chart depend only on
+(category, country, action type) and the data, so get_dashboard_series()
+caches them under the dataset version. The priority date only feeds the
+projection arithmetic and the chart's projection traces, recomputed per
+request by DashboardSeries.visa_class_data() and chart_data().
 """
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import date
-from itertools import groupby
-from operator import attrgetter
 
-from models.visa_cutoff_date import VisaCutoffDate
+from django.core.cache import cache
+
 from models.enums.visa_category import VisaCategory
 from models.enums.action_type import ActionType
 from models.enums.country import Country
 from models.enums.family_preference import FamilyPreference
-from models.enums.employment_preference import EmploymentPreference
-from lib.projection import calculate_projection
+from lib.chart_builder import BaseChart, build_base_chart, compose_chart
+from lib.projection import ProjectionTrend, project, projection_trend
+from lib.series_codec import decode_series
+from lib.series_repository import series_rows
+
+# Lifetime of a cached DashboardSeries; the dataset version in the key ends it sooner
+DASHBOARD_SERIES_TIMEOUT = 60 * 60 * 24
 
 
 @dataclass
@@ -27,10 +38,12 @@ class VisaClassData:
     cutoff_dates: list[date | None]
     bulletin_urls: list[str]
     projection: dict | None = None
+    canonical_class: str = ''
     
     def to_dict(self) -> dict:
         """Convert to dict for template context"""
         return {
+            'canonical_class': self.canonical_class,
             'visa_class': self.visa_class,
             'visa_class_label': self.visa_class_label,
             'dates': self.dates,
@@ -40,12 +53,37 @@ class VisaClassData:
         }
 
 
-def get_visa_classes_for_category(category: str) -> list[tuple[str, str]]:
+@dataclass
+class DashboardSeries:
+    """Priority-date-independent part of a dashboard page (see module docstring)"""
+    visa_classes: list[VisaClassData] = field(default_factory=list)
+    trends: list[ProjectionTrend | None] = field(default_factory=list)
+    chart: BaseChart | None = None
+    
+    def visa_class_data(self, submission_date: date) -> list[dict]:
+        """Template dicts of the visa classes, with projections for submission_date"""
+        result = []
+        for data, trend in zip(self.visa_classes, self.trends):
+            item = data.to_dict()
+            item['projection'] = project(trend, submission_date) if trend else None
+            result.append(item)
+        return result
+    
+    def chart_data(self, visa_class_data: list[dict], submission_date: date) -> dict | None:
+        """Chart of the page for the projections in visa_class_data (None without data)"""
+        if not visa_class_data:
+            return None
+        return compose_chart(self.chart, [data['projection'] for data in visa_class_data], submission_date)
+
+
+def get_visa_classes_for_category(category: str, dataset_token: str | None = None) -> list[tuple[str, str]]:
     """
     Get list of visa classes with labels for a given category
     
     Args:
         category: Visa category value (family_sponsored or employment_based)
+        dataset_token: Current DatasetVersion.token, to reuse the cached
+            visa class catalog (looked up when not given)
         
     Returns:
         List of (value, label) tuples
@@ -55,7 +93,7 @@ def get_visa_classes_for_category(category: str) -> list[tuple[str, str]]:
     if category == VisaCategory.FAMILY_SPONSORED.value:
         return FamilyPreference.choices
     elif category == VisaCategory.EMPLOYMENT_BASED.value:
-        return get_deduplicated_employment_classes()
+        return get_deduplicated_employment_classes(dataset_token)
     return []
 
 
@@ -63,162 +101,126 @@ def get_aggregated_visa_class_data(
     category: str,
     country: str,
     action_type: str,
-    submission_date: date
+    submission_date: date,
+    dataset_token: str | None = None
 ) -> tuple[list[dict], bool]:
     """
-    Query and aggregate visa class data with normalized names
-    
-    Handles historical visa class name variations by normalizing them
-    (e.g., "1st", "1 st", "EB-1" all become "EB-1: Priority Workers").
+    Load the visa class series for a dashboard page
     
     Args:
         category: Visa category (family_sponsored, employment_based)
         country: Country code
         action_type: Action type (final_action, dates_for_filing)
         submission_date: User's priority date for projection calculation
-        
+        dataset_token: Current DatasetVersion.token, to reuse the cached
+            series (get_dashboard_series)
+    
     Returns:
         Tuple of (list of visa class data dicts, has_any_data bool)
     """
-    # Query all cutoff data in one go
-    all_cutoff_data = VisaCutoffDate.objects.filter(
-        visa_category=category,
-        country=country,
-        action_type=action_type
-    ).select_related('bulletin').order_by('visa_class', 'bulletin__publication_date')
-    
-    if category == VisaCategory.EMPLOYMENT_BASED.value:
-        visa_class_data = _aggregate_employment_data(all_cutoff_data, submission_date)
+    if dataset_token is None:
+        series = load_dashboard_series(category, country, action_type, with_chart=False)
     else:
-        visa_class_data = _aggregate_family_data(all_cutoff_data, submission_date)
-    
+        series = get_dashboard_series(category, country, action_type, dataset_token)
+    visa_class_data = series.visa_class_data(submission_date)
     return visa_class_data, bool(visa_class_data)
 
 
-def _aggregate_employment_data(
-    cutoff_data,
-    submission_date: date
-) -> list[dict]:
+def get_dashboard_series(
+    category: str,
+    country: str,
+    action_type: str,
+    dataset_token: str
+) -> DashboardSeries:
     """
-    Aggregate employment-based visa data with normalized class names
+    The date-independent layer of a page, cached until the dataset changes
     
-    Employment visas have many historical variations (1st, EB-1, EB1, etc.)
-    that need to be normalized and aggregated.
+    Args:
+        category: Visa category value
+        country: Country code
+        action_type: Action type value
+        dataset_token: Current DatasetVersion.token (part of the cache key)
     """
-    normalized_data: dict[str, VisaClassData] = {}
-    
-    for visa_class, records in groupby(cutoff_data, key=attrgetter('visa_class')):
-        # Normalize to display name (e.g., "1st" → "EB-1: Priority Workers")
-        display_name = EmploymentPreference.normalize_for_display(visa_class)
-        
-        # Skip unrecognized classes (normalization returns same as input)
-        if not display_name or display_name == visa_class:
-            list(records)  # Consume iterator
-            continue
-        
-        # Initialize or get existing data for this normalized class
-        if display_name not in normalized_data:
-            normalized_data[display_name] = VisaClassData(
-                visa_class=visa_class,
-                visa_class_label=display_name,
-                dates=[],
-                cutoff_dates=[],
-                bulletin_urls=[]
-            )
-        
-        _append_records_to_data(normalized_data[display_name], records)
-    
-    return _finalize_aggregated_data(normalized_data, submission_date)
+    key = f"dashboard-series-{dataset_token}-{category}-{country}-{action_type}"
+    series = cache.get(key)
+    if series is None:
+        series = load_dashboard_series(category, country, action_type, dataset_token)
+        cache.set(key, series, DASHBOARD_SERIES_TIMEOUT)
+    return series
 
 
-def _aggregate_family_data(
-    cutoff_data,
-    submission_date: date
-) -> list[dict]:
-    """
-    Aggregate family-sponsored visa data with normalized class names
-    
-    Family visas have legacy names (1st, 2A, 3rd, 4th) that map to
-    modern names (F1, F2A, F3, F4).
+def load_dashboard_series(
+    category: str,
+    country: str,
+    action_type: str,
+    dataset_token: str | None = None,
+    with_chart: bool = True
+) -> DashboardSeries:
     """
-    visa_classes_map = {vc[0]: vc[1] for vc in FamilyPreference.choices}
-    normalized_data: dict[str, VisaClassData] = {}
+    Decode a page's series, fit their projection trends and build the base chart
     
-    for visa_class, records in groupby(cutoff_data, key=attrgetter('visa_class')):
-        # Normalize legacy name (e.g., "1st" → "F1", "2A" → "F2A")
-        normalized_class = FamilyPreference.normalize_legacy_name(visa_class)
-        
-        # Skip unrecognized classes
-        if normalized_class not in visa_classes_map:
-            list(records)  # Consume iterator
-            continue
-        
-        visa_class_label = visa_classes_map[normalized_class]
-        
-        if normalized_class not in normalized_data:
-            normalized_data[normalized_class] = VisaClassData(
-                visa_class=normalized_class,
-                visa_class_label=visa_class_label,
-                dates=[],
-                cutoff_dates=[],
-                bulletin_urls=[]
-            )
-        
-        _append_records_to_data(normalized_data[normalized_class], records)
+    Historical visa class name variations (e.g., "1st", "1 st", "EB-1") share
+    a canonical_class ("EB-1: Priority Workers"); VisaSeries holds one
+    deduplicated, date-ordered series per canonical class, built at ingest,
+    so a page decodes about a dozen rows instead of aggregating cutoff rows.
     
-    return _finalize_aggregated_data(normalized_data, submission_date)
-
-
-def _append_records_to_data(data: VisaClassData, records) -> None:
-    """Append bulletin records to visa class data, avoiding duplicates"""
-    for record in records:
-        pub_date = record.bulletin.publication_date
-        
-        # Avoid duplicates (same date from different name variants)
-        if pub_date in data.dates:
-            continue
+    Args:
+        category: Visa category (family_sponsored, employment_based)
+        country: Country code
+        action_type: Action type (final_action, dates_for_filing)
+        dataset_token: Passed to series_rows (mapped series file)
+        with_chart: Also build the base chart
         
-        data.dates.append(pub_date)
-        data.bulletin_urls.append(record.bulletin.get_bulletin_url())
+    Returns:
+        DashboardSeries with classes sorted by label
+    """
+    if category == VisaCategory.EMPLOYMENT_BASED.value:
+        # Employment: canonical class is the display name, raw spelling the value
+        def class_and_label(canonical_class, visa_class):
+            return visa_class, canonical_class
+    else:
+        # Family: canonical class is the modern name (F1, F2A, F3, F4)
+        visa_classes_map = dict(FamilyPreference.choices)
         
-        if record.is_current:
-            data.cutoff_dates.append(pub_date)
-        elif record.is_unavailable:
-            data.cutoff_dates.append(None)
-        else:
-            data.cutoff_dates.append(record.cutoff_date)
-
-
-def _finalize_aggregated_data(
-    normalized_data: dict[str, VisaClassData],
-    submission_date: date
-) -> list[dict]:
-    """Sort data by date, calculate projections, and convert to dicts"""
-    result = []
+        def class_and_label(canonical_class, visa_class):
+            return canonical_class, visa_classes_map[canonical_class]
     
-    for data in normalized_data.values():
-        if not data.dates:
+    visa_classes = []
+    for canonical_class, visa_class, publication_dates, cutoff_ordinals, statuses, bulletin_urls in (
+        series_rows(category, country, action_type, dataset_token)
+    ):
+        value, label = class_and_label(canonical_class, visa_class)
+        dates, cutoff_dates, urls = decode_series(
+            bytes(publication_dates), bytes(cutoff_ordinals), bytes(statuses), bulletin_urls
+        )
+        if not dates:
             continue
-        
-        # Sort all lists by date
-        sorted_indices = sorted(range(len(data.dates)), key=lambda i: data.dates[i])
-        data.dates = [data.dates[i] for i in sorted_indices]
-        data.cutoff_dates = [data.cutoff_dates[i] for i in sorted_indices]
-        data.bulletin_urls = [data.bulletin_urls[i] for i in sorted_indices]
-        
-        # Calculate projection
-        data.projection = calculate_projection(data.dates, data.cutoff_dates, submission_date)
-        result.append(data.to_dict())
+        visa_classes.append(VisaClassData(
+            canonical_class=canonical_class,
+            visa_class=value,
+            visa_class_label=label,
+            dates=dates,
+            cutoff_dates=cutoff_dates,
+            bulletin_urls=urls,
+        ))
     
-    # Sort by label for consistent ordering
-    result.sort(key=lambda x: x['visa_class_label'])
-    return result
+    # Sort by label for consistent ordering (series are already date-ordered)
+    visa_classes.sort(key=lambda data: data.visa_class_label)
+    series = DashboardSeries(
+        visa_classes=visa_classes,
+        trends=[projection_trend(data.dates, data.cutoff_dates) for data in visa_classes],
+    )
+    if with_chart and visa_classes:
+        category_label = VisaCategory(category).label if category in VisaCategory.values else category
+        series.chart = build_base_chart([data.to_dict() for data in visa_classes], country, category_label)
+    return series
 
 
 def build_seo_metadata(
     category: str,
     country: str,
-    request_uri: str
+    request_uri: str,
+    date_modified: date | None = None
 ) -> dict:
     """
     Build SEO metadata for the dashboard page
@@ -227,6 +229,7 @@ def build_seo_metadata(
         category: Visa category value
         country: Country value
         request_uri: Full request URI for canonical URL
+        date_modified: Day the data last changed (default: today)
         
     Returns:
         Dict with page_title, page_description, structured_data, etc.
@@ -259,7 +262,7 @@ def build_seo_metadata(
             "url": "https://visa-bulletin.us"
         },
         "keywords": f"visa bulletin, {country_display}, {category_display}, priority date, immigration, green card",
-        "dateModified": date.today().isoformat(),
+        "dateModified": (date_modified or date.today()).isoformat(),
         "isAccessibleForFree": True,
         "license": "https://creativecommons.org/publicdomain/zero/1.0/",
         "distribution": {
@@ -0,0 +1,47 @@
+"""
+Dataset version - one counter that changes whenever the bulletin data does
+
+The ORM ingest path (extractors.bulletin_handler) bumps it inside the
+transaction that writes the rows, so a reader never sees new rows with an
+old version; extractors.sqlite_writer does the same in plain SQL. Page
+caches, ETags and the sitemap key off current_dataset_version() and can
+therefore live until the next ingest.
+"""
+
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import F, Max, Value
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+
+def current_dataset_version(using: str = DEFAULT_DB_ALIAS):
+    """
+    The stored DatasetVersion, or an unsaved version 0 if nothing was ingested
+    """
+    from models.dataset_version import DATASET_VERSION_ID, DatasetVersion
+    
+    stored = DatasetVersion.objects.using(using).filter(pk=DATASET_VERSION_ID).first()
+    return stored or DatasetVersion(pk=DATASET_VERSION_ID)
+
+
+def bump_dataset_version(using: str = DEFAULT_DB_ALIAS, after: int = 0) -> int:
+    """
+    Advance the dataset version (call inside the ingest transaction)
+    
+    Args:
+        using: Database alias
+        after: Version the new one must exceed; a shadow rebuild passes the
+            live database's version so swapping it in never goes backwards
+    
+    Returns:
+        The new version
+    """
+    from models.bulletin import Bulletin
+    from models.dataset_version import DATASET_VERSION_ID, DatasetVersion
+    
+    latest = Bulletin.objects.using(using).aggregate(latest=Max('publication_date'))['latest']
+    values = {'updated_at': timezone.now(), 'latest_bulletin_date': latest}
+    versions = DatasetVersion.objects.using(using).filter(pk=DATASET_VERSION_ID)
+    if not versions.update(version=Greatest(F('version'), Value(after)) + 1, **values):
+        DatasetVersion.objects.using(using).create(pk=DATASET_VERSION_ID, version=after + 1, **values)
+    return versions.values_list('version', flat=True).get()
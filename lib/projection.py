@@ -3,10 +3,30 @@ Projection logic for estimating visa processing timelines
 
 Calculates simple linear projections based on historical priority date movement.
 Falls back to historical linear regression when recent data shows no progress.
+
+Only the last step depends on the user's priority date: projection_trend()
+reduces a series to its rates once (cached per page and dataset version by
+lib.dashboard_service), and project() turns a trend into a projection for
+any priority date.
 """
 
+from dataclasses import dataclass
 from datetime import date, timedelta
 
+# Day count origin of the historical regression
+REGRESSION_EPOCH = date(2000, 1, 1)
+
+
+@dataclass(frozen=True)
+class ProjectionTrend:
+    """Priority-date-independent inputs of a projection for one series"""
+    last_pub: date
+    last_cutoff: date
+    avg_days_per_month: float
+    # (slope, intercept) over days since REGRESSION_EPOCH; only fitted when
+    # the recent rate shows no progress, None if the fit is unusable
+    regression: tuple[float, float] | None = None
+
 
 def calculate_projection(dates: list[date], cutoff_dates: list[date | None], submission_date: date) -> dict[str, any] | None:
     """
@@ -35,6 +55,23 @@ def calculate_projection(dates: list[date], cutoff_dates: list[date | None], sub
         >>> result['status']
         'projected'
     """
+    trend = projection_trend(dates, cutoff_dates)
+    if trend is None:
+        return None
+    return project(trend, submission_date)
+
+
+def projection_trend(dates: list[date], cutoff_dates: list[date | None]) -> ProjectionTrend | None:
+    """
+    Recent progress rate (and fallback regression) of a series
+    
+    Args:
+        dates: List of publication dates (bulletin release dates)
+        cutoff_dates: List of cutoff dates (may contain None for unavailable)
+    
+    Returns:
+        ProjectionTrend, or None if there is too little data to project
+    """
     if len(dates) < 2:
         return None
     
@@ -61,6 +98,25 @@ def calculate_projection(dates: list[date], cutoff_dates: list[date | None], sub
     days_advanced = (last_cutoff - first_cutoff).days
     avg_days_per_month = days_advanced / months_elapsed
     
+    regression = None
+    if avg_days_per_month <= 0:
+        regression = _regression_line(valid_points)
+    return ProjectionTrend(last_pub, last_cutoff, avg_days_per_month, regression)
+
+
+def project(trend: ProjectionTrend, submission_date: date) -> dict[str, any]:
+    """
+    Projection of a trend for one priority date (see calculate_projection)
+    
+    Args:
+        trend: Result of projection_trend()
+        submission_date: Target submission date to reach
+    
+    Returns:
+        dict with projection info, as calculate_projection
+    """
+    last_pub, last_cutoff, avg_days_per_month = trend.last_pub, trend.last_cutoff, trend.avg_days_per_month
+    
     # Check if already current or no movement
     if last_cutoff >= submission_date:
         return {
@@ -72,11 +128,8 @@ def calculate_projection(dates: list[date], cutoff_dates: list[date | None], sub
     
     if avg_days_per_month <= 0:
         # No recent progress - fall back to historical linear regression
-        historical_projection = calculate_historical_linear_regression(
-            valid_points, submission_date, last_pub
-        )
-        if historical_projection:
-            return historical_projection
+        if trend.regression:
+            return _project_regression(*trend.regression, submission_date, last_pub)
         
         # If historical regression also fails, return no movement
         return {
@@ -169,11 +222,19 @@ def calculate_historical_linear_regression(
         >>> last_pub = date(2025, 1, 1)
         >>> result = calculate_historical_linear_regression(points, submission, last_pub)
     """
+    line = _regression_line(valid_points)
+    if line is None:
+        return None
+    return _project_regression(*line, submission_date, last_pub_date)
+
+
+def _regression_line(valid_points: list[tuple[date, date]]) -> tuple[float, float] | None:
+    """(slope, intercept) of cutoff over publication days, None without forward progress"""
     if len(valid_points) < 6:  # Need reasonable historical data
         return None
     
     # Convert dates to days since epoch for linear regression
-    epoch = date(2000, 1, 1)
+    epoch = REGRESSION_EPOCH
     
     x_values = [(pub_date - epoch).days for pub_date, _ in valid_points]
     y_values = [(cutoff - epoch).days for _, cutoff in valid_points]
@@ -196,6 +257,12 @@ def calculate_historical_linear_regression(
     # Check if slope is positive (forward progress)
     if slope <= 0:
         return None
+    return slope, intercept
+
+
+def _project_regression(slope: float, intercept: float, submission_date: date, last_pub_date: date) -> dict[str, any]:
+    """Projection from a fitted regression line"""
+    epoch = REGRESSION_EPOCH
     
     # Calculate when submission_date will be reached
     # We need: cutoff_date = submission_date
@@ -0,0 +1,122 @@
+"""
+Query budget - count the SQL a request or an ingested bulletin runs
+
+A lazy relation (a template touching row.bulletin, a __repr__ reading a
+foreign key) turns one query into one per row without any visible change.
+collect_queries() counts statements and SQL time through Django's
+execute_wrapper hook, so it works with DEBUG off and costs one function
+call per query.
+
+- Tests: query_budget(max_queries) fails with the statements it saw when
+  the block runs more queries than allowed
+- Requests: with QUERY_BUDGET_LOG=1 webapp.middleware.QueryBudgetMiddleware
+  logs requests over REQUEST_BUDGET and adds a Server-Timing header
+- Ingest: with QUERY_BUDGET_LOG=1 extractors.bulletin_handler records each
+  bulletin's queries in its IngestResult and logs those over BULLETIN_BUDGET
+
+Only Django connections are counted; extractors.sqlite_writer talks to
+sqlite3 directly.
+
+Example:
+    with query_budget(max_queries=3):
+        client.get('/')
+"""
+
+import logging
+import os
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+
+from django.db import DEFAULT_DB_ALIAS, connections
+
+logger = logging.getLogger(__name__)
+
+QUERY_BUDGET_ENV = 'QUERY_BUDGET_LOG'
+
+
+@dataclass(frozen=True)
+class Budget:
+    """Most queries and SQL time a unit of work should need"""
+    queries: int
+    seconds: float
+
+
+# A dashboard render is a handful of indexed reads
+REQUEST_BUDGET = Budget(queries=10, seconds=0.25)
+
+# Bulletin, existing rows, and a few bulk INSERT/UPDATE batches
+BULLETIN_BUDGET = Budget(queries=40, seconds=2.0)
+
+
+@dataclass
+class QueryStats:
+    """Queries seen by collect_queries()"""
+    count: int = 0
+    seconds: float = 0.0
+    statements: list[str] = field(default_factory=list)
+    
+    def exceeds(self, budget: Budget) -> bool:
+        return self.count > budget.queries or self.seconds > budget.seconds
+    
+    def describe(self) -> str:
+        return f"{self.count} queries in {self.seconds * 1000:.1f} ms"
+
+
+def query_budget_enabled() -> bool:
+    """True when QUERY_BUDGET_LOG=1 opts in to request and ingest logging"""
+    return os.environ.get(QUERY_BUDGET_ENV, '') == '1'
+
+
+@contextmanager
+def collect_queries(using: str = DEFAULT_DB_ALIAS, capture: bool = False):
+    """
+    Count the queries run on a connection inside the block
+    
+    Args:
+        using: Database alias to watch (only the current thread's connection)
+        capture: Also keep the SQL of each statement in stats.statements
+    
+    Yields:
+        QueryStats, updated as queries run
+    """
+    stats = QueryStats()
+    
+    def record(execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            stats.count += 1
+            stats.seconds += time.perf_counter() - started
+            if capture:
+                stats.statements.append(sql)
+    
+    with connections[using].execute_wrapper(record):
+        yield stats
+
+
+@contextmanager
+def query_budget(max_queries: int, using: str = DEFAULT_DB_ALIAS):
+    """
+    Fail (AssertionError) if the block runs more than max_queries queries
+    
+    Unlike assertNumQueries the budget is an upper bound, so an
+    optimization does not break the test but an N+1 regression does.
+    """
+    with collect_queries(using, capture=True) as stats:
+        yield stats
+    if stats.count > max_queries:
+        statements = '\n'.join(f"  {i}. {sql}" for i, sql in enumerate(stats.statements, 1))
+        raise AssertionError(f"{stats.count} queries, budget is {max_queries}:\n{statements}")
+
+
+def log_over_budget(stats: QueryStats, budget: Budget, label: str) -> bool:
+    """Log a warning if stats exceed the budget; returns whether they did"""
+    if not stats.exceeds(budget):
+        return False
+    logger.warning(
+        "%s: %s exceeds the budget of %d queries / %.0f ms",
+        label, stats.describe(), budget.queries, budget.seconds * 1000
+    )
+    return True
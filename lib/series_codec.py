@@ -0,0 +1,322 @@
+"""
+Packed per-class cutoff series (the visa_series table)
+
+A dashboard page charts one series per canonical class: for every bulletin,
+the cutoff date of that class. Building it from visa_cutoff_date means
+loading and deduplicating hundreds of rows per request, so the series is
+materialized at ingest, one row per (category, country, action type,
+canonical class), with the per-bulletin values packed into BLOBs:
+
+- publication_dates: little-endian uint32 day ordinals, ascending
+- cutoff_ordinals: little-endian uint32 day ordinals, 0 for no date
+- statuses: one byte per point (STATUS_DATE, STATUS_CURRENT, STATUS_UNAVAILABLE)
+- visa_classes: raw spelling behind each point, newline-separated
+- bulletin_urls: newline-separated; empty when the bulletin uses the
+  standard URL for its month (every bulletin so far), which keeps the row small
+
+Several spellings of one class can appear in a bulletin ("1st" and "EB-1");
+the lowest spelling wins the date, as on the row-based dashboard. Points
+are merged in dicts keyed by publication date and the winner is the lowest
+point_precedence(), so a collision resolves the same way whatever order
+the rows arrive in.
+
+Django-free so the SQLite bulk writer can maintain the table too.
+"""
+
+import struct
+from datetime import date
+from functools import lru_cache
+from typing import Iterable, NamedTuple
+
+from lib.bulletin_url import resolve_bulletin_url
+
+STATUS_DATE = 0
+STATUS_CURRENT = 1
+STATUS_UNAVAILABLE = 2
+
+# Columns of a visa_cutoff_date row that feed a series, in this order
+SERIES_KEY_COLUMNS = ('visa_category', 'country', 'action_type', 'canonical_class')
+SERIES_ROW_COLUMNS = (
+    *SERIES_KEY_COLUMNS,
+    'publication_date', 'visa_class', 'cutoff_date', 'is_current', 'is_unavailable', 'bulletin_url',
+)
+
+# Stored columns of a visa_series row besides the key (see encode_points)
+SERIES_VALUE_COLUMNS = (
+    'visa_class', 'first_publication_date', 'last_publication_date',
+    'publication_dates', 'cutoff_ordinals', 'statuses', 'visa_classes', 'bulletin_urls',
+)
+
+_KEY_WIDTH = len(SERIES_KEY_COLUMNS)
+
+_standard_bulletin_url = lru_cache(maxsize=None)(resolve_bulletin_url)
+
+
+class SeriesPoint(NamedTuple):
+    """One bulletin's value in a series"""
+    publication_date: date
+    visa_class: str
+    cutoff_date: date | None
+    status: int
+    bulletin_url: str
+
+
+def point_from_row(row: tuple) -> SeriesPoint:
+    """
+    Series point for a row in SERIES_ROW_COLUMNS order
+    
+    Dates must already be date objects; the flags may be bools or 0/1.
+    """
+    publication_date, visa_class, cutoff_date, is_current, is_unavailable, bulletin_url = row[_KEY_WIDTH:]
+    if is_current:
+        status = STATUS_CURRENT
+    elif is_unavailable:
+        status = STATUS_UNAVAILABLE
+    else:
+        status = STATUS_DATE
+    return SeriesPoint(publication_date, visa_class, cutoff_date, status, bulletin_url)
+
+
+def point_precedence(point: SeriesPoint) -> tuple[str, int, int, str]:
+    """
+    Sort key deciding which of a bulletin's points for one date is kept
+    
+    The lowest spelling wins; identical spellings (a class listed twice)
+    fall back to status, cutoff and URL so the winner never depends on
+    row order.
+    
+    Example:
+        >>> point_precedence(SeriesPoint(date(2024, 1, 1), 'F1', None, STATUS_CURRENT, ''))
+        ('F1', 1, 0, '')
+    """
+    cutoff = point.cutoff_date.toordinal() if point.cutoff_date else 0
+    return point.visa_class, point.status, cutoff, point.bulletin_url
+
+
+def group_series_points(rows: Iterable[tuple]) -> dict[tuple, list[SeriesPoint]]:
+    """
+    Build series from cutoff rows
+    
+    Args:
+        rows: Rows in SERIES_ROW_COLUMNS order, any order, canonical_class
+            already non-empty
+    
+    Returns:
+        {series key: points ordered by publication date}
+    """
+    # {series key: {publication date: (precedence, point)}}
+    series: dict[tuple, dict[date, tuple[tuple, SeriesPoint]]] = {}
+    for row in rows:
+        point = point_from_row(row)
+        precedence = point_precedence(point)
+        points = series.setdefault(row[:_KEY_WIDTH], {})
+        current = points.get(point.publication_date)
+        if current is None or precedence < current[0]:
+            points[point.publication_date] = (precedence, point)
+    return {key: [points[published][1] for published in sorted(points)] for key, points in series.items()}
+
+
+def series_updates(
+    rows: Iterable[tuple],
+    previous_keys: dict[date, set[tuple]]
+) -> dict[tuple, dict[date, SeriesPoint | None]]:
+    """
+    Points to write after some bulletins' rows were saved
+    
+    Args:
+        rows: The bulletins' current rows (SERIES_ROW_COLUMNS order,
+            canonical_class non-empty)
+        previous_keys: {publication date: series keys its rows fed before
+            the save}; a row whose canonical_class changed leaves its old
+            series, so the bulletin's point there is removed
+    
+    Returns:
+        {series key: {publication date: new point, or None to remove}}
+    """
+    updates: dict[tuple, dict[date, SeriesPoint | None]] = {}
+    for key, points in group_series_points(rows).items():
+        updates[key] = {point.publication_date: point for point in points}
+    for publication_date, keys in previous_keys.items():
+        for key in keys:
+            updates.setdefault(key, {}).setdefault(publication_date, None)
+    return updates
+
+
+def merge_points(columns: dict | None, updates: dict[date, SeriesPoint | None]) -> dict | None:
+    """
+    Apply bulletin updates to a stored series without decoding it
+    
+    The stored arrays are zipped into a dict keyed by publication day
+    ordinal, the updates are applied by key, and the arrays are emitted
+    sorted in one pass, so a refresh costs one pass over the series
+    however many bulletins it touches.
+    
+    Args:
+        columns: Stored SERIES_VALUE_COLUMNS values, or None for a new series
+        updates: {publication date: new point, or None to remove it}
+    
+    Returns:
+        New column values; columns itself if nothing changed; None if the
+        series is now empty
+    """
+    if columns is None:
+        points = sorted(point for point in updates.values() if point is not None)
+        return encode_points(points) if points else None
+    
+    # {publication ordinal: (cutoff ordinal, status, visa class, stored URL)}
+    stored = dict(zip(
+        _unpack(columns['publication_dates']),
+        zip(
+            _unpack(columns['cutoff_ordinals']),
+            columns['statuses'],
+            columns['visa_classes'].split('\n'),
+            columns['bulletin_urls'].split('\n'),
+        ),
+    ))
+    
+    changed = False
+    for publication_date, point in updates.items():
+        ordinal = publication_date.toordinal()
+        packed = None if point is None else _packed_point(point)
+        if stored.get(ordinal) == packed:
+            continue
+        if packed is None:
+            del stored[ordinal]
+        else:
+            stored[ordinal] = packed
+        changed = True
+    
+    if not changed:
+        return columns
+    if not stored:
+        return None
+    ordinals = sorted(stored)
+    cutoffs, statuses, visa_classes, urls = zip(*map(stored.__getitem__, ordinals))
+    count = len(ordinals)
+    return {
+        'visa_class': min(visa_classes),
+        'first_publication_date': date.fromordinal(ordinals[0]),
+        'last_publication_date': date.fromordinal(ordinals[-1]),
+        'publication_dates': struct.pack(f'<{count}I', *ordinals),
+        'cutoff_ordinals': struct.pack(f'<{count}I', *cutoffs),
+        'statuses': bytes(statuses),
+        'visa_classes': '\n'.join(visa_classes),
+        'bulletin_urls': '\n'.join(urls),
+    }
+
+
+def series_changes(
+    updates: dict[tuple, dict[date, SeriesPoint | None]],
+    stored: dict[tuple, dict]
+) -> tuple[dict[tuple, dict], list[tuple]]:
+    """
+    Series to rewrite for a set of updates (see series_updates)
+    
+    Args:
+        updates: {series key: {publication date: point or None}}
+        stored: Stored column values of the updated series that exist
+    
+    Returns:
+        ({key: column values to store}, [keys whose series is now empty]);
+        series that come out unchanged are left out
+    """
+    to_write = {}
+    to_delete = []
+    for key, points in updates.items():
+        current = stored.get(key)
+        columns = merge_points(current, points)
+        if columns is current:
+            continue
+        if columns is None:
+            to_delete.append(key)
+        else:
+            to_write[key] = columns
+    return to_write, to_delete
+
+
+def encode_points(points: list[SeriesPoint]) -> dict:
+    """
+    Column values (SERIES_VALUE_COLUMNS) for a non-empty series
+    
+    Example:
+        >>> encode_points([SeriesPoint(date(2024, 1, 1), 'F1', None, STATUS_CURRENT, '')])['statuses']
+        b'\\x01'
+    """
+    count = len(points)
+    return {
+        # Lowest spelling across all rows (each point holds its date's lowest)
+        'visa_class': min(point.visa_class for point in points),
+        'first_publication_date': points[0].publication_date,
+        'last_publication_date': points[-1].publication_date,
+        'publication_dates': struct.pack(f'<{count}I', *(point.publication_date.toordinal() for point in points)),
+        'cutoff_ordinals': struct.pack(
+            f'<{count}I', *(point.cutoff_date.toordinal() if point.cutoff_date else 0 for point in points)
+        ),
+        'statuses': bytes(point.status for point in points),
+        'visa_classes': '\n'.join(point.visa_class for point in points),
+        'bulletin_urls': '\n'.join(_stored_url(point) for point in points),
+    }
+
+
+def decode_points(publication_dates: bytes, cutoff_ordinals: bytes, statuses: bytes,
+                  visa_classes: str, bulletin_urls: str) -> list[SeriesPoint]:
+    """Inverse of encode_points (for merging into a stored series)"""
+    return [
+        SeriesPoint(
+            published,
+            visa_class,
+            date.fromordinal(ordinal) if ordinal else None,
+            status,
+            url or _standard_bulletin_url(published),
+        )
+        for published, visa_class, ordinal, status, url in zip(
+            map(date.fromordinal, _unpack(publication_dates)),
+            visa_classes.split('\n'),
+            _unpack(cutoff_ordinals),
+            statuses,
+            bulletin_urls.split('\n'),
+        )
+    ]
+
+
+def decode_series(
+    publication_dates: bytes,
+    cutoff_ordinals: bytes,
+    statuses: bytes,
+    bulletin_urls: str
+) -> tuple[list[date], list[date | None], list[str]]:
+    """
+    Chart-ready lists for a stored series
+    
+    Returns:
+        (publication dates, cutoff dates, bulletin URLs); the cutoff is the
+        publication date when the class was current and None when it was
+        unavailable, matching the dashboard's charting convention
+    """
+    dates = [date.fromordinal(ordinal) for ordinal in _unpack(publication_dates)]
+    cutoff_dates = [
+        published if status == STATUS_CURRENT
+        else None if status == STATUS_UNAVAILABLE or not ordinal
+        else date.fromordinal(ordinal)
+        for published, ordinal, status in zip(dates, _unpack(cutoff_ordinals), statuses)
+    ]
+    urls = [
+        url or _standard_bulletin_url(published)
+        for published, url in zip(dates, bulletin_urls.split('\n'))
+    ]
+    return dates, cutoff_dates, urls
+
+
+def _stored_url(point: SeriesPoint) -> str:
+    """'' for the standard URL of the month, else the URL itself"""
+    return '' if point.bulletin_url == _standard_bulletin_url(point.publication_date) else point.bulletin_url
+
+
+def _packed_point(point: SeriesPoint) -> tuple[int, int, str, str]:
+    """(cutoff ordinal, status, visa class, stored URL) as held in the columns"""
+    cutoff = point.cutoff_date.toordinal() if point.cutoff_date else 0
+    return cutoff, point.status, point.visa_class, _stored_url(point)
+
+
+def _unpack(packed: bytes) -> tuple[int, ...]:
+    return struct.unpack(f'<{len(packed) // 4}I', packed)
@@ -0,0 +1,322 @@
+"""
+Memory-mapped binary series file (visa_bulletin.series)
+
+Every gunicorn worker otherwise reads the same packed series out of
+visa_series for every page it renders, into private memory, and starts
+cold each time it is recycled. After each ingest the refresh scripts
+export the whole table into one read-only binary file next to the
+database, and workers map it into memory: the OS page cache holds a
+single copy shared by every process, and a fresh worker finds it warm.
+
+Layout (little-endian):
+
+- header (HEADER_SIZE bytes): magic, format, series count, dataset
+  version and its updated_at stamp, then the offset and length of the
+  string table, the index and the data
+- string table: UTF-8 strings separated by NUL bytes
+- index: one fixed-width entry per series, sorted by key: string table
+  positions of category, country, action type, canonical class, visa
+  class and bulletin URLs, then the data offset and point count
+- data: per series, the int32 publication and cutoff day ordinals (the
+  lib.series_codec packing, 0 for no date), then one status byte per
+  point, padded to 4 bytes
+
+A file is versioned twice: FORMAT for the layout, and the dataset version
+token of the rows it was exported from. Readers only serve a series when
+that token matches the database's current version, so a missing or stale
+file falls back to SQL instead of showing old data.
+
+MappedSeriesFile checks the file at most every refresh interval and maps
+a newer one when the export has atomically replaced it. The previous
+mapping stays valid for requests still reading it and is released when
+the last reference goes.
+
+Django-free: export_series_file() reads the SQLite file directly and
+write_series_file() takes any DB-API cursor.
+
+Example:
+    series = series_file_for(Path('visa_bulletin.series')).current()
+    if series and series.token == version.token:
+        rows = series.series_rows('employment_based', 'india', 'final_action')
+"""
+
+import mmap
+import os
+import sqlite3
+import struct
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+
+FORMAT = 1
+MAGIC = b'VBSERIES'
+
+# magic, format, series count, dataset version, updated_at stamp (microseconds),
+# then (offset, length) of the string table, the index and the data
+_HEADER = struct.Struct('<8sIIQQ6Q')
+HEADER_SIZE = _HEADER.size
+
+# category, country, action type, canonical class, visa class, bulletin URLs
+# (string table positions), data offset, point count
+_ENTRY = struct.Struct('<8I')
+
+_SELECT_SERIES = (
+    "SELECT visa_category, country, action_type, canonical_class, visa_class, "
+    "publication_dates, cutoff_ordinals, statuses, bulletin_urls FROM visa_series "
+    "ORDER BY visa_category, country, action_type, canonical_class"
+)
+_SELECT_VERSION = 'SELECT version, updated_at FROM dataset_version'
+_HAS_VERSION_TABLE = "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'dataset_version'"
+
+
+def series_path_for(db_path: Path) -> Path:
+    """Series file exported next to a database (visa_bulletin.series)"""
+    return Path(db_path).with_suffix('.series')
+
+
+def version_token(version: int, stamp: int) -> str:
+    """Same token as DatasetVersion.token for a version and updated_at stamp"""
+    return f"{version}.{stamp:x}"
+
+
+@dataclass
+class SeriesFile:
+    """A mapped series file: the index in memory, the arrays in the mapping"""
+    path: Path
+    dataset_version: int
+    stamp: int
+    index: dict
+    
+    @property
+    def token(self) -> str:
+        return version_token(self.dataset_version, self.stamp)
+    
+    def __len__(self) -> int:
+        return sum(len(entries) for entries in self.index.values())
+    
+    def series_rows(self, category: str, country: str, action_type: str) -> list[tuple]:
+        """
+        Series of one dashboard page, in canonical class order
+        
+        Returns:
+            (canonical_class, visa_class, publication_dates, cutoff_ordinals,
+            statuses, bulletin_urls) tuples like
+            lib.series_repository.series_rows; the packed columns are
+            zero-copy memoryviews of the mapping
+        """
+        return self.index.get((category, country, action_type), [])
+
+
+def write_series_file(cursor, out_path: Path, has_version: bool = True) -> dict:
+    """
+    Write the series file of the database behind a DB-API cursor
+    
+    Args:
+        cursor: Cursor on any backend
+        out_path: Series file (atomically replaced)
+        has_version: Whether the dataset_version table exists
+    
+    Returns:
+        Summary of the written file: format, series, dataset_version, token, bytes
+    """
+    out_path = Path(out_path)
+    cursor.execute(_SELECT_SERIES)
+    rows = cursor.fetchall()
+    version, stamp = 0, 0
+    if has_version:
+        cursor.execute(_SELECT_VERSION)
+        stored = cursor.fetchone()
+        if stored:
+            version, stamp = stored[0], _stamp(stored[1])
+    
+    strings = {}
+    
+    def string_id(value: str) -> int:
+        return strings.setdefault(value, len(strings))
+    
+    entries = []
+    data = bytearray()
+    for category, country, action_type, canonical_class, visa_class, dates, cutoffs, statuses, urls in rows:
+        count = len(statuses)
+        if len(dates) != 4 * count or len(cutoffs) != 4 * count:
+            raise ValueError(f"visa_series {category}/{country}/{action_type}/{canonical_class}: column lengths differ")
+        entries.append(_ENTRY.pack(
+            string_id(category), string_id(country), string_id(action_type), string_id(canonical_class),
+            string_id(visa_class), string_id(urls), len(data), count,
+        ))
+        data += bytes(dates) + bytes(cutoffs) + bytes(statuses)
+        data += bytes(-len(data) % 4)
+    
+    string_table = '\0'.join(strings).encode()
+    string_table += bytes(-len(string_table) % 4)
+    index = b''.join(entries)
+    strings_offset = HEADER_SIZE
+    index_offset = strings_offset + len(string_table)
+    data_offset = index_offset + len(index)
+    header = _HEADER.pack(
+        MAGIC, FORMAT, len(entries), version, stamp,
+        strings_offset, len(string_table), index_offset, len(index), data_offset, len(data),
+    )
+    
+    tmp_path = out_path.with_name(out_path.name + '.tmp')
+    with open(tmp_path, 'wb') as f:
+        f.write(header)
+        f.write(string_table)
+        f.write(index)
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    # Readers map either the old file or the complete new one, never a partial write
+    os.replace(tmp_path, out_path)
+    return {
+        'format': FORMAT,
+        'series': len(entries),
+        'dataset_version': version,
+        'token': version_token(version, stamp),
+        'bytes': data_offset + len(data),
+    }
+
+
+def export_series_file(db_path: Path, out_path: Path | None = None) -> dict:
+    """
+    Write the series file of a SQLite database (atomically replaces out_path)
+    
+    Args:
+        db_path: SQLite database (opened read-only)
+        out_path: Series file (default: series_path_for(db_path))
+    
+    Returns:
+        Summary of the written file (see write_series_file)
+    """
+    conn = sqlite3.connect(f"file:{Path(db_path).resolve()}?mode=ro", uri=True)
+    try:
+        # Databases migrated before 0006 have no version yet
+        has_version = conn.execute(_HAS_VERSION_TABLE).fetchone() is not None
+        return write_series_file(conn.cursor(), out_path or series_path_for(db_path), has_version)
+    finally:
+        conn.close()
+
+
+def load_series_file(path: Path) -> SeriesFile:
+    """
+    Map a series file into memory and read its index
+    
+    The mapping stays valid after a newer export replaces the file.
+    """
+    path = Path(path)
+    with open(path, 'rb') as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if len(mapped) < HEADER_SIZE:
+        raise ValueError(f"{path}: truncated series file")
+    (magic, file_format, count, version, stamp,
+     strings_offset, strings_length, index_offset, index_length, data_offset, data_length) = (
+        _HEADER.unpack_from(mapped)
+    )
+    if magic != MAGIC:
+        raise ValueError(f"{path}: not a series file")
+    if file_format != FORMAT:
+        raise ValueError(f"{path}: unsupported series file format {file_format}")
+    if data_offset + data_length > len(mapped) or index_length != count * _ENTRY.size:
+        raise ValueError(f"{path}: truncated series file")
+    
+    view = memoryview(mapped)
+    strings = bytes(view[strings_offset:strings_offset + strings_length]).rstrip(b'\0').decode().split('\0')
+    data = view[data_offset:data_offset + data_length]
+    index = {}
+    for (category, country, action_type, canonical_class, visa_class, urls, offset, points) in (
+        _ENTRY.iter_unpack(view[index_offset:index_offset + index_length])
+    ):
+        statuses = offset + 8 * points
+        index.setdefault((strings[category], strings[country], strings[action_type]), []).append((
+            strings[canonical_class],
+            strings[visa_class],
+            data[offset:offset + 4 * points],
+            data[offset + 4 * points:statuses],
+            data[statuses:statuses + points],
+            strings[urls],
+        ))
+    return SeriesFile(path=path, dataset_version=version, stamp=stamp, index=index)
+
+
+class MappedSeriesFile:
+    """Process-wide mapping of a series file that follows atomic replacements"""
+    
+    def __init__(self, path: Path, refresh_interval: float = 2.0):
+        """
+        Args:
+            path: Series file (need not exist yet)
+            refresh_interval: Minimum seconds between checks for a new file
+        """
+        self.path = Path(path)
+        self.refresh_interval = refresh_interval
+        self.loads = 0
+        self._lock = threading.Lock()
+        self._current: SeriesFile | None = None
+        self._marker: tuple | None = None
+        self._next_check = 0.0
+    
+    def current(self) -> SeriesFile | None:
+        """The mapped file (None if there is none or it cannot be read)"""
+        if time.monotonic() >= self._next_check:
+            self.refresh()
+        return self._current
+    
+    def refresh(self) -> bool:
+        """
+        Map the file again if it was replaced since the last check
+        
+        Returns:
+            True if a new file was mapped
+        """
+        with self._lock:
+            self._next_check = time.monotonic() + self.refresh_interval
+            marker = _file_marker(self.path)
+            if marker == self._marker:
+                return False
+            try:
+                loaded = load_series_file(self.path) if marker else None
+            except (OSError, ValueError):
+                loaded = None  # Callers fall back to SQL
+            # One reference swap: a request sees the old file or the new one
+            self._current, self._marker = loaded, marker
+            if loaded is None:
+                return False
+            self.loads += 1
+            return True
+
+
+_series_files: dict[Path, MappedSeriesFile] = {}
+_series_files_lock = threading.Lock()
+
+
+def series_file_for(path: Path) -> MappedSeriesFile:
+    """The process-wide mapping of the series file at path (created on first use)"""
+    path = Path(path).resolve()
+    with _series_files_lock:
+        mapped = _series_files.get(path)
+        if mapped is None:
+            mapped = _series_files[path] = MappedSeriesFile(path)
+        return mapped
+
+
+def _file_marker(path: Path) -> tuple | None:
+    """Changes whenever the file is replaced (None if it does not exist)"""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+
+def _stamp(updated_at) -> int:
+    """updated_at as DatasetVersion.token stamps it (microseconds since the epoch)"""
+    if updated_at is None:
+        return 0
+    if isinstance(updated_at, str):
+        updated_at = datetime.fromisoformat(updated_at)
+    if updated_at.tzinfo is None:
+        # Django stores aware datetimes in SQLite as naive UTC
+        updated_at = updated_at.replace(tzinfo=timezone.utc)
+    return int(updated_at.timestamp() * 1_000_000)
@@ -0,0 +1,54 @@
+"""
+Read-side repository of the dashboard: its series reads, as plain tuples
+
+series_rows() selects exactly the columns a page uses with values_list()
+and iterates the cursor in chunks, so no model instance (and no unused
+column such as VisaSeries.visa_classes) is built per row. Callers unpack the
+tuples by SERIES_FIELDS. When the mapped series file is current, the rows
+come from it without a query.
+
+Example:
+    for canonical_class, visa_class, *packed in series_rows('employment_based', 'india', 'final_action'):
+        ...
+"""
+
+from django.conf import settings
+
+from lib.series_file import series_file_for
+from models.visa_series import VisaSeries
+
+# Columns the dashboard reads from each VisaSeries row
+SERIES_FIELDS = (
+    'canonical_class', 'visa_class', 'publication_dates', 'cutoff_ordinals', 'statuses', 'bulletin_urls',
+)
+
+# Rows fetched from the cursor at a time
+ROW_CHUNK_SIZE = 2000
+
+
+def series_rows(category: str, country: str, action_type: str, dataset_token: str | None = None):
+    """
+    Packed series behind one dashboard page, one row per canonical class
+    
+    Args:
+        category: Visa category value
+        country: Country code
+        action_type: Action type value
+        dataset_token: Current DatasetVersion.token; when the mapped series
+            file (settings.SERIES_FILE) was exported at that version, the
+            rows come from it without a query
+    
+    Returns:
+        Iterable of SERIES_FIELDS tuples ordered by canonical class; read
+        from the database, it streams the cursor and can be iterated once
+    """
+    if dataset_token is not None:
+        series_file = series_file_for(settings.SERIES_FILE).current()
+        if series_file is not None and series_file.token == dataset_token:
+            return series_file.series_rows(category, country, action_type)
+    return VisaSeries.objects.filter(
+        visa_category=category,
+        country=country,
+        action_type=action_type
+    ).order_by('canonical_class').values_list(*SERIES_FIELDS).iterator(chunk_size=ROW_CHUNK_SIZE)
+
@@ -0,0 +1,96 @@
+"""
+Series store - keeps the visa_series table in step with visa_cutoff_date
+
+The ORM ingest path records which series each saved bulletin touched and
+refreshes them once per transaction (extractors.bulletin_handler), so a
+batch of bulletins rewrites each series once; extractors.sqlite_writer
+does the same in plain SQL. rebuild_series() derives the whole table from
+scratch (data migration, repairs).
+"""
+
+from django.db import DEFAULT_DB_ALIAS
+
+from lib.series_codec import (
+    SERIES_KEY_COLUMNS,
+    SERIES_ROW_COLUMNS,
+    SERIES_VALUE_COLUMNS,
+    encode_points,
+    group_series_points,
+    series_changes,
+    series_updates,
+)
+
+
+def refresh_bulletin_series(saved_bulletins, using: str = DEFAULT_DB_ALIAS) -> int:
+    """
+    Re-derive the points of some bulletins in every series they touch
+    
+    Args:
+        saved_bulletins: (bulletin, previous series keys) pairs for bulletins
+            whose cutoff rows were just saved; the keys are those of the
+            bulletin's rows before the save (empty for a new bulletin)
+        using: Database alias
+        
+    Returns:
+        Number of series rows written or deleted
+    """
+    from models.visa_cutoff_date import VisaCutoffDate
+    from models.visa_series import VisaSeries
+    
+    if not saved_bulletins:
+        return 0
+    # Any order will do (group_series_points); the model ordering would join bulletin and sort
+    rows = VisaCutoffDate.objects.using(using).filter(
+        bulletin__in=[bulletin for bulletin, _ in saved_bulletins]
+    ).exclude(canonical_class='').order_by().values_list(*SERIES_ROW_COLUMNS)
+    previous_keys = {}
+    for bulletin, keys in saved_bulletins:
+        previous_keys.setdefault(bulletin.publication_date, set()).update(keys)
+    updates = series_updates(rows, previous_keys)
+    
+    # Superset of the updated keys in one query; exact keys picked here
+    candidates = VisaSeries.objects.using(using).filter(
+        **{f'{name}__in': {key[i] for key in updates} for i, name in enumerate(SERIES_KEY_COLUMNS)}
+    )
+    stored = {series.key: series for series in candidates if series.key in updates}
+    to_write, to_delete = series_changes(
+        updates, {key: series.packed_columns() for key, series in stored.items()}
+    )
+    
+    VisaSeries.objects.using(using).bulk_create(
+        [VisaSeries(**dict(zip(SERIES_KEY_COLUMNS, key)), **columns) for key, columns in to_write.items()],
+        update_conflicts=True,
+        unique_fields=SERIES_KEY_COLUMNS,
+        update_fields=SERIES_VALUE_COLUMNS,
+    )
+    VisaSeries.objects.using(using).filter(pk__in=[stored[key].pk for key in to_delete]).delete()
+    return len(to_write) + len(to_delete)
+
+
+def rebuild_series(using: str = DEFAULT_DB_ALIAS, cutoff_model=None, series_model=None) -> int:
+    """
+    Replace the whole visa_series table with series derived from the cutoff rows
+    
+    Args:
+        using: Database alias
+        cutoff_model: VisaCutoffDate class (a data migration passes its historical model)
+        series_model: VisaSeries class (likewise)
+    
+    Returns:
+        Number of series written
+    """
+    if cutoff_model is None:
+        from models.visa_cutoff_date import VisaCutoffDate as cutoff_model
+    if series_model is None:
+        from models.visa_series import VisaSeries as series_model
+    
+    rows = cutoff_model.objects.using(using).exclude(
+        canonical_class=''
+    ).values_list(*SERIES_ROW_COLUMNS).iterator(chunk_size=5000)
+    series = [
+        series_model(**dict(zip(SERIES_KEY_COLUMNS, key)), **encode_points(points))
+        for key, points in group_series_points(rows).items()
+    ]
+    series_model.objects.using(using).all().delete()
+    series_model.objects.using(using).bulk_create(series, batch_size=500)
+    return len(series)
@@ -0,0 +1,132 @@
+"""
+Visa class catalog - every class the data holds, built once per dataset version
+
+Listing classes used to mean a DISTINCT scan over visa_cutoff_date and a
+normalization of every raw spelling on each call. The catalog answers all
+of those lookups from one grouped query, cached under the dataset version
+token like the dashboard series, so it is rebuilt only after an ingest:
+
+- per (category, country, action type): each canonical class with its raw
+  spellings (aliases) and the first and last bulletin that listed it
+- per category: the same classes merged across countries and action types,
+  and every raw spelling, including unrecognized ones (canonical_class='')
+
+Example:
+    catalog = get_visa_class_catalog(version.token)
+    eb2 = catalog.page_classes('employment_based', 'india', 'final_action')['EB-2: Professionals with Advanced Degrees']
+    eb2.aliases, eb2.first_seen, eb2.last_seen
+"""
+
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Iterable
+
+from django.core.cache import cache
+from django.db.models import Max, Min
+
+from lib.dataset_version import current_dataset_version
+from models.visa_cutoff_date import VisaCutoffDate
+
+# Lifetime of a cached catalog; the dataset version in the key ends it sooner
+CATALOG_TIMEOUT = 60 * 60 * 24
+
+# Columns of a catalog row (see catalog_from_rows)
+CATALOG_ROW_COLUMNS = (
+    'visa_category', 'country', 'action_type', 'canonical_class', 'visa_class', 'first_seen', 'last_seen',
+)
+
+
+@dataclass(frozen=True)
+class CatalogClass:
+    """A canonical class and the raw spellings it was published under"""
+    canonical_class: str
+    aliases: tuple[str, ...]
+    first_seen: date
+    last_seen: date
+    
+    @property
+    def value(self) -> str:
+        """Lowest raw spelling (the value the dashboard links a class by)"""
+        return self.aliases[0]
+
+
+@dataclass
+class VisaClassCatalog:
+    """Canonical classes per dashboard page and per category (see module docstring)"""
+    pages: dict[tuple, dict[str, CatalogClass]] = field(default_factory=dict)
+    categories: dict[str, list[CatalogClass]] = field(default_factory=dict)
+    raw_classes: dict[str, list[str]] = field(default_factory=dict)
+    
+    def page_classes(self, category: str, country: str, action_type: str) -> dict[str, CatalogClass]:
+        """{canonical class: entry} of one dashboard page, in canonical class order"""
+        return self.pages.get((category, country, action_type), {})
+    
+    def category_classes(self, category: str) -> list[CatalogClass]:
+        """Classes of a category across countries and action types, by canonical class"""
+        return self.categories.get(category, [])
+    
+    def category_raw_classes(self, category: str) -> list[str]:
+        """Every raw spelling of a category, sorted, recognized or not"""
+        return self.raw_classes.get(category, [])
+
+
+def catalog_from_rows(rows: Iterable[tuple]) -> VisaClassCatalog:
+    """
+    Build a catalog from grouped cutoff rows
+    
+    Args:
+        rows: CATALOG_ROW_COLUMNS tuples, one per (category, country, action
+            type, canonical class, raw spelling), any order
+    """
+    pages: dict[tuple, dict[str, list]] = {}
+    categories: dict[str, dict[str, list]] = {}
+    raw_classes: dict[str, set[str]] = {}
+    for category, country, action_type, canonical_class, visa_class, first_seen, last_seen in rows:
+        raw_classes.setdefault(category, set()).add(visa_class)
+        if not canonical_class:
+            continue
+        for classes in (pages.setdefault((category, country, action_type), {}), categories.setdefault(category, {})):
+            aliases, seen = classes.setdefault(canonical_class, [set(), []])
+            aliases.add(visa_class)
+            seen += (first_seen, last_seen)
+    
+    def entries(classes: dict[str, list]) -> list[CatalogClass]:
+        return [
+            CatalogClass(canonical_class, tuple(sorted(aliases)), min(seen), max(seen))
+            for canonical_class, (aliases, seen) in sorted(classes.items())
+        ]
+    
+    return VisaClassCatalog(
+        pages={
+            key: {entry.canonical_class: entry for entry in entries(classes)}
+            for key, classes in sorted(pages.items())
+        },
+        categories={category: entries(classes) for category, classes in categories.items()},
+        raw_classes={category: sorted(spellings) for category, spellings in raw_classes.items()},
+    )
+
+
+def build_visa_class_catalog() -> VisaClassCatalog:
+    """Catalog of the current data (one grouped query over visa_cutoff_date)"""
+    rows = VisaCutoffDate.objects.values_list(*CATALOG_ROW_COLUMNS[:5]).annotate(
+        first_seen=Min('publication_date'), last_seen=Max('publication_date')
+    ).order_by()
+    return catalog_from_rows(rows)
+
+
+def get_visa_class_catalog(dataset_token: str | None = None) -> VisaClassCatalog:
+    """
+    The catalog, cached until the dataset changes
+    
+    Args:
+        dataset_token: Current DatasetVersion.token (part of the cache key);
+            looked up when not given
+    """
+    if dataset_token is None:
+        dataset_token = current_dataset_version().token
+    key = f"visa-class-catalog-{dataset_token}"
+    catalog = cache.get(key)
+    if catalog is None:
+        catalog = build_visa_class_catalog()
+        cache.set(key, catalog, CATALOG_TIMEOUT)
+    return catalog
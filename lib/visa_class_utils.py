@@ -6,6 +6,49 @@ of visa class names in the historical data. This module provides utilities
 to handle these variations.
 """
 
+from functools import lru_cache
+
+from models.enums.employment_preference import EmploymentPreference
+from models.enums.family_preference import FamilyPreference
+from models.enums.visa_category import VisaCategory
+
+
+@lru_cache(maxsize=1024)
+def canonical_visa_class(visa_category: str, visa_class: str) -> str:
+    """
+    Canonical class a raw visa class is grouped under on the dashboard
+    
+    Computed at ingest and stored in VisaCutoffDate.canonical_class so read
+    paths can group and filter in SQL instead of normalizing every row.
+    Memoized: the corpus has fewer than a hundred distinct raw classes.
+    
+    Args:
+        visa_category: VisaCategory value of the row
+        visa_class: Raw visa class from the bulletin
+        
+    Returns:
+        Employment display name or FamilyPreference value; empty string if
+        the class is not recognized (those rows are never charted)
+        
+    Example:
+        >>> canonical_visa_class('employment_based', '1 st')
+        'EB-1: Priority Workers'
+        >>> canonical_visa_class('family_sponsored', '2A')
+        'F2A'
+    """
+    if visa_category == VisaCategory.EMPLOYMENT_BASED.value:
+        display_name = EmploymentPreference.normalize_for_display(visa_class)
+        # Unrecognized classes normalize to themselves
+        if not display_name or display_name == visa_class:
+            return ''
+        return display_name
+    
+    if visa_category == VisaCategory.FAMILY_SPONSORED.value:
+        normalized_class = FamilyPreference.normalize_legacy_name(visa_class)
+        return normalized_class if normalized_class in FamilyPreference.values else ''
+    
+    return ''
+
 
 def get_all_employment_visa_classes_from_db() -> list[str]:
     """
@@ -15,22 +58,23 @@ def get_all_employment_visa_classes_from_db() -> list[str]:
         List of visa class strings, sorted
         
     Note: This includes all historical variations, not just enum values
+    (read from the visa class catalog, built once per dataset version)
     """
-    from models.visa_cutoff_date import VisaCutoffDate
+    from lib.visa_class_catalog import get_visa_class_catalog
     
-    classes = VisaCutoffDate.objects.filter(
-        visa_category='employment_based'
-    ).values_list('visa_class', flat=True).distinct().order_by('visa_class')
-    
-    return list(classes)
+    return get_visa_class_catalog().category_raw_classes(VisaCategory.EMPLOYMENT_BASED.value)
 
 
-def get_deduplicated_employment_classes() -> list[tuple[str, str]]:
+def get_deduplicated_employment_classes(dataset_token: str | None = None) -> list[tuple[str, str]]:
     """
     Get deduplicated employment visa classes with normalized display names
     
-    Returns historical variations from database but deduplicates the display names.
-    Maps each unique normalized name to a representative raw database value.
+    Read from the visa class catalog, which groups on the stored
+    canonical_class column once per dataset version. Each display name maps
+    to its smallest raw database value.
+    
+    Args:
+        dataset_token: Current DatasetVersion.token (looked up when not given)
     
     Returns:
         List of (raw_value, display_name) tuples, sorted by display name
@@ -40,35 +84,12 @@ def get_deduplicated_employment_classes() -> list[tuple[str, str]]:
          ("2nd", "EB-2: Professionals with Advanced Degrees"),
          ...]
     """
-    from models.enums.employment_preference import EmploymentPreference
-    from models.visa_cutoff_date import VisaCutoffDate
-    
-    # Get all raw values from database
-    raw_classes = VisaCutoffDate.objects.filter(
-        visa_category='employment_based'
-    ).values_list('visa_class', flat=True).distinct()
-    
-    # Filter out invalid visa class values (empty, 'C', 'U', single letters)
-    invalid_values = {'', 'C', 'U', 'c', 'u'}
+    from lib.visa_class_catalog import get_visa_class_catalog
     
-    # Build a map: normalized_display_name -> first raw value seen
-    seen_displays: dict[str, str] = {}
-    for raw_class in raw_classes:
-        # Skip invalid values
-        if not raw_class or raw_class in invalid_values:
-            continue
-        
-        display_name = EmploymentPreference.normalize_for_display(raw_class)
-        
-        # Skip if normalization returned empty or the same as input (unrecognized)
-        if display_name and display_name not in seen_displays:
-            seen_displays[display_name] = raw_class
-    
-    # Convert to list of tuples and sort by display name
-    result = [(raw, display) for display, raw in seen_displays.items()]
-    result.sort(key=lambda x: x[1])  # Sort by display name
-    
-    return result
+    return [
+        (entry.value, entry.canonical_class)
+        for entry in get_visa_class_catalog(dataset_token).category_classes(VisaCategory.EMPLOYMENT_BASED.value)
+    ]
 
 
 def get_all_family_visa_classes_from_db() -> list[str]:
@@ -76,15 +97,11 @@ def get_all_family_visa_classes_from_db() -> list[str]:
     Get all distinct family-sponsored visa classes from the database
     
     Returns:
-        List of visa class strings, sorted
+        List of visa class strings, sorted (from the visa class catalog)
     """
-    from models.visa_cutoff_date import VisaCutoffDate
-    
-    classes = VisaCutoffDate.objects.filter(
-        visa_category='family_sponsored'
-    ).values_list('visa_class', flat=True).distinct().order_by('visa_class')
+    from lib.visa_class_catalog import get_visa_class_catalog
     
-    return list(classes)
+    return get_visa_class_catalog().category_raw_classes(VisaCategory.FAMILY_SPONSORED.value)
 
 
 def normalize_visa_class_for_display(visa_class: str) -> str:
@@ -104,6 +121,5 @@ def normalize_visa_class_for_display(visa_class: str) -> str:
         >>> normalize_visa_class_for_display("5th Set Aside: (High Unemployment - 10%)")
         "EB-5: High Unemployment (10%)"
     """
-    from models.enums.employment_preference import EmploymentPreference
     return EmploymentPreference.normalize_for_display(visa_class)
 
@@ -1,4 +1,4 @@
 # Models package
-# Don't import models here - Django will load them automatically
+# Don't import models here - ModelsConfig.ready() imports them once the app registry is ready
 
 
@@ -6,4 +6,9 @@ from django.apps import AppConfig
 class ModelsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'models'
-
+    
+    def ready(self):
+        # The package has no models.py: import every model module so each
+        # model is registered even when nothing else imported it (otherwise
+        # makemigrations sees the model as deleted)
+        from models import bulletin, dataset_version, visa_cutoff_date, visa_series  # noqa: F401
@@ -2,6 +2,8 @@
 
 from django.db import models
 
+from lib.bulletin_url import resolve_bulletin_url
+
 
 class Bulletin(models.Model):
     """
@@ -50,16 +52,4 @@ class Bulletin(models.Model):
             >>> bulletin.get_bulletin_url()
             'https://travel.state.gov/content/travel/en/legal/visa-law0/visa-bulletin/2026/visa-bulletin-for-december-2025.html'
         """
-        if self.url:
-            return self.url
-        
-        # Construct URL from publication date
-        # Format: visa-bulletin-for-{month}-{year}.html
-        month_name = self.publication_date.strftime('%B').lower()  # e.g., "december"
-        year = self.publication_date.year
-        
-        # Note: The URL uses the fiscal year in the path (typically year+1 for Oct-Dec)
-        fiscal_year = year + 1 if self.publication_date.month >= 10 else year
-        
-        return f"https://travel.state.gov/content/travel/en/legal/visa-law0/visa-bulletin/{fiscal_year}/visa-bulletin-for-{month_name}-{year}.html"
-
+        return resolve_bulletin_url(self.publication_date, self.url)
@@ -0,0 +1,57 @@
+"""DatasetVersion model - single-row epoch of the bulletin data"""
+
+from django.db import models
+
+# The table only ever holds this row
+DATASET_VERSION_ID = 1
+
+
+class DatasetVersion(models.Model):
+    """
+    Monotonic version of the whole dataset
+    
+    Every ingest transaction that writes cutoff rows bumps it before
+    committing (lib.dataset_version, extractors.sqlite_writer), so the web
+    tier can cache pages, ETags and the sitemap for as long as the
+    version is unchanged.
+    """
+    
+    id = models.PositiveSmallIntegerField(
+        primary_key=True,
+        default=DATASET_VERSION_ID
+    )
+    
+    version = models.PositiveBigIntegerField(
+        default=0,
+        help_text="Incremented by every ingest that changed data"
+    )
+    
+    updated_at = models.DateTimeField(
+        null=True,
+        help_text="When the version was last bumped"
+    )
+    
+    latest_bulletin_date = models.DateField(
+        null=True,
+        help_text="Newest bulletin publication date at the last bump"
+    )
+    
+    class Meta:
+        db_table = 'dataset_version'
+    
+    def __str__(self):
+        return f"Dataset v{self.version}"
+    
+    def __repr__(self):
+        return f"<DatasetVersion: {self.version} @ {self.updated_at}>"
+    
+    @property
+    def token(self) -> str:
+        """
+        Opaque cache/ETag token for this version
+        
+        The timestamp keeps tokens unique even if the counter restarts
+        (e.g. a database restored from an old backup).
+        """
+        stamp = int(self.updated_at.timestamp() * 1_000_000) if self.updated_at else 0
+        return f"{self.version}.{stamp:x}"
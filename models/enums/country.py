@@ -1,6 +1,7 @@
 """Country/region enum for visa applicant chargeability"""
 
 import re
+from functools import lru_cache
 from django.db import models
 
 
@@ -28,30 +29,37 @@ class Country(models.TextChoices):
         Parse country from table header string using robust pattern matching
         
         Uses regex patterns to handle variations in spacing, punctuation, and formatting.
-        Falls back to exact matching for edge cases.
+        Falls back to exact matching for edge cases. Results are memoized: the
+        corpus only has a few dozen distinct header spellings.
         """
-        # Normalize whitespace and special characters
-        normalized = re.sub(r'[\s\xa0\n]+', ' ', header).strip().upper()
-        
-        # Pattern-based matching (order matters - most specific first)
-        patterns = [
-            (r'CHINA.*MAINLAND', cls.CHINA),
-            (r'^INDIA$', cls.INDIA),
-            (r'^MEXICO$', cls.MEXICO),
-            (r'^PHILIPPINES$', cls.PHILIPPINES),
-            (r'EL SALVADOR.*GUATEMALA.*HONDURAS', cls.EL_SALVADOR_GUATEMALA_HONDURAS),
-            (r'ALL.*CHARGEABILITY.*EXCEPT', cls.ALL),
-        ]
-        
-        for pattern, country in patterns:
-            if re.search(pattern, normalized):
-                return country
-        
-        # Fallback: exact matching for edge cases
-        exact_mappings = {
-            'ALL CHARGEABILITY AREAS EXCEPT THOSE LISTED': cls.ALL,
-            'ALL AREAS': cls.ALL,
-        }
-        
-        return exact_mappings.get(normalized)
+        return _country_from_header(header)
+
+
+_WHITESPACE_RE = re.compile(r'[\s\xa0\n]+')
 
+# Pattern-based matching (order matters - most specific first)
+_HEADER_PATTERNS = [
+    (re.compile(r'CHINA.*MAINLAND'), Country.CHINA),
+    (re.compile(r'^INDIA$'), Country.INDIA),
+    (re.compile(r'^MEXICO$'), Country.MEXICO),
+    (re.compile(r'^PHILIPPINES$'), Country.PHILIPPINES),
+    (re.compile(r'EL SALVADOR.*GUATEMALA.*HONDURAS'), Country.EL_SALVADOR_GUATEMALA_HONDURAS),
+    (re.compile(r'ALL.*CHARGEABILITY.*EXCEPT'), Country.ALL),
+]
+
+# Fallback: exact matching for edge cases
+_EXACT_HEADERS = {
+    'ALL CHARGEABILITY AREAS EXCEPT THOSE LISTED': Country.ALL,
+    'ALL AREAS': Country.ALL,
+}
+
+
+@lru_cache(maxsize=512)
+def _country_from_header(header: str):
+    normalized = _WHITESPACE_RE.sub(' ', header).strip().upper()
+    
+    for pattern, country in _HEADER_PATTERNS:
+        if pattern.search(normalized):
+            return country
+    
+    return _EXACT_HEADERS.get(normalized)
@@ -1,5 +1,9 @@
 """Employment-based visa preference categories"""
 
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+
 from django.db import models
 
 
@@ -27,66 +31,97 @@ class EmploymentPreference(models.TextChoices):
         Normalize historical visa class names to consistent display format.
         This handles all the variations from old bulletins.
         
+        Classification is table-driven (see _DISPLAY_RULES) and memoized per
+        raw string, so repeated calls cost a dict lookup.
+        
         Args:
             visa_class: Raw visa class string from database
             
         Returns:
             Normalized, user-friendly display name
         """
-        # Clean up and normalize whitespace/punctuation
-        clean = ' '.join(visa_class.split())  # Normalize whitespace
-        clean = clean.replace(' -', '-').replace('- ', '-')  # Normalize hyphens
-        clean_lower = clean.lower()
-        
-        # EB-1 through EB-4 (handles "1st", "1 st", etc.)
-        if clean.startswith('1') or '1 st' in clean or '1st' in clean:
-            return 'EB-1: Priority Workers'
-        if clean.startswith('2') or '2 nd' in clean or '2nd' in clean:
-            return 'EB-2: Professionals with Advanced Degrees'
-        if clean.startswith('3') or '3 rd' in clean or '3rd' in clean:
-            if 'other worker' in clean_lower:
-                return 'EB-3: Other Workers'
-            return 'EB-3: Skilled Workers, Professionals'
-        if clean.startswith('4') or '4 th' in clean or '4th' in clean:
-            if 'religious' in clean_lower:
-                return 'EB-4: Religious Workers'
-            return 'EB-4: Special Immigrants'
-        
-        # EB-5 variations (MANY historical formats!)
-        if '5' in clean or 'eb-5' in clean_lower:
-            # Check for specific EB-5 subcategories
-            if 'high unemployment' in clean_lower or '(nh' in clean_lower or 'rh' in clean_lower or 'nh,' in clean_lower:
-                return 'EB-5: High Unemployment (10%)'
-            if 'infrastructure' in clean_lower or '(ri' in clean_lower or 'ri)' in clean_lower:
-                return 'EB-5: Infrastructure (2%)'
-            if 'rural' in clean_lower or '(nr' in clean_lower or 'rr' in clean_lower or 'nr,' in clean_lower:
-                return 'EB-5: Rural (20%)'
-            if 'unreserved' in clean_lower or 'all others' in clean_lower:
-                return 'EB-5: Unreserved'
-            # Non-Regional must be checked BEFORE Regional (substring match issue)
-            if 'non-regional' in clean_lower:
-                return 'EB-5: Non-Regional Center'
-            # Targeted/Regional (multiple spelling variations!)
-            if 'targeted' in clean_lower or 'regional' in clean_lower or 'employ-ment' in clean_lower or 'employmentareas' in clean_lower:
-                return 'EB-5: Targeted Employment Areas / Regional Centers'
-            if 'pilot' in clean_lower:
-                return 'EB-5: Pilot Programs'
-            # Generic EB-5
-            return 'EB-5: All Categories'
-        
-        # Special subcategories
-        if 'other worker' in clean_lower:
-            return 'EB-3: Other Workers'
-        if 'religious' in clean_lower:
-            return 'EB-4: Religious Workers'
-        if 'schedule a' in clean_lower:
-            return 'Schedule A Workers'
-        if 'iraqi' in clean_lower or 'afghani' in clean_lower:
-            return 'Iraqi & Afghani Translators'
-        
-        # Single letters usually mean "Current" or "Unavailable"
-        if clean in ('C', 'U'):
-            return clean
-        
-        # Fallback: return cleaned version
-        return clean
+        return _display_name(visa_class)
+
+
+@dataclass(frozen=True)
+class _Rule:
+    """
+    One classification rule
+    
+    Matches if `clean` is found in the whitespace/hyphen-normalized class or
+    `lower` in its lowercase form. The first matching refinement overrides
+    `display`.
+    """
+    display: str
+    clean: re.Pattern | None = None
+    lower: re.Pattern | None = None
+    refinements: tuple['_Rule', ...] = ()
+    
+    def matches(self, clean: str, clean_lower: str) -> bool:
+        return bool(
+            (self.clean and self.clean.search(clean))
+            or (self.lower and self.lower.search(clean_lower))
+        )
+    
+    def classify(self, clean: str, clean_lower: str) -> str:
+        for refinement in self.refinements:
+            if refinement.matches(clean, clean_lower):
+                return refinement.display
+        return self.display
+
+
+def _rule(display: str, clean: str | None = None, lower: str | None = None, refinements=()) -> _Rule:
+    return _Rule(
+        display,
+        re.compile(clean) if clean else None,
+        re.compile(lower) if lower else None,
+        tuple(refinements),
+    )
+
+
+# Ordered: the first matching rule wins
+_DISPLAY_RULES = (
+    # EB-1 through EB-4 (handles "1st", "1 st", etc.)
+    _rule('EB-1: Priority Workers', clean=r'^1|1 st|1st'),
+    _rule('EB-2: Professionals with Advanced Degrees', clean=r'^2|2 nd|2nd'),
+    _rule('EB-3: Skilled Workers, Professionals', clean=r'^3|3 rd|3rd', refinements=[
+        _rule('EB-3: Other Workers', lower=r'other worker'),
+    ]),
+    _rule('EB-4: Special Immigrants', clean=r'^4|4 th|4th', refinements=[
+        _rule('EB-4: Religious Workers', lower=r'religious'),
+    ]),
+    # EB-5 variations (MANY historical formats!)
+    _rule('EB-5: All Categories', clean=r'5', lower=r'eb-5', refinements=[
+        _rule('EB-5: High Unemployment (10%)', lower=r'high unemployment|\(nh|rh|nh,'),
+        _rule('EB-5: Infrastructure (2%)', lower=r'infrastructure|\(ri|ri\)'),
+        _rule('EB-5: Rural (20%)', lower=r'rural|\(nr|rr|nr,'),
+        _rule('EB-5: Unreserved', lower=r'unreserved|all others'),
+        # Non-Regional must be checked BEFORE Regional (substring match issue)
+        _rule('EB-5: Non-Regional Center', lower=r'non-regional'),
+        # Targeted/Regional (multiple spelling variations!)
+        _rule('EB-5: Targeted Employment Areas / Regional Centers',
+              lower=r'targeted|regional|employ-ment|employmentareas'),
+        _rule('EB-5: Pilot Programs', lower=r'pilot'),
+    ]),
+    # Special subcategories
+    _rule('EB-3: Other Workers', lower=r'other worker'),
+    _rule('EB-4: Religious Workers', lower=r'religious'),
+    _rule('Schedule A Workers', lower=r'schedule a'),
+    _rule('Iraqi & Afghani Translators', lower=r'iraqi|afghani'),
+)
+
+
+@lru_cache(maxsize=1024)
+def _display_name(visa_class: str) -> str:
+    # Clean up and normalize whitespace/punctuation
+    clean = ' '.join(visa_class.split())  # Normalize whitespace
+    clean = clean.replace(' -', '-').replace('- ', '-')  # Normalize hyphens
+    clean_lower = clean.lower()
+    
+    for rule in _DISPLAY_RULES:
+        if rule.matches(clean, clean_lower):
+            return rule.classify(clean, clean_lower)
+    
+    # Fallback: cleaned version (single letters usually mean "Current"
+    # or "Unavailable" and come back unchanged)
+    return clean
@@ -21,18 +21,7 @@ class FamilyPreference(models.TextChoices):
         Returns:
             Dictionary mapping old format to enum values
         """
-        return {
-            '1st': cls.F1.value,
-            '1 st': cls.F1.value,
-            '2A': cls.F2A.value,
-            '2 A': cls.F2A.value,
-            '2B': cls.F2B.value,
-            '2 B': cls.F2B.value,
-            '3rd': cls.F3.value,
-            '3 rd': cls.F3.value,
-            '4th': cls.F4.value,
-            '4 th': cls.F4.value,
-        }
+        return dict(_LEGACY_NAMES)
     
     @classmethod
     def normalize_legacy_name(cls, visa_class: str) -> str:
@@ -51,5 +40,19 @@ class FamilyPreference(models.TextChoices):
             >>> FamilyPreference.normalize_legacy_name("F4")
             "F4"
         """
-        return cls._get_legacy_mappings().get(visa_class, visa_class)
+        return _LEGACY_NAMES.get(visa_class, visa_class)
 
+
+# Built once at import; normalize_legacy_name is called for every parsed row
+_LEGACY_NAMES = {
+    '1st': FamilyPreference.F1.value,
+    '1 st': FamilyPreference.F1.value,
+    '2A': FamilyPreference.F2A.value,
+    '2 A': FamilyPreference.F2A.value,
+    '2B': FamilyPreference.F2B.value,
+    '2 B': FamilyPreference.F2B.value,
+    '3rd': FamilyPreference.F3.value,
+    '3 rd': FamilyPreference.F3.value,
+    '4th': FamilyPreference.F4.value,
+    '4 th': FamilyPreference.F4.value,
+}
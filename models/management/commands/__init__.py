@@ -0,0 +1 @@
+# python manage.py <command>
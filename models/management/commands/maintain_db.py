@@ -0,0 +1,54 @@
+"""
+maintain_db - ANALYZE, WAL checkpoint and VACUUM INTO snapshots
+
+Runs extractors.db_maintenance.maintain_database() on the configured
+SQLite file under the ingest lock, and reports the file and WAL sizes
+before and after. The refresh scripts already do this after every run
+that saved data.
+
+Usage:
+    python manage.py maintain_db
+    python manage.py maintain_db --vacuum-into backups/visa_bulletin.db
+"""
+
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from django_config.sqlite_profiles import READER, WRITER
+from extractors.db_maintenance import maintain_database
+from extractors.ingest_lock import IngestLock, IngestLockHeld, lock_path_for
+
+
+class Command(BaseCommand):
+    help = "Analyze and checkpoint the database; optionally write a compacted copy"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--vacuum-into', type=Path, metavar='FILE',
+            help="Also write a compacted copy of the database to FILE (for backups and deploys)",
+        )
+
+    def handle(self, *args, vacuum_into=None, **options):
+        if connection.vendor != 'sqlite':
+            # Autovacuum keeps PostgreSQL checkpointed and compact; refresh the
+            # planner statistics now rather than waiting for it
+            if vacuum_into:
+                raise CommandError("--vacuum-into needs the SQLite database; use pg_dump on PostgreSQL")
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE')
+            self.stdout.write("ANALYZE done")
+            return
+
+        if connection.settings_dict.get('PROFILE', WRITER) == READER:
+            raise CommandError("The reader profile opens the database read-only; unset DB_PROFILE")
+        db_path = Path(connection.settings_dict['NAME'])
+        if not db_path.exists():
+            raise CommandError(f"No database at {db_path}")
+        try:
+            with IngestLock(lock_path_for(db_path)):
+                report = maintain_database(db_path, vacuum_into=vacuum_into)
+        except IngestLockHeld as e:
+            raise CommandError(f"{e}; try again when it finishes") from None
+        self.stdout.write(report.format())
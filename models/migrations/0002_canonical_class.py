@@ -0,0 +1,38 @@
+# Generated by Django 4.2.8 on 2026-10-19 07:59
+
+from django.db import migrations, models
+
+
+def backfill_canonical_class(apps, schema_editor):
+    """Fill canonical_class for existing rows, one UPDATE per distinct raw class"""
+    from lib.visa_class_utils import canonical_visa_class
+    
+    VisaCutoffDate = apps.get_model('models', 'VisaCutoffDate')
+    rows = VisaCutoffDate.objects.using(schema_editor.connection.alias)
+    
+    for visa_category, visa_class in rows.values_list('visa_category', 'visa_class').distinct().order_by():
+        canonical_class = canonical_visa_class(visa_category, visa_class)
+        if canonical_class:
+            rows.filter(
+                visa_category=visa_category, visa_class=visa_class
+            ).update(canonical_class=canonical_class)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('models', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='visacutoffdate',
+            name='canonical_class',
+            field=models.CharField(blank=True, default='', help_text="Normalized class the raw visa_class is grouped under ('' if unrecognized)", max_length=100),
+        ),
+        migrations.AddIndex(
+            model_name='visacutoffdate',
+            index=models.Index(fields=['visa_category', 'country', 'action_type', 'canonical_class'], name='visa_cutoff_visa_ca_31de4b_idx'),
+        ),
+        migrations.RunPython(backfill_canonical_class, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 4.2.8 on 2026-10-19 08:12
+
+from django.db import migrations, models
+
+
+def backfill_bulletin_fields(apps, schema_editor):
+    """Copy publication date and resolved URL from each bulletin onto its rows"""
+    from lib.bulletin_url import resolve_bulletin_url
+    
+    Bulletin = apps.get_model('models', 'Bulletin')
+    VisaCutoffDate = apps.get_model('models', 'VisaCutoffDate')
+    alias = schema_editor.connection.alias
+    
+    for bulletin_id, publication_date, url in Bulletin.objects.using(alias).values_list(
+        'id', 'publication_date', 'url'
+    ):
+        VisaCutoffDate.objects.using(alias).filter(bulletin_id=bulletin_id).update(
+            publication_date=publication_date,
+            bulletin_url=resolve_bulletin_url(publication_date, url),
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('models', '0002_canonical_class'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='visacutoffdate',
+            name='publication_date',
+            field=models.DateField(help_text='Publication date of the bulletin (denormalized from bulletin)', null=True),
+        ),
+        migrations.AddField(
+            model_name='visacutoffdate',
+            name='bulletin_url',
+            field=models.URLField(default='', help_text='Resolved bulletin URL (denormalized from bulletin.get_bulletin_url())', max_length=500),
+            preserve_default=False,
+        ),
+        migrations.RunPython(backfill_bulletin_fields, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='visacutoffdate',
+            name='publication_date',
+            field=models.DateField(help_text='Publication date of the bulletin (denormalized from bulletin)'),
+        ),
+    ]
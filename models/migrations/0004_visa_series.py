@@ -0,0 +1,47 @@
+# Generated by Django 4.2.8 on 2026-10-19 08:35
+
+from django.db import migrations, models
+
+
+def build_visa_series(apps, schema_editor):
+    """Derive every series from the existing cutoff rows"""
+    from lib.series_store import rebuild_series
+    
+    rebuild_series(
+        using=schema_editor.connection.alias,
+        cutoff_model=apps.get_model('models', 'VisaCutoffDate'),
+        series_model=apps.get_model('models', 'VisaSeries'),
+    )
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('models', '0003_denormalize_bulletin_fields'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VisaSeries',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('visa_category', models.CharField(choices=[('family_sponsored', 'Family-Sponsored'), ('employment_based', 'Employment-Based')], help_text='Family-Sponsored or Employment-Based', max_length=20)),
+                ('country', models.CharField(choices=[('all', 'Other Countries'), ('china', 'China (mainland born)'), ('india', 'India'), ('mexico', 'Mexico'), ('philippines', 'Philippines'), ('el_salvador_guatemala_honduras', 'El Salvador/Guatemala/Honduras')], help_text='Country/region for chargeability', max_length=50)),
+                ('action_type', models.CharField(choices=[('final_action', 'Final Action'), ('filing', 'Dates for Filing')], help_text='Final Action or Dates for Filing', max_length=20)),
+                ('canonical_class', models.CharField(help_text='Normalized class the series charts', max_length=100)),
+                ('visa_class', models.CharField(help_text='Lowest raw spelling seen for the class (representative value)', max_length=50)),
+                ('first_publication_date', models.DateField(help_text='Earliest bulletin in the series')),
+                ('last_publication_date', models.DateField(help_text='Latest bulletin in the series')),
+                ('publication_dates', models.BinaryField(help_text='Packed uint32 day ordinals, ascending')),
+                ('cutoff_ordinals', models.BinaryField(help_text='Packed uint32 day ordinals of the cutoff dates (0 = none)')),
+                ('statuses', models.BinaryField(help_text='One byte per bulletin: date, current or unavailable')),
+                ('visa_classes', models.TextField(help_text="Raw spelling behind each bulletin's value, newline-separated")),
+                ('bulletin_urls', models.TextField(help_text="Bulletin URLs, newline-separated ('' = standard URL for the month)")),
+            ],
+            options={
+                'db_table': 'visa_series',
+                'ordering': ['visa_category', 'country', 'action_type', 'canonical_class'],
+                'unique_together': {('visa_category', 'country', 'action_type', 'canonical_class')},
+            },
+        ),
+        migrations.RunPython(build_visa_series, migrations.RunPython.noop),
+    ]
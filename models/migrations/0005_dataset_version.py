@@ -0,0 +1,43 @@
+# Generated by Django 4.2.8 on 2026-10-19 08:47
+
+from django.db import migrations, models
+from django.db.models import Max
+from django.utils import timezone
+
+
+def seed_dataset_version(apps, schema_editor):
+    """Start existing databases at version 1 (empty ones at 0)"""
+    using = schema_editor.connection.alias
+    Bulletin = apps.get_model('models', 'Bulletin')
+    DatasetVersion = apps.get_model('models', 'DatasetVersion')
+    
+    latest = Bulletin.objects.using(using).aggregate(latest=Max('publication_date'))['latest']
+    DatasetVersion.objects.using(using).create(
+        pk=1,
+        version=0 if latest is None else 1,
+        updated_at=None if latest is None else timezone.now(),
+        latest_bulletin_date=latest,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('models', '0004_visa_series'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DatasetVersion',
+            fields=[
+                ('id', models.PositiveSmallIntegerField(default=1, primary_key=True, serialize=False)),
+                ('version', models.PositiveBigIntegerField(default=0, help_text='Incremented by every ingest that changed data')),
+                ('updated_at', models.DateTimeField(help_text='When the version was last bumped', null=True)),
+                ('latest_bulletin_date', models.DateField(help_text='Newest bulletin publication date at the last bump', null=True)),
+            ],
+            options={
+                'db_table': 'dataset_version',
+            },
+        ),
+        migrations.RunPython(seed_dataset_version, migrations.RunPython.noop),
+    ]
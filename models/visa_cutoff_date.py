@@ -35,6 +35,13 @@ class VisaCutoffDate(models.Model):
         help_text="F1, F2A, EB1, EB2, etc."
     )
     
+    canonical_class = models.CharField(
+        max_length=100,
+        blank=True,
+        default='',
+        help_text="Normalized class the raw visa_class is grouped under ('' if unrecognized)"
+    )
+    
     action_type = models.CharField(
         max_length=20,
         choices=ActionType.choices,
@@ -47,6 +54,16 @@ class VisaCutoffDate(models.Model):
         help_text="Country/region for chargeability"
     )
     
+    # Copied from the bulletin at ingest so dashboard reads need no join
+    publication_date = models.DateField(
+        help_text="Publication date of the bulletin (denormalized from bulletin)"
+    )
+    
+    bulletin_url = models.URLField(
+        max_length=500,
+        help_text="Resolved bulletin URL (denormalized from bulletin.get_bulletin_url())"
+    )
+    
     cutoff_value = models.CharField(
         max_length=20,
         help_text="Raw value: date string, 'C', or 'U'"
@@ -76,11 +93,23 @@ class VisaCutoffDate(models.Model):
             # For time series queries
             models.Index(fields=['visa_class', 'country', 'action_type', 'bulletin']),
             models.Index(fields=['visa_category', 'country']),
+            # Canonical classes of a category/country/action; the visa class
+            # catalog's GROUP BY (lib.visa_class_catalog) walks it in this order
+            models.Index(fields=['visa_category', 'country', 'action_type', 'canonical_class']),
         ]
     
+    def save(self, *args, **kwargs):
+        # Bulk writers set these explicitly; fill them for one-off saves
+        if self.publication_date is None:
+            self.publication_date = self.bulletin.publication_date
+        if not self.bulletin_url:
+            self.bulletin_url = self.bulletin.get_bulletin_url()
+        super().save(*args, **kwargs)
+    
     def __str__(self):
         return f"{self.visa_class} {self.country} {self.action_type}: {self.cutoff_value}"
     
     def __repr__(self):
-        return f"<VisaCutoffDate: {self.bulletin.publication_date} {self.visa_class} {self.country} = {self.cutoff_value}>"
+        # The denormalized date; self.bulletin would cost a query per row
+        return f"<VisaCutoffDate: {self.publication_date} {self.visa_class} {self.country} = {self.cutoff_value}>"
 
@@ -0,0 +1,116 @@
+"""VisaSeries model - one packed cutoff series per dashboard chart line"""
+
+from django.db import models
+
+from lib.series_codec import SERIES_VALUE_COLUMNS, decode_points, decode_series
+from .enums.visa_category import VisaCategory
+from .enums.action_type import ActionType
+from .enums.country import Country
+
+
+class VisaSeries(models.Model):
+    """
+    Materialized series of one canonical class on one dashboard page
+    
+    Derived from VisaCutoffDate and kept in step with it at ingest
+    (lib.series_store, extractors.sqlite_writer). The per-bulletin values
+    are packed into BLOBs; lib.series_codec describes the format. A
+    dashboard page reads about a dozen of these rows instead of hundreds
+    of cutoff rows.
+    """
+    
+    visa_category = models.CharField(
+        max_length=20,
+        choices=VisaCategory.choices,
+        help_text="Family-Sponsored or Employment-Based"
+    )
+    
+    country = models.CharField(
+        max_length=50,
+        choices=Country.choices,
+        help_text="Country/region for chargeability"
+    )
+    
+    action_type = models.CharField(
+        max_length=20,
+        choices=ActionType.choices,
+        help_text="Final Action or Dates for Filing"
+    )
+    
+    canonical_class = models.CharField(
+        max_length=100,
+        help_text="Normalized class the series charts"
+    )
+    
+    visa_class = models.CharField(
+        max_length=50,
+        help_text="Lowest raw spelling seen for the class (representative value)"
+    )
+    
+    first_publication_date = models.DateField(
+        help_text="Earliest bulletin in the series"
+    )
+    
+    last_publication_date = models.DateField(
+        help_text="Latest bulletin in the series"
+    )
+    
+    publication_dates = models.BinaryField(
+        help_text="Packed uint32 day ordinals, ascending"
+    )
+    
+    cutoff_ordinals = models.BinaryField(
+        help_text="Packed uint32 day ordinals of the cutoff dates (0 = none)"
+    )
+    
+    statuses = models.BinaryField(
+        help_text="One byte per bulletin: date, current or unavailable"
+    )
+    
+    visa_classes = models.TextField(
+        help_text="Raw spelling behind each bulletin's value, newline-separated"
+    )
+    
+    bulletin_urls = models.TextField(
+        help_text="Bulletin URLs, newline-separated ('' = standard URL for the month)"
+    )
+    
+    class Meta:
+        ordering = ['visa_category', 'country', 'action_type', 'canonical_class']
+        unique_together = ['visa_category', 'country', 'action_type', 'canonical_class']
+        db_table = 'visa_series'
+    
+    def __str__(self):
+        return f"{self.canonical_class} {self.country} {self.action_type}"
+    
+    def __repr__(self):
+        return (
+            f"<VisaSeries: {self.canonical_class} {self.country} {self.action_type} "
+            f"{self.first_publication_date}..{self.last_publication_date}>"
+        )
+    
+    @property
+    def key(self) -> tuple:
+        """Series key in lib.series_codec.SERIES_KEY_COLUMNS order"""
+        return (self.visa_category, self.country, self.action_type, self.canonical_class)
+    
+    def packed_columns(self) -> dict:
+        """Stored values of lib.series_codec.SERIES_VALUE_COLUMNS (BLOBs as bytes)"""
+        columns = {name: getattr(self, name) for name in SERIES_VALUE_COLUMNS}
+        for name in ('publication_dates', 'cutoff_ordinals', 'statuses'):
+            columns[name] = bytes(columns[name])  # memoryview on some backends
+        return columns
+    
+    def points(self):
+        """Decoded SeriesPoint list"""
+        return decode_points(
+            bytes(self.publication_dates), bytes(self.cutoff_ordinals), bytes(self.statuses),
+            self.visa_classes, self.bulletin_urls
+        )
+    
+    def chart_lists(self):
+        """(dates, cutoff_dates, bulletin_urls) as charted by the dashboard"""
+        return decode_series(
+            bytes(self.publication_dates), bytes(self.cutoff_ordinals), bytes(self.statuses),
+            self.bulletin_urls
+        )
@@ -2,6 +2,7 @@ import os
 import sys
 import sqlite3
 from datetime import datetime
+from functools import partial
 from urllib.parse import urlparse
 from pathlib import Path
 
@@ -14,8 +15,24 @@ if not os.environ.get('DJANGO_SETTINGS_MODULE'):
     django.setup()
 
 from lib.bulletin_parser import parse_publication_links, extract_tables
+from lib.columnar_snapshot import export_snapshot, snapshot_path_for, write_snapshot
+from lib.series_file import export_series_file, write_series_file
 from lib.publication_data import PublicationData
-from extractors.bulletin_handler import save_bulletin_to_db
+from extractors.bulletin_handler import save_parsed_bulletins
+from extractors.db_maintenance import maintain_database
+from extractors.ingest_lock import IngestLock, IngestLockHeld, lock_path_for
+from extractors.ingest_pipeline import IngestPipeline
+from extractors.sqlite_writer import SQLiteBulletinWriter
+from extractors.shadow_rebuild import (
+    build_shadow_database,
+    continue_dataset_version,
+    count_rows,
+    finalize_shadow_database,
+    shadow_path_for,
+    swap_into_place,
+    validate_shadow_database,
+)
+from extractors.write_throttle import WriteThrottle
 
 # Get workspace directory from Bazel (set when using 'bazel run')
 # Falls back to script directory if not running under Bazel
@@ -34,18 +51,26 @@ def is_saved(pub_url):
     return (SAVED_PAGES_DIR / filename).exists()
 
 
+def fetch_publication_urls():
+    """Bulletin URLs listed on the travel.state.gov index page"""
+    url = "https://travel.state.gov/content/travel/en/legal/visa-law0/visa-bulletin.html"
+    return parse_publication_links(fetch_main_page(url))
+
+
 def fetch_publication_data(publication_urls):
-    data = []
-    for pub_url in publication_urls:  # Process all bulletins, not just first 100
-        content = maybe_fetch_publication(pub_url)
+    # Process all bulletins, not just first 100
+    return [load_publication_data(pub_url) for pub_url in publication_urls]
 
-        # Extract publication date from URL
-        filename = os.path.basename(urlparse(pub_url).path)
-        date_str = filename.replace('visa-bulletin-for-', '').replace('.html', '')
-        publication_date = datetime.strptime(date_str, '%B-%Y')
 
-        data.append(PublicationData(pub_url, content, publication_date))
-    return data
+def load_publication_data(pub_url):
+    content = maybe_fetch_publication(pub_url)
+
+    # Extract publication date from URL
+    filename = os.path.basename(urlparse(pub_url).path)
+    date_str = filename.replace('visa-bulletin-for-', '').replace('.html', '')
+    publication_date = datetime.strptime(date_str, '%B-%Y')
+
+    return PublicationData(pub_url, content, publication_date)
 
 
 def maybe_fetch_publication(pub_url):
@@ -88,6 +113,25 @@ def pretty_print_table(headers, i, rows, title):
     print('╚' + '╧'.join('═' * width for width in col_widths) + '╝')
 
 
+def database_path():
+    """
+    Path of the configured SQLite database
+    
+    On PostgreSQL (DATABASE_URL) there is no file; the ingest lock and the
+    snapshot then go where the SQLite file would be.
+    """
+    from django.conf import settings
+    if not using_sqlite():
+        return WORKSPACE_DIR / 'visa_bulletin.db'
+    return Path(settings.DATABASES['default']['NAME'])
+
+
+def using_sqlite():
+    """Whether the default database is the SQLite file rather than PostgreSQL"""
+    from django.db import connection
+    return connection.vendor == 'sqlite'
+
+
 def save_page_content(url, content):
     # Create directory if it doesn't exist
     SAVED_PAGES_DIR.mkdir(exist_ok=True)
@@ -104,32 +148,172 @@ def main():
     """Fetch bulletins and optionally save to database"""
     # Check for --save-to-db flag
     save_to_db = '--save-to-db' in sys.argv
+    # Django-free executemany writer instead of the ORM
+    sqlite_writer = '--sqlite-writer' in sys.argv
     
-    url = "https://travel.state.gov/content/travel/en/legal/visa-law0/visa-bulletin.html"
-    html = fetch_main_page(url)
-    publication_urls = parse_publication_links(html)
-    data = fetch_publication_data(publication_urls)
+    if (sqlite_writer or '--rebuild' in sys.argv) and not using_sqlite():
+        print("✗ --rebuild and --sqlite-writer need the SQLite database (unset DATABASE_URL)")
+        return 1
+    
+    if '--rebuild' in sys.argv or save_to_db:
+        # One writer at a time: a rebuild would otherwise drop rows that an
+        # incremental refresh saved to the live file while the shadow was built
+        try:
+            with IngestLock(lock_path_for(database_path())):
+                if '--rebuild' in sys.argv:
+                    return rebuild_from_saved_pages(sqlite_writer)
+                save_all_to_db(fetch_publication_urls(), sqlite_writer)
+                return
+        except IngestLockHeld as e:
+            print(f"✗ {e}; try again when it finishes")
+            return 1
+    
+    publication_urls = fetch_publication_urls()
     
+    data = fetch_publication_data(publication_urls)
     for d in data:
         print(f"\n{'='*80}")
         print(f"URL: {d.url}")
         print(f"Date: {d.publication_date.strftime('%B %Y')}")
         
-        if save_to_db:
-            # Save to database - pass PublicationData directly
-            bulletin = save_bulletin_to_db(d)
-            print(f"✓ Saved to database")
-        else:
-            # Just print tables
-            tables = extract_tables(d.content)
-            print(f"Tables: {len(tables)}")
-            print_all_tables(tables)
+        # Just print tables
+        tables = extract_tables(d.content)
+        print(f"Tables: {len(tables)}")
+        print_all_tables(tables)
+    
+    print("\n" + "="*80)
+    print("Tip: Use --save-to-db flag to save bulletins to database")
+    print("Example: bazel run //:refresh_data -- --save-to-db")
+    print("Full rebuild from saved_pages: bazel run //:refresh_data -- --rebuild")
+    print("Add --sqlite-writer to either to write with executemany instead of the ORM")
+
+
+def save_all_to_db(publication_urls, sqlite_writer=False):
+    """
+    Fetch, parse and save all bulletins through the staged ingest pipeline
+    
+    Writes go to the live database, so commits are throttled according to
+    INGEST_MAX_LOCK_HOLD_MS / INGEST_LOCK_PAUSE_MS (see write_throttle).
+    """
+    throttle = WriteThrottle.from_env()
+    if sqlite_writer:
+        with SQLiteBulletinWriter(database_path(), throttle=throttle) as writer:
+            pipeline = IngestPipeline(fetch=load_publication_data, save_batch=writer.save_batch)
+            report = pipeline.run(publication_urls)
+    else:
+        save_batch = partial(save_parsed_bulletins, throttle=throttle)
+        pipeline = IngestPipeline(fetch=load_publication_data, save_batch=save_batch)
+        report = pipeline.run(publication_urls)
+    
+    print(f"\n{'='*80}")
+    print(report.format())
+    print(f"Writer: {throttle.summary()}")
+    for failed_url, error in report.errors:
+        print(f"✗ {failed_url}: {error}")
+    if report.saved:
+        export_dataset_snapshot()
+        export_dataset_series_file()
+        maintain_dataset_database()
+    return report
+
+
+def export_dataset_snapshot():
+    """Refresh the columnar snapshot next to the database (lib/columnar_snapshot.py)"""
+    from django.db import connection
+    if using_sqlite():
+        manifest = export_snapshot(database_path())
+    else:
+        with connection.cursor() as cursor:
+            manifest = write_snapshot(cursor, snapshot_path_for(database_path()))
+    print(f"📦 Exported snapshot: {manifest['rows']:,} rows at dataset version {manifest['dataset_version']}")
+
+
+def export_dataset_series_file():
+    """Refresh the mmapped series file the web workers read (lib/series_file.py)"""
+    from django.conf import settings
+    from django.db import connection
+    if using_sqlite():
+        summary = export_series_file(database_path(), settings.SERIES_FILE)
+    else:
+        with connection.cursor() as cursor:
+            summary = write_series_file(cursor, settings.SERIES_FILE)
+    print(f"📦 Exported series file: {summary['series']:,} series at dataset version {summary['dataset_version']}")
+
+
+def maintain_dataset_database():
+    """ANALYZE and checkpoint the database after saving (extractors/db_maintenance.py)"""
+    if not using_sqlite():
+        return  # Autovacuum analyzes PostgreSQL
+    report = maintain_database(database_path())
+    print("🧹 " + report.format().replace('\n', '\n   '))
+
+
+def saved_publication_urls(live_path):
+    """
+    Bulletin URLs for every page in saved_pages
+    
+    Reuses the URLs recorded in the live database where available, otherwise
+    falls back to the standard travel.state.gov URL for that month.
+    """
+    from models.bulletin import Bulletin
+    
+    known_urls = {}
+    if live_path.exists():
+        conn = sqlite3.connect(f"file:{live_path}?mode=ro", uri=True)
+        try:
+            known_urls = {
+                pub_date: url
+                for pub_date, url in conn.execute('SELECT publication_date, url FROM bulletin')
+                if url
+            }
+        except sqlite3.OperationalError:
+            pass  # No tables yet
+        finally:
+            conn.close()
+    
+    urls = []
+    for path in sorted(SAVED_PAGES_DIR.glob('visa-bulletin-for-*.html')):
+        date_str = path.name.replace('visa-bulletin-for-', '').replace('.html', '')
+        publication_date = datetime.strptime(date_str, '%B-%Y').date()
+        url = known_urls.get(publication_date.isoformat())
+        urls.append(url or Bulletin(publication_date=publication_date).get_bulletin_url())
+    return urls
+
+
+def rebuild_from_saved_pages(sqlite_writer=False):
+    """
+    Rebuild the whole database from saved_pages into a shadow file,
+    validate it, then atomically swap it over the live database
+    """
+    live_path = database_path()
+    shadow_path = shadow_path_for(live_path)
+    
+    publication_urls = saved_publication_urls(live_path)
+    live_counts = count_rows(live_path)
+    print(f"Rebuilding {len(publication_urls)} bulletins into {shadow_path}")
+    
+    report = build_shadow_database(
+        shadow_path, publication_urls, fetch=load_publication_data, sqlite_writer=sqlite_writer
+    )
+    print(f"\n{'='*80}")
+    print(report.format())
+    
+    problems = validate_shadow_database(shadow_path, report, live_counts)
+    if problems:
+        print("\n✗ Shadow database failed validation, live database left untouched:")
+        for problem in problems:
+            print(f"  • {problem}")
+        return 1
     
-    if not save_to_db:
-        print("\n" + "="*80)
-        print("Tip: Use --save-to-db flag to save bulletins to database")
-        print("Example: bazel run //:refresh_data -- --save-to-db")
+    continue_dataset_version(live_path)
+    finalize_shadow_database()
+    swap_into_place(shadow_path, live_path)
+    print(f"\n✓ Swapped rebuilt database into {live_path}")
+    export_dataset_snapshot()
+    export_dataset_series_file()
+    maintain_dataset_database()
+    return 0
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file
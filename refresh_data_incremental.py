@@ -6,21 +6,27 @@ This script:
 - Uses WAL mode for concurrent access
 - Implements retry logic for transient database locks
 - Safe to run as a cron job while web server is running
+- Holds the ingest lock, so overlapping runs exit early instead of competing
+- Appends one JSON line per run to logs/refresh_runs.jsonl for monitoring
 
 Usage:
     bazel run //:refresh_data_incremental
+    bazel run //:refresh_data_incremental -- --sqlite-writer   # Django-free bulk writer
 """
 
 import os
 import sys
+import json
 import time
+import sqlite3
 import logging
+from dataclasses import dataclass, field
 from datetime import datetime
 from urllib.parse import urlparse
 from pathlib import Path
 
 import requests
-from django.db import transaction, OperationalError
+from django.db import DatabaseError, transaction, OperationalError
 
 # Configure logging with timestamps
 logging.basicConfig(
@@ -37,14 +43,68 @@ if not os.environ.get('DJANGO_SETTINGS_MODULE'):
     import django
     django.setup()
 
-from lib.bulletin_parser import parse_publication_links, extract_tables
+from lib.bulletin_parser import parse_publication_links
+from lib.columnar_snapshot import export_snapshot, snapshot_path_for, write_snapshot
+from lib.series_file import export_series_file, write_series_file
 from lib.publication_data import PublicationData
+from extractors.bulletin_extractor import parse_bulletin
 from extractors.bulletin_handler import save_bulletin_to_db
+from extractors.db_maintenance import maintain_database
+from extractors.ingest_lock import IngestLock, IngestLockHeld, lock_path_for
+from extractors.sqlite_writer import SQLiteBulletinWriter
 from models.bulletin import Bulletin
 
 # Get workspace directory
 WORKSPACE_DIR = Path(os.environ.get('BUILD_WORKSPACE_DIRECTORY', Path(__file__).parent))
 SAVED_PAGES_DIR = WORKSPACE_DIR / 'saved_pages'
+RUN_REPORT_PATH = Path(os.environ.get('REFRESH_RUN_REPORT', WORKSPACE_DIR / 'logs' / 'refresh_runs.jsonl'))
+
+
+@dataclass
+class RunReport:
+    """Machine-readable record of one refresh run (one JSON line)"""
+    started_at: datetime
+    bulletins_before: int = 0
+    bulletins_available: int = 0
+    bulletins: list[dict] = field(default_factory=list)
+    
+    def record_saved(self, result, fetch_seconds):
+        entry = {'status': 'saved', **result.to_dict()}
+        entry['timings'] = {'fetch': round(fetch_seconds, 4), **entry['timings']}
+        self.bulletins.append(entry)
+    
+    def record_failed(self, publication_date, url, error):
+        self.bulletins.append({
+            'status': 'failed',
+            'publication_date': publication_date.isoformat(),
+            'url': url,
+            'error': error,
+        })
+    
+    def write(self, status, exit_code, error=None, path=RUN_REPORT_PATH):
+        """Append this run to the JSON-lines report file"""
+        finished_at = datetime.now()
+        saved = [b for b in self.bulletins if b['status'] == 'saved']
+        record = {
+            'event': 'refresh_run',
+            'status': status,
+            'exit_code': exit_code,
+            'started_at': self.started_at.isoformat(timespec='seconds'),
+            'finished_at': finished_at.isoformat(timespec='seconds'),
+            'duration_seconds': round((finished_at - self.started_at).total_seconds(), 3),
+            'bulletins_before': self.bulletins_before,
+            'bulletins_available': self.bulletins_available,
+            'bulletins_saved': len(saved),
+            'bulletins_failed': len(self.bulletins) - len(saved),
+            'rows_inserted': sum(b['rows_inserted'] for b in saved),
+            'rows_updated': sum(b['rows_updated'] for b in saved),
+            'error': error,
+            'bulletins': self.bulletins,
+        }
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record) + '\n')
+        return record
 
 
 def fetch_main_page(url):
@@ -90,24 +150,26 @@ def fetch_publication(pub_url):
         return content
 
 
-def save_with_retry(publication_data, max_retries=3, base_delay=1.0):
+def save_with_retry(publication_data, writer=None, max_retries=3, base_delay=1.0):
     """
     Save bulletin to database with exponential backoff retry.
     
     Args:
         publication_data: PublicationData object
+        writer: Optional SQLiteBulletinWriter; the Django ORM is used if None
         max_retries: Maximum number of retry attempts
         base_delay: Base delay in seconds (doubles each retry)
     
     Returns:
-        Bulletin object if successful, None if all retries failed
+        IngestResult if successful, None if all retries failed
     """
     for attempt in range(max_retries):
         try:
+            if writer:
+                return writer.save(parse_bulletin(publication_data))
             with transaction.atomic():
-                bulletin = save_bulletin_to_db(publication_data)
-                return bulletin
-        except OperationalError as e:
+                return save_bulletin_to_db(publication_data)
+        except (OperationalError, sqlite3.OperationalError) as e:
             if 'database is locked' in str(e) and attempt < max_retries - 1:
                 delay = base_delay * (2 ** attempt)  # Exponential backoff
                 logger.warning(f"  ⚠️  Database locked, retrying in {delay}s... (attempt {attempt + 1}/{max_retries})")
@@ -117,9 +179,93 @@ def save_with_retry(publication_data, max_retries=3, base_delay=1.0):
     return None
 
 
-def main():
+def database_path():
+    """
+    Path of the configured SQLite database
+    
+    On PostgreSQL (DATABASE_URL) there is no file; the ingest lock and the
+    snapshot then go where the SQLite file would be.
+    """
+    from django.conf import settings
+    from django.db import connection
+    if connection.vendor != 'sqlite':
+        return WORKSPACE_DIR / 'visa_bulletin.db'
+    return Path(settings.DATABASES['default']['NAME'])
+
+
+def open_sqlite_writer():
+    """Django-free writer on the configured database (--sqlite-writer)"""
+    from django.db import connection
+    if connection.vendor != 'sqlite':
+        raise ValueError("--sqlite-writer needs the SQLite database (unset DATABASE_URL)")
+    return SQLiteBulletinWriter(database_path())
+
+
+def export_dataset_snapshot():
+    """Refresh the columnar snapshot next to the database (lib/columnar_snapshot.py)"""
+    from django.db import connection
+    try:
+        if connection.vendor == 'sqlite':
+            manifest = export_snapshot(database_path())
+        else:
+            with connection.cursor() as cursor:
+                manifest = write_snapshot(cursor, snapshot_path_for(database_path()))
+    except (OSError, sqlite3.Error, DatabaseError) as e:
+        # The snapshot is derived data: the refresh itself still succeeded
+        logger.error(f"✗ Snapshot export failed: {type(e).__name__}: {e}")
+        return
+    logger.info(f"📦 Exported snapshot: {manifest['rows']:,} rows at dataset version {manifest['dataset_version']}")
+
+
+def export_dataset_series_file():
+    """Refresh the mmapped series file the web workers read (lib/series_file.py)"""
+    from django.conf import settings
+    from django.db import connection
+    try:
+        if connection.vendor == 'sqlite':
+            summary = export_series_file(database_path(), settings.SERIES_FILE)
+        else:
+            with connection.cursor() as cursor:
+                summary = write_series_file(cursor, settings.SERIES_FILE)
+    except (OSError, sqlite3.Error, DatabaseError) as e:
+        # Workers fall back to SQL while the file is behind the database
+        logger.error(f"✗ Series file export failed: {type(e).__name__}: {e}")
+        return
+    logger.info(f"📦 Exported series file: {summary['series']:,} series at dataset version {summary['dataset_version']}")
+
+
+def maintain_dataset_database():
+    """ANALYZE and checkpoint the database after saving (extractors/db_maintenance.py)"""
+    from django.db import connection
+    if connection.vendor != 'sqlite':
+        return  # Autovacuum analyzes PostgreSQL
+    try:
+        report = maintain_database(database_path())
+    except (OSError, sqlite3.Error) as e:
+        # Statistics and checkpoints are an optimization; the data is saved
+        logger.error(f"✗ Database maintenance failed: {type(e).__name__}: {e}")
+        return
+    for line in report.format().splitlines():
+        logger.info(f"🧹 {line}")
+
+
+def run_locked(report):
+    """Run main() holding the ingest lock; skip if another refresh is running"""
+    try:
+        with IngestLock(lock_path_for(database_path())):
+            return main(report)
+    except IngestLockHeld as e:
+        logger.warning(f"⚠️  {e}")
+        logger.info("="*80)
+        logger.info("⏭️  CRON_SKIPPED: Another refresh is already running")
+        logger.info("="*80)
+        report.write('skipped', 0, error=str(e))
+        return 0
+
+
+def main(report):
     """Fetch only new bulletins not already in database"""
-    start_time = datetime.now()
+    start_time = report.started_at
     logger.info("="*80)
     logger.info("🔄 INCREMENTAL DATA REFRESH - STARTED")
     logger.info("="*80)
@@ -128,6 +274,7 @@ def main():
     logger.info("")
     logger.info("📊 Checking existing data...")
     existing_dates = get_existing_bulletin_dates()
+    report.bulletins_before = len(existing_dates)
     logger.info(f"  • Bulletins in database: {len(existing_dates)}")
     if existing_dates:
         oldest = min(existing_dates)
@@ -140,6 +287,7 @@ def main():
     url = "https://travel.state.gov/content/travel/en/legal/visa-law0/visa-bulletin.html"
     html = fetch_main_page(url)
     publication_urls = parse_publication_links(html)
+    report.bulletins_available = len(publication_urls)
     logger.info(f"  • Available bulletins: {len(publication_urls)}")
     
     # Filter to only new bulletins
@@ -164,6 +312,7 @@ def main():
         logger.info("="*80)
         logger.info(f"✅ CRON_SUCCESS: Refresh completed successfully in {duration:.1f}s (no new data)")
         logger.info("="*80)
+        report.write('success', 0)
         return 0
     
     logger.info("")
@@ -178,6 +327,7 @@ def main():
     logger.info("💾 Fetching and saving new bulletins...")
     success_count = 0
     error_count = 0
+    writer = open_sqlite_writer() if '--sqlite-writer' in sys.argv else None
     
     for pub_url, publication_date in new_bulletins:
         try:
@@ -185,7 +335,9 @@ def main():
             logger.info(f"  📄 {publication_date.strftime('%B %Y')}...", extra={'no_timestamp': True})
             
             # Fetch HTML
+            fetch_started = time.perf_counter()
             content = fetch_publication(pub_url)
+            fetch_seconds = time.perf_counter() - fetch_started
             
             # Create PublicationData
             pub_data = PublicationData(
@@ -195,22 +347,29 @@ def main():
             )
             
             # Save to database with retry
-            bulletin = save_with_retry(pub_data)
+            result = save_with_retry(pub_data, writer)
             
-            if bulletin:
-                # Count saved records
-                tables = extract_tables(content)
-                total_records = sum(len(t.rows) for t in tables)
-                logger.info(f"✓ Saved ({total_records} records)")
+            if result:
+                logger.info(f"✓ Saved {result.summary()}")
+                report.record_saved(result, fetch_seconds)
                 success_count += 1
             else:
                 logger.error("✗ Failed after retries")
+                report.record_failed(publication_date, pub_url, 'failed after retries')
                 error_count += 1
                 
         except Exception as e:
             logger.error(f"✗ Error: {e}")
+            report.record_failed(publication_date, pub_url, f"{type(e).__name__}: {e}")
             error_count += 1
     
+    if writer:
+        writer.close()
+    if success_count > 0:
+        export_dataset_snapshot()
+        export_dataset_series_file()
+        maintain_dataset_database()
+    
     # Summary
     end_time = datetime.now()
     duration = (end_time - start_time).total_seconds()
@@ -230,6 +389,7 @@ def main():
         logger.error("="*80)
         logger.error(f"❌ CRON_FAILURE: Refresh completed with {error_count} error(s) in {duration:.1f}s")
         logger.error("="*80)
+        report.write('failure', 1)
         return 1
     elif success_count > 0:
         logger.info("")
@@ -237,30 +397,30 @@ def main():
         logger.info("="*80)
         logger.info(f"✅ CRON_SUCCESS: Refresh completed successfully in {duration:.1f}s ({success_count} new bulletin(s))")
         logger.info("="*80)
+        report.write('success', 0)
         return 0
     else:
         # No new bulletins case already handled above, but just in case
         logger.info("="*80)
         logger.info(f"✅ CRON_SUCCESS: Refresh completed successfully in {duration:.1f}s (no new data)")
         logger.info("="*80)
+        report.write('success', 0)
         return 0
 
 
 if __name__ == "__main__":
-    start_time = None
+    report = RunReport(started_at=datetime.now())
     try:
-        exit_code = main()
+        exit_code = run_locked(report)
         sys.exit(exit_code if exit_code is not None else 0)
     except KeyboardInterrupt:
         logger.warning("")
         logger.warning("⚠️  Refresh interrupted by user")
         logger.error("❌ CRON_FAILURE: Refresh interrupted")
+        report.write('interrupted', 130, error='KeyboardInterrupt')
         sys.exit(130)  # Standard exit code for SIGINT
     except Exception as e:
-        end_time = datetime.now()
-        duration = 0.0
-        if start_time:
-            duration = (end_time - start_time).total_seconds()
+        duration = (datetime.now() - report.started_at).total_seconds()
         logger.error("")
         logger.error(f"❌ CRITICAL ERROR: {type(e).__name__}: {e}")
         logger.error("="*80)
@@ -268,5 +428,5 @@ if __name__ == "__main__":
         logger.error("="*80)
         import traceback
         logger.error(traceback.format_exc())
+        report.write('failure', 1, error=f"{type(e).__name__}: {e}")
         sys.exit(1)
-
@@ -16,25 +16,10 @@ setup_django_for_tests()
 
 @pytest.fixture(scope='session')
 def django_db_setup(django_db_setup, django_db_blocker):
-    """Create database tables once per test session"""
+    """Create database tables once per test session (via models/migrations)"""
     # Mark tables as already created to prevent handler from trying
     from extractors import bulletin_handler
     bulletin_handler._TABLES_CREATED = True
-    
-    with django_db_blocker.unblock():
-        from django.db import connection
-        from models.bulletin import Bulletin
-        from models.visa_cutoff_date import VisaCutoffDate
-        
-        with connection.schema_editor() as schema_editor:
-            try:
-                schema_editor.create_model(Bulletin)
-            except Exception:
-                pass  # Table already exists
-            try:
-                schema_editor.create_model(VisaCutoffDate)
-            except Exception:
-                pass  # Table already exists
 
 
 @pytest.fixture
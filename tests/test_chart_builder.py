@@ -1,5 +1,6 @@
 """Tests for chart builder logic"""
 
+import json
 import unittest
 from datetime import date
 
@@ -262,6 +263,29 @@ class TestMultiClassChartBuilder(unittest.TestCase):
         
         self.assertIn('color', result['trace_info'][0])
         self.assertTrue(result['trace_info'][0]['color'].startswith('#'))
+    
+    def test_chart_json_is_safe_inside_a_script_block(self):
+        """'<', '>' and '/' stay escaped in every trace, as fig.to_json() writes them"""
+        visa_class_data = [
+            {
+                'visa_class': 'F1',
+                'visa_class_label': 'F1 </script><script>alert(1)',
+                'dates': [date(2023, 1, 1), date(2024, 1, 1)],
+                'cutoff_dates': [date(2015, 1, 1), date(2016, 1, 1)],
+                'projection': {'estimated_date': date(2027, 1, 1)},
+            }
+        ]
+        
+        result = build_multi_class_chart_with_projections(
+            visa_class_data, date(2018, 1, 1), 'all', 'Family-Sponsored'
+        )
+        
+        self.assertNotIn('<', result['chart_json'])
+        self.assertNotIn('>', result['chart_json'])
+        self.assertIn('\\u003c\\u002fscript\\u003e', result['chart_json'])
+        chart = json.loads(result['chart_json'])
+        self.assertEqual(len(chart['data']), 3)
+        self.assertIn('<extra></extra>', chart['data'][1]['hovertemplate'])
 
 
 if __name__ == '__main__':
@@ -0,0 +1,152 @@
+"""Tests for the columnar snapshot export and loader"""
+
+# Django setup (shared utility for both Bazel and pytest)
+from tests.django_setup import setup_django_for_tests
+setup_django_for_tests()
+
+import sqlite3
+from datetime import date, datetime
+
+import pytest
+from django.db import connection
+
+from extractors.bulletin_extractor import parse_bulletin
+from extractors.bulletin_handler import save_parsed_bulletins
+from extractors.sqlite_writer import SQLiteBulletinWriter
+from lib.columnar_snapshot import (
+    NO_DATE,
+    SNAPSHOT_COLUMNS,
+    date_to_day,
+    day_to_date,
+    export_snapshot,
+    load_snapshot,
+    snapshot_path_for,
+    write_snapshot,
+)
+from lib.publication_data import PublicationData
+from lib.series_codec import STATUS_CURRENT, STATUS_DATE, STATUS_UNAVAILABLE
+
+SELECT_ROWS = (
+    "SELECT visa_category, country, action_type, canonical_class, visa_class, publication_date, "
+    "cutoff_value, cutoff_date, is_current, is_unavailable FROM visa_cutoff_date"
+)
+
+# Test files are built with the SQLite writer from the test database's schema
+sqlite_only = pytest.mark.skipif(connection.vendor != 'sqlite', reason="exports SQLite files")
+
+
+def create_database(path):
+    """Empty database with the schema the migrations created for the test DB"""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT sql FROM sqlite_master WHERE tbl_name IN ('bulletin', 'visa_cutoff_date', 'visa_series', "
+            "'dataset_version') AND sql IS NOT NULL ORDER BY type DESC"
+        )
+        statements = [row[0] for row in cursor.fetchall()]
+    conn = sqlite3.connect(path)
+    for statement in statements:
+        conn.execute(statement)
+    conn.commit()
+    conn.close()
+
+
+def load_page(filename, publication_date, url='/test-url'):
+    with open(f'saved_pages/{filename}', 'r', encoding='utf-8') as f:
+        return PublicationData(url, f.read(), publication_date)
+
+
+def stored_records(db_path):
+    """Rows as Snapshot.records() decodes them, in snapshot order"""
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute(SELECT_ROWS).fetchall()
+    conn.close()
+    records = []
+    for *text, published, cutoff_value, cutoff, is_current, is_unavailable in rows:
+        status = STATUS_CURRENT if is_current else STATUS_UNAVAILABLE if is_unavailable else STATUS_DATE
+        records.append((
+            *text, date.fromisoformat(published), cutoff_value,
+            date.fromisoformat(cutoff) if cutoff else None, status,
+        ))
+    return sorted(records, key=lambda record: (*record[:4], record[5], record[4]))
+
+
+@pytest.fixture
+def database(tmp_path):
+    db_path = tmp_path / 'visa_bulletin.db'
+    create_database(db_path)
+    with SQLiteBulletinWriter(db_path) as writer:
+        writer.save(parse_bulletin(load_page('visa-bulletin-for-march-2023.html', datetime(2023, 3, 1))))
+        writer.save(parse_bulletin(load_page('visa-bulletin-for-january-2005.html', datetime(2005, 1, 1))))
+    return db_path
+
+
+def test_day_offsets():
+    assert date_to_day(date(1970, 1, 2)) == 1
+    assert day_to_date(date_to_day(date(2023, 3, 1))) == date(2023, 3, 1)
+    assert date_to_day(None) == NO_DATE
+    assert day_to_date(NO_DATE) is None
+
+
+@sqlite_only
+def test_snapshot_round_trip(database):
+    """Every cutoff row comes back, decoded, in series order"""
+    manifest = export_snapshot(database)
+    snapshot = load_snapshot(snapshot_path_for(database))
+
+    assert manifest['dataset_version'] == snapshot.dataset_version == 2
+    assert manifest['latest_bulletin_date'] == '2023-03-01'
+    assert list(snapshot.records()) == stored_records(database)
+    assert len(snapshot) == len(stored_records(database)) > 0
+    assert set(snapshot.columns) == set(SNAPSHOT_COLUMNS)
+    # Enums are small dictionaries; codes fit a byte
+    assert snapshot.categories['action_type'] == ['filing', 'final_action']
+    assert snapshot.columns['action_type'].itemsize == 1
+
+
+@sqlite_only
+def test_loaded_snapshot_survives_a_new_export(database, tmp_path):
+    """A mapped snapshot stays readable after the file is replaced"""
+    out_path = tmp_path / 'snapshot.npz'
+    export_snapshot(database, out_path)
+    before = load_snapshot(out_path)
+    expected = list(before.records())
+
+    with SQLiteBulletinWriter(database) as writer:
+        writer.save(parse_bulletin(load_page('visa-bulletin-for-october-2021.html', datetime(2021, 10, 1))))
+    export_snapshot(database, out_path)
+
+    assert list(before.records()) == expected
+    after = load_snapshot(out_path)
+    assert after.dataset_version == before.dataset_version + 1
+    assert len(after) > len(before)
+
+
+@sqlite_only
+def test_numpy_reads_the_snapshot(database):
+    """The file is a plain .npz; columns load as NumPy arrays"""
+    np = pytest.importorskip('numpy')
+    export_snapshot(database)
+    path = snapshot_path_for(database)
+    snapshot = load_snapshot(path)
+
+    with np.load(path) as archive:
+        for name in SNAPSHOT_COLUMNS:
+            assert np.array_equal(archive[name], snapshot.columns[name])
+    filing = snapshot.columns['action_type'] == snapshot.code('action_type', 'filing')
+    assert 0 < filing.sum() < len(snapshot)
+
+
+def test_write_snapshot_through_django_connection(tmp_path):
+    """Any backend exports through a DB-API cursor (PostgreSQL returns date objects)"""
+    save_parsed_bulletins([
+        parse_bulletin(load_page('visa-bulletin-for-march-2023.html', datetime(2023, 3, 1))),
+    ])
+    out_path = tmp_path / 'snapshot.npz'
+    with connection.cursor() as cursor:
+        manifest = write_snapshot(cursor, out_path)
+    snapshot = load_snapshot(out_path)
+
+    assert manifest['dataset_version'] == 1
+    assert manifest['latest_bulletin_date'] == '2023-03-01'
+    assert len(snapshot) > 0
+    assert {record[5] for record in snapshot.records()} == {date(2023, 3, 1)}
@@ -0,0 +1,139 @@
+"""Tests for the compact copy of the database and its compatibility views"""
+
+# Django setup (shared utility for both Bazel and pytest)
+from tests.django_setup import setup_django_for_tests
+setup_django_for_tests()
+
+import sqlite3
+from datetime import date, datetime
+
+import pytest
+from django.db import connection
+
+import explore_db
+from extractors.bulletin_extractor import parse_bulletin
+from extractors.sqlite_writer import SQLiteBulletinWriter
+from lib.compact_schema import (
+    compact_cutoffs,
+    compact_path_for,
+    enum_codes,
+    export_compact_database,
+)
+from lib.publication_data import PublicationData
+from lib.series_codec import STATUS_CURRENT, STATUS_DATE, STATUS_UNAVAILABLE
+from models.enums.country import Country
+
+# Test files are built with the SQLite writer from the test database's schema
+pytestmark = pytest.mark.skipif(connection.vendor != 'sqlite', reason="exports SQLite files")
+
+CUTOFF_COLUMNS = (
+    "visa_category, visa_class, action_type, country, cutoff_value, cutoff_date, is_current, "
+    "is_unavailable, bulletin_id, canonical_class, bulletin_url, publication_date"
+)
+
+
+def create_database(path):
+    """Empty database with the schema the migrations created for the test DB"""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT sql FROM sqlite_master WHERE tbl_name IN ('bulletin', 'visa_cutoff_date', 'visa_series', "
+            "'dataset_version') AND sql IS NOT NULL ORDER BY type DESC"
+        )
+        statements = [row[0] for row in cursor.fetchall()]
+    conn = sqlite3.connect(path)
+    for statement in statements:
+        conn.execute(statement)
+    conn.commit()
+    conn.close()
+
+
+def load_page(filename, publication_date, url='/test-url'):
+    with open(f'saved_pages/{filename}', 'r', encoding='utf-8') as f:
+        return PublicationData(url, f.read(), publication_date)
+
+
+def fetch(db_path, sql):
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute(sql).fetchall()
+    conn.close()
+    return rows
+
+
+@pytest.fixture
+def database(tmp_path):
+    db_path = tmp_path / 'visa_bulletin.db'
+    create_database(db_path)
+    with SQLiteBulletinWriter(db_path) as writer:
+        writer.save(parse_bulletin(load_page('visa-bulletin-for-march-2023.html', datetime(2023, 3, 1))))
+        writer.save(parse_bulletin(load_page('visa-bulletin-for-january-2005.html', datetime(2005, 1, 1))))
+    return db_path
+
+
+def test_views_reproduce_the_original_tables(database):
+    report = export_compact_database(database)
+    assert report.path == compact_path_for(database) == database.with_name('visa_bulletin.compact.db')
+
+    cutoffs = (
+        f"SELECT {CUTOFF_COLUMNS} FROM visa_cutoff_date "
+        "ORDER BY bulletin_id, visa_category, visa_class, action_type, country"
+    )
+    assert fetch(report.path, cutoffs) == fetch(database, cutoffs)
+    bulletins = "SELECT id, publication_date, url, fetched_at FROM bulletin ORDER BY id"
+    assert fetch(report.path, bulletins) == fetch(database, bulletins)
+    ids = fetch(report.path, "SELECT COUNT(DISTINCT id) FROM visa_cutoff_date")[0][0]
+    assert ids == report.rows == len(fetch(database, cutoffs))
+
+
+def test_rows_are_integers_and_smaller(database):
+    report = export_compact_database(database)
+    types = fetch(report.path, "SELECT DISTINCT typeof(category), typeof(country), typeof(action), "
+                               "typeof(publication_day), typeof(status) FROM compact_cutoff")
+    assert types == [('integer',) * 5]
+    assert ('country', enum_codes(Country)['india'], 'india', 'India') in fetch(
+        report.path, "SELECT * FROM compact_enum"
+    )
+    if report.source_bytes is None:
+        pytest.skip("SQLite built without dbstat")
+    assert report.compact_bytes * 5 < report.source_bytes
+
+
+def test_compact_cutoffs_reads_one_series(database):
+    report = export_compact_database(database)
+    conn = sqlite3.connect(report.path)
+    rows = compact_cutoffs(conn, 'family_sponsored', 'mexico', 'final_action')
+    conn.close()
+
+    expected = fetch(database, (
+        "SELECT canonical_class, visa_class, publication_date, cutoff_date, is_current, is_unavailable "
+        "FROM visa_cutoff_date WHERE visa_category = 'family_sponsored' AND country = 'mexico' "
+        "AND action_type = 'final_action'"
+    ))
+    assert len(rows) == len(expected) > 0
+    assert {row.publication_date for row in rows} == {date(2005, 1, 1), date(2023, 3, 1)}
+    f1 = [row for row in rows if row.visa_class == 'F1' and row.publication_date == date(2023, 3, 1)]
+    assert f1[0].cutoff_date == date(2001, 4, 1)
+    assert f1[0].status == STATUS_DATE
+    statuses = {STATUS_CURRENT if current else STATUS_UNAVAILABLE if unavailable else STATUS_DATE
+                for *_, current, unavailable in expected}
+    assert {row.status for row in rows} == statuses
+
+
+def test_unknown_enum_value_is_rejected(database, tmp_path):
+    conn = sqlite3.connect(database)
+    conn.execute("UPDATE visa_cutoff_date SET country = 'atlantis' WHERE id = (SELECT MIN(id) FROM visa_cutoff_date)")
+    conn.commit()
+    conn.close()
+    with pytest.raises(ValueError, match='atlantis'):
+        export_compact_database(database, tmp_path / 'compact.db')
+    assert not (tmp_path / 'compact.db').exists()
+
+
+def test_explore_db_runs_on_the_compact_copy(database, monkeypatch, capsys):
+    report = export_compact_database(database)
+    monkeypatch.setattr(explore_db, 'DB_PATH', str(report.path))
+    explore_db.show_summary()
+    explore_db.query_data('F1 Mexico')
+    output = capsys.readouterr().out
+    assert 'Bulletins: 2 total' in output
+    assert f"Cutoff Records: {report.rows:,} total" in output
+    assert '2001-04-01' in output
@@ -0,0 +1,95 @@
+"""Tests for the dataset version and the caches keyed on it"""
+
+# Django setup (shared utility for both Bazel and pytest)
+from tests.django_setup import setup_django_for_tests
+setup_django_for_tests()
+
+from datetime import date, datetime
+
+import pytest
+from django.core.cache import cache
+from django.test import RequestFactory
+
+from extractors.bulletin_extractor import parse_bulletin
+from extractors.bulletin_handler import save_parsed_bulletin, save_parsed_bulletins
+from lib.dataset_version import bump_dataset_version, current_dataset_version
+from lib.publication_data import PublicationData
+from webapp.views import sitemap_view
+
+
+def load_page(filename, publication_date, url='/test-url'):
+    with open(f'saved_pages/{filename}', 'r', encoding='utf-8') as f:
+        return PublicationData(url, f.read(), publication_date)
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+def test_ingest_bumps_version_only_when_data_changes():
+    """Saving new rows bumps once per transaction; a no-op re-save does not"""
+    assert current_dataset_version().version == 0
+    march_2023 = parse_bulletin(load_page('visa-bulletin-for-march-2023.html', datetime(2023, 3, 1)))
+    october_2021 = parse_bulletin(load_page('visa-bulletin-for-october-2021.html', datetime(2021, 10, 1)))
+
+    save_parsed_bulletins([october_2021, march_2023])
+    version = current_dataset_version()
+    assert version.version == 1
+    assert version.latest_bulletin_date == date(2023, 3, 1)
+    assert version.updated_at is not None
+
+    save_parsed_bulletin(march_2023)
+    assert current_dataset_version().version == 1
+
+
+def test_bump_after_continues_past_another_database():
+    """A shadow rebuild continues the live counter instead of restarting it"""
+    assert bump_dataset_version() == 1
+    assert bump_dataset_version(after=41) == 42
+    assert bump_dataset_version(after=3) == 43
+
+
+def test_sitemap_etag_and_lastmod_follow_the_version():
+    """Unchanged data answers 304; an ingest changes the ETag and lastmod"""
+    factory = RequestFactory()
+    first = sitemap_view(factory.get('/sitemap.xml'))
+    assert first.status_code == 200
+    assert '<lastmod>' not in first.content.decode()
+    etag = first['ETag']
+
+    not_modified = sitemap_view(factory.get('/sitemap.xml', HTTP_IF_NONE_MATCH=etag))
+    assert not_modified.status_code == 304
+    assert not_modified['ETag'] == etag
+
+    bump_dataset_version()
+    response = sitemap_view(factory.get('/sitemap.xml', HTTP_IF_NONE_MATCH=etag))
+    assert response.status_code == 200
+    assert response['ETag'] != etag
+    assert f'<lastmod>{date.today().isoformat()}</lastmod>' in response.content.decode()
+
+
+def test_cached_view_is_wrapped_once_per_version(monkeypatch):
+    """cache_page wraps the view once per dataset version and day, not per request"""
+    from webapp import caching
+
+    wrapped = []
+    real_cache_page = caching.cache_page
+
+    def counting_cache_page(*args, **kwargs):
+        wrapped.append(kwargs['key_prefix'])
+        return real_cache_page(*args, **kwargs)
+
+    monkeypatch.setattr(caching, 'cache_page', counting_cache_page)
+    view = caching.dataset_cache_page()(sitemap_view.__wrapped__)
+    factory = RequestFactory()
+    for _ in range(3):
+        assert view(factory.get('/sitemap.xml')).status_code == 200
+    assert len(wrapped) == 1
+
+    bump_dataset_version()
+    view(factory.get('/sitemap.xml'))
+    assert len(wrapped) == 2
+    assert wrapped[0] != wrapped[1]
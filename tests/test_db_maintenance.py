@@ -0,0 +1,102 @@
+"""Tests for database maintenance: ANALYZE, WAL checkpoint and VACUUM INTO"""
+
+# Django setup (shared utility for both Bazel and pytest)
+from tests.django_setup import setup_django_for_tests
+setup_django_for_tests()
+
+import sqlite3
+from datetime import datetime
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.db import connection
+
+from extractors.bulletin_extractor import parse_bulletin
+from extractors.db_maintenance import file_sizes, maintain_database
+from extractors.sqlite_writer import SQLiteBulletinWriter
+from lib.publication_data import PublicationData
+
+# Test files are built with the SQLite writer from the test database's schema
+pytestmark = pytest.mark.skipif(connection.vendor != 'sqlite', reason="maintains SQLite files")
+
+
+def create_database(path):
+    """Empty WAL database with the schema the migrations created for the test DB"""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT sql FROM sqlite_master WHERE tbl_name IN ('bulletin', 'visa_cutoff_date', 'visa_series', "
+            "'dataset_version') AND sql IS NOT NULL ORDER BY type DESC"
+        )
+        statements = [row[0] for row in cursor.fetchall()]
+    conn = sqlite3.connect(path)
+    conn.execute('PRAGMA journal_mode=WAL;')
+    for statement in statements:
+        conn.execute(statement)
+    conn.commit()
+    conn.close()
+
+
+def load_page(filename, publication_date, url='/test-url'):
+    with open(f'saved_pages/{filename}', 'r', encoding='utf-8') as f:
+        return PublicationData(url, f.read(), publication_date)
+
+
+def table_counts(db_path):
+    conn = sqlite3.connect(db_path)
+    counts = tuple(
+        conn.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0]
+        for table in ('bulletin', 'visa_cutoff_date', 'visa_series')
+    )
+    conn.close()
+    return counts
+
+
+@pytest.fixture
+def database(tmp_path):
+    db_path = tmp_path / 'visa_bulletin.db'
+    create_database(db_path)
+    with SQLiteBulletinWriter(db_path) as writer:
+        writer.save(parse_bulletin(load_page('visa-bulletin-for-march-2023.html', datetime(2023, 3, 1))))
+        writer.save(parse_bulletin(load_page('visa-bulletin-for-october-2021.html', datetime(2021, 10, 1))))
+    # Closing the last connection checkpoints the WAL; an open one keeps it,
+    # like a running web worker. The deletes leave pages for VACUUM to reclaim.
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    conn.execute('PRAGMA wal_autocheckpoint=0;')
+    conn.execute("DELETE FROM visa_cutoff_date WHERE action_type = 'filing'")
+    yield db_path
+    conn.close()
+
+
+def test_analyze_and_truncate_the_wal(database):
+    assert file_sizes(database).wal > 0
+    report = maintain_database(database)
+
+    assert report.before.wal > 0
+    assert report.after.wal == 0
+    assert not report.checkpoint_busy
+    conn = sqlite3.connect(database)
+    analyzed = {row[0] for row in conn.execute('SELECT tbl FROM sqlite_stat1')}
+    conn.close()
+    assert {'bulletin', 'visa_cutoff_date', 'visa_series'} <= analyzed
+    assert 'WAL ->' in report.format()
+
+
+def test_vacuum_into_writes_a_compact_copy(database, tmp_path):
+    out_path = tmp_path / 'backups' / 'visa_bulletin.db'
+    out_path.parent.mkdir()
+    out_path.write_bytes(b'previous backup')
+    report = maintain_database(database, vacuum_into=out_path)
+
+    assert report.vacuum_path == out_path
+    assert report.vacuum_bytes == out_path.stat().st_size
+    assert report.vacuum_bytes < report.after.database
+    assert not out_path.with_name(out_path.name + '.tmp').exists()
+    assert table_counts(out_path) == table_counts(database)
+    conn = sqlite3.connect(out_path)
+    assert conn.execute('PRAGMA integrity_check').fetchone()[0] == 'ok'
+    conn.close()
+
+
+def test_command_refuses_the_in_memory_test_database():
+    with pytest.raises(CommandError, match='No database'):
+        call_command('maintain_db')
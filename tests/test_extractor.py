@@ -14,7 +14,7 @@ from lib.table import Table
 from lib.publication_data import PublicationData
 from models.bulletin import Bulletin
 from models.visa_cutoff_date import VisaCutoffDate
-from extractors.bulletin_extractor import BulletinExtractor
+from extractors.bulletin_extractor import BulletinExtractor, resolve_country_columns
 from models.enums.visa_category import VisaCategory
 from models.enums.action_type import ActionType
 from models.enums.country import Country
@@ -127,6 +127,28 @@ def test_map_header_to_country_enum():
     assert Country.PHILIPPINES.value in countries
 
 
+def test_unknown_country_columns_are_skipped():
+    """Test that the column plan skips unrecognized headers and short rows"""
+    headers = ('Class', 'All Chargeability Areas Except Those Listed', 'Notes', 'INDIA')
+    rows = [
+        ('EB1', date(2020, 1, 1), 'n/a', date(2019, 1, 1)),
+        ('EB2', 'C'),  # truncated row: only the first column is present
+    ]
+    table = Table('employment_based_final_action', headers, rows)
+    
+    assert resolve_country_columns(tuple(headers[1:])) == (
+        (0, Country.ALL.value), (2, Country.INDIA.value)
+    )
+    
+    pub_data = PublicationData('/test-url', '<html></html>', datetime(2025, 12, 1))
+    results = BulletinExtractor(pub_data).extract_from_table(table)
+    
+    assert [(r['visa_class'], r['country']) for r in results] == [
+        ('EB1', Country.ALL.value), ('EB1', Country.INDIA.value), ('EB2', Country.ALL.value)
+    ]
+    assert results[1]['cutoff_date'] == date(2019, 1, 1)
+
+
 def test_save_to_database(sample_bulletin):
     """Test saving extracted data to database"""
     bulletin = sample_bulletin
@@ -0,0 +1,60 @@
+"""Tests for the cross-process ingest lock"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+from extractors.ingest_lock import IngestLock, IngestLockHeld, lock_path_for, read_holder
+
+
+class TestIngestLock(unittest.TestCase):
+    """Only one IngestLock holder per lock file"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.lock_path = lock_path_for(Path(self.tmp.name) / 'visa_bulletin.db')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_lock_file_sits_next_to_database(self):
+        self.assertEqual(self.lock_path.name, 'visa_bulletin.db.ingest.lock')
+
+    def test_second_holder_is_refused_with_holder_details(self):
+        with IngestLock(self.lock_path) as lock:
+            self.assertTrue(lock.held)
+            with self.assertRaises(IngestLockHeld) as raised:
+                IngestLock(self.lock_path).acquire()
+        self.assertEqual(raised.exception.holder['pid'], os.getpid())
+        self.assertIn(f"PID {os.getpid()}", str(raised.exception))
+
+    def test_lock_is_free_again_after_release(self):
+        with IngestLock(self.lock_path):
+            pass
+        self.assertIsNone(read_holder(self.lock_path))
+        with IngestLock(self.lock_path) as lock:
+            self.assertTrue(lock.held)
+
+    def test_other_process_is_refused(self):
+        script = (
+            "import sys\n"
+            "from extractors.ingest_lock import IngestLock, IngestLockHeld\n"
+            "try:\n"
+            "    IngestLock(sys.argv[1]).acquire()\n"
+            "except IngestLockHeld:\n"
+            "    sys.exit(3)\n"
+        )
+        env = {**os.environ, 'PYTHONPATH': os.pathsep.join(sys.path)}
+        with IngestLock(self.lock_path):
+            held = subprocess.run([sys.executable, '-c', script, str(self.lock_path)], env=env)
+        self.assertEqual(held.returncode, 3)
+
+        free = subprocess.run([sys.executable, '-c', script, str(self.lock_path)], env=env)
+        self.assertEqual(free.returncode, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+"""Tests for the staged fetch → parse → save ingest pipeline"""
+
+import unittest
+from datetime import datetime
+
+from extractors.ingest_pipeline import IngestPipeline, ParsedBulletin
+from lib.publication_data import PublicationData
+
+
+TEST_PAGES = {
+    'https://example.test/visa-bulletin-for-march-2023.html':
+        ('saved_pages/visa-bulletin-for-march-2023.html', datetime(2023, 3, 1)),
+    'https://example.test/visa-bulletin-for-october-2021.html':
+        ('saved_pages/visa-bulletin-for-october-2021.html', datetime(2021, 10, 1)),
+}
+
+
+def load_test_page(url: str) -> PublicationData:
+    """Fetch stub that reads saved pages instead of the network"""
+    path, publication_date = TEST_PAGES[url]
+    with open(path, 'r', encoding='utf-8') as f:
+        return PublicationData(url, f.read(), publication_date)
+
+
+class TestIngestPipeline(unittest.TestCase):
+    """Test stage wiring, batching and error isolation"""
+
+    def setUp(self):
+        self.batches: list[list[ParsedBulletin]] = []
+
+    def save_batch(self, batch):
+        self.batches.append(list(batch))
+
+    def test_all_bulletins_reach_writer(self):
+        """Every fetched page is parsed and handed to the writer exactly once"""
+        pipeline = IngestPipeline(fetch=load_test_page, save_batch=self.save_batch,
+                                  fetch_workers=2, parse_workers=2, queue_size=1)
+        report = pipeline.run(list(TEST_PAGES))
+
+        saved = [parsed for batch in self.batches for parsed in batch]
+        self.assertEqual(sorted(p.publication_data.url for p in saved), sorted(TEST_PAGES))
+        self.assertEqual(report.saved, 2)
+        self.assertEqual(report.errors, [])
+        for parsed in saved:
+            # Content is dropped after parsing; rows are extracted
+            self.assertEqual(parsed.publication_data.content, '')
+            self.assertGreater(len(parsed.cutoff_data), 0)
+
+    def test_batch_size_caps_writer_commits(self):
+        """The writer never commits more than batch_size bulletins at once"""
+        pipeline = IngestPipeline(fetch=load_test_page, save_batch=self.save_batch,
+                                  parse_workers=1, batch_size=1)
+        pipeline.run(list(TEST_PAGES))
+
+        self.assertEqual([len(batch) for batch in self.batches], [1, 1])
+
+    def test_fetch_errors_are_reported_not_raised(self):
+        """A failing fetch is recorded and the rest of the run continues"""
+        urls = list(TEST_PAGES) + ['https://example.test/visa-bulletin-for-missing-1999.html']
+        pipeline = IngestPipeline(fetch=load_test_page, save_batch=self.save_batch,
+                                  parse_workers=1)
+        report = pipeline.run(urls)
+
+        self.assertEqual(report.saved, 2)
+        self.assertEqual(len(report.errors), 1)
+        self.assertIn('missing-1999', report.errors[0][0])
+        self.assertEqual(report.stages[0].errors, 1)
+
+    def test_failed_batch_is_retried_per_bulletin(self):
+        """One bad bulletin does not lose the rest of its batch"""
+        def flaky_save(batch):
+            if any('march-2023' in p.publication_data.url for p in batch):
+                raise ValueError('bad row')
+            self.save_batch(batch)
+
+        pipeline = IngestPipeline(fetch=load_test_page, save_batch=flaky_save,
+                                  parse_workers=1, batch_size=10, queue_size=4)
+        report = pipeline.run(list(TEST_PAGES))
+
+        self.assertEqual(report.saved, 1)
+        self.assertEqual(len(report.errors), 1)
+        self.assertIn('march-2023', report.errors[0][0])
+
+
+if __name__ == '__main__':
+    unittest.main()
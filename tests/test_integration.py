@@ -8,14 +8,21 @@ Tests the complete pipeline: parse HTML → extract tables → save to DB
 from tests.django_setup import setup_django_for_tests
 setup_django_for_tests()
 
+import importlib
 from datetime import date, datetime
+from unittest.mock import Mock
+
+from django.apps import apps
+from django.db import connection
+
+from lib.dashboard_service import get_aggregated_visa_class_data
 from lib.publication_data import PublicationData
 from models.bulletin import Bulletin
 from models.visa_cutoff_date import VisaCutoffDate
 from models.enums.visa_category import VisaCategory
 from models.enums.action_type import ActionType
 from models.enums.country import Country
-from lib.bulletin_parser import extract_tables
+from lib.bulletin_parser import extract_tables, PARSE_PATH_MODERN
 from extractors import bulletin_handler
 
 
@@ -33,7 +40,8 @@ def test_save_bulletin_from_html():
     )
     
     # Save to database
-    bulletin = bulletin_handler.save_bulletin_to_db(pub_data)
+    result = bulletin_handler.save_bulletin_to_db(pub_data)
+    bulletin = result.bulletin
     
     # Verify bulletin created
     assert bulletin is not None
@@ -64,17 +72,123 @@ def test_idempotent_bulletin_save():
     pub_data = PublicationData('/test-march-2023', html, datetime(2023, 3, 1))
     
     # Save once
-    bulletin1 = bulletin_handler.save_bulletin_to_db(pub_data)
+    result1 = bulletin_handler.save_bulletin_to_db(pub_data)
     count1 = VisaCutoffDate.objects.count()
     
     # Save again
-    bulletin2 = bulletin_handler.save_bulletin_to_db(pub_data)
+    result2 = bulletin_handler.save_bulletin_to_db(pub_data)
     count2 = VisaCutoffDate.objects.count()
     
     # Should be same bulletin
-    assert bulletin1.id == bulletin2.id
+    assert result1.bulletin.id == result2.bulletin.id
     # Should not duplicate data
     assert count1 == count2
+    
+    # Second save reports every row as unchanged
+    assert result1.rows_inserted == count1
+    assert result2.rows_inserted == 0
+    assert result2.rows_updated == 0
+    assert result2.rows_unchanged == count1
+
+
+def test_save_result_reports_tables_and_changes():
+    """Test that the ingest result describes the parse and the diff"""
+    with open('saved_pages/visa-bulletin-for-march-2023.html', 'r', encoding='utf-8') as f:
+        html = f.read()
+    
+    pub_data = PublicationData('/test-march-2023', html, datetime(2023, 3, 1))
+    result = bulletin_handler.save_bulletin_to_db(pub_data)
+    
+    assert result.bulletin_created is True
+    assert result.parse_path == PARSE_PATH_MODERN
+    assert result.tables_by_type == {
+        'family_sponsored_final_actions': 1,
+        'family_sponsored_dates_for_filing': 1,
+        'employment_based_final_action': 1,
+        'employment_based_dates_for_filing': 1,
+    }
+    assert set(result.timings) == {'parse', 'extract', 'save'}
+    assert result.total_rows == VisaCutoffDate.objects.filter(bulletin=result.bulletin).count()
+    
+    # Change one stored value; a re-save restores it and reports one update
+    row = VisaCutoffDate.objects.filter(bulletin=result.bulletin, visa_class='F1').first()
+    row.cutoff_value = 'U'
+    row.save()
+    
+    result = bulletin_handler.save_bulletin_to_db(pub_data)
+    assert result.bulletin_created is False
+    assert result.rows_updated == 1
+    assert result.rows_inserted == 0
+    
+    report = result.to_dict()
+    assert report['publication_date'] == '2023-03-01'
+    assert report['rows_updated'] == 1
+
+
+def test_canonical_class_is_stored_and_backfilled():
+    """Test that ingest fills canonical_class and the migration backfills it"""
+    with open('saved_pages/visa-bulletin-for-january-2005.html', 'r', encoding='utf-8') as f:
+        html = f.read()
+    
+    pub_data = PublicationData('/test-january-2005', html, datetime(2005, 1, 1))
+    bulletin = bulletin_handler.save_bulletin_to_db(pub_data).bulletin
+    rows = VisaCutoffDate.objects.filter(bulletin=bulletin)
+    
+    eb1 = rows.get(visa_class='1st', visa_category=VisaCategory.EMPLOYMENT_BASED.value,
+                   country=Country.ALL.value, action_type=ActionType.FINAL_ACTION.value)
+    assert eb1.canonical_class == 'EB-1: Priority Workers'
+    stored = dict(rows.values_list('id', 'canonical_class'))
+    
+    # Rows written before the column existed are filled by the data migration
+    rows.update(canonical_class='')
+    migration = importlib.import_module('models.migrations.0002_canonical_class')
+    migration.backfill_canonical_class(apps, Mock(connection=connection))
+    assert dict(rows.values_list('id', 'canonical_class')) == stored
+    
+    # Dashboard groups on the stored column
+    visa_class_data, has_data = get_aggregated_visa_class_data(
+        VisaCategory.FAMILY_SPONSORED.value, Country.INDIA.value,
+        ActionType.FINAL_ACTION.value, date(2000, 1, 1)
+    )
+    assert has_data
+    # "2A*" is not a recognized class, so it is not charted
+    assert [data['visa_class'] for data in visa_class_data] == ['F1', 'F2B', 'F3', 'F4']
+    f4 = visa_class_data[-1]
+    assert f4['dates'] == [date(2005, 1, 1)]
+    assert f4['cutoff_dates'] == [date(1992, 4, 8)]
+
+
+def test_bulletin_fields_are_denormalized_and_backfilled():
+    """Test that rows carry the bulletin date and URL, kept in sync on URL fill"""
+    with open('saved_pages/visa-bulletin-for-january-2005.html', 'r', encoding='utf-8') as f:
+        html = f.read()
+    
+    pub_data = PublicationData('', html, datetime(2005, 1, 1))
+    bulletin = bulletin_handler.save_bulletin_to_db(pub_data).bulletin
+    rows = VisaCutoffDate.objects.filter(bulletin=bulletin)
+    
+    # No stored URL yet: rows get the constructed one
+    assert set(rows.values_list('publication_date', 'bulletin_url')) == {
+        (date(2005, 1, 1), bulletin.get_bulletin_url())
+    }
+    
+    # Filling the bulletin URL later updates every row
+    pub_data.url = 'https://example.com/january-2005.html'
+    bulletin_handler.save_bulletin_to_db(pub_data)
+    assert set(rows.values_list('bulletin_url', flat=True)) == {'https://example.com/january-2005.html'}
+    
+    # Rows written before the columns existed are filled by the data migration
+    rows.update(bulletin_url='')
+    migration = importlib.import_module('models.migrations.0003_denormalize_bulletin_fields')
+    migration.backfill_bulletin_fields(apps, Mock(connection=connection))
+    assert set(rows.values_list('bulletin_url', flat=True)) == {'https://example.com/january-2005.html'}
+    
+    # Dashboard reads the denormalized URL
+    visa_class_data, _ = get_aggregated_visa_class_data(
+        VisaCategory.FAMILY_SPONSORED.value, Country.INDIA.value,
+        ActionType.FINAL_ACTION.value, date(2000, 1, 1)
+    )
+    assert visa_class_data[0]['bulletin_urls'] == ['https://example.com/january-2005.html']
 
 
 def test_query_time_series_data():
@@ -0,0 +1,39 @@
+"""Tests that the migrations match the models"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+# Fresh interpreter: only what app loading registers counts, not models
+# that other tests happened to import
+CHECK_SCRIPT = '''
+import django
+django.setup()
+from django.core.management import call_command
+call_command('makemigrations', 'models', check=True, dry_run=True, verbosity=1)
+'''
+
+
+class TestMigrations(unittest.TestCase):
+
+    def test_models_have_no_unmigrated_changes(self):
+        """makemigrations --check finds nothing to write"""
+        with tempfile.TemporaryDirectory() as tmp:
+            env = {
+                **os.environ,
+                'PYTHONPATH': os.pathsep.join(sys.path),
+                'DJANGO_SETTINGS_MODULE': 'django_config.settings',
+                # Keep the database it opens out of the workspace
+                'BUILD_WORKSPACE_DIRECTORY': tmp,
+            }
+            env.pop('DATABASE_URL', None)
+            result = subprocess.run(
+                [sys.executable, '-c', CHECK_SCRIPT], env=env, capture_output=True, text=True
+            )
+        self.assertEqual(result.returncode, 0, f"missing migration:\n{result.stdout}{result.stderr}")
+
+
+if __name__ == '__main__':
+    unittest.main()
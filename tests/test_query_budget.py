@@ -0,0 +1,139 @@
+"""Tests for query budget instrumentation and the budgets of views and ingest"""
+
+# Django setup (shared utility for both Bazel and pytest)
+from tests.django_setup import setup_django_for_tests
+setup_django_for_tests()
+
+import logging
+import os
+from datetime import datetime
+from unittest import mock
+
+import pytest
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+from extractors import bulletin_handler
+from lib.publication_data import PublicationData
+from lib.query_budget import QUERY_BUDGET_ENV, Budget, collect_queries, query_budget
+from models.bulletin import Bulletin
+from models.visa_cutoff_date import VisaCutoffDate
+from webapp.middleware import QueryBudgetMiddleware
+from webapp.views import dashboard_view, sitemap_view
+
+# Hard budgets; raise one only with a reason. Ingest batches rows (one
+# INSERT per ~70 rows on SQLite), so its count must not grow with every row.
+DASHBOARD_QUERIES = 2      # Dataset version, one visa_series read
+CATALOG_QUERIES = 1        # Visa class catalog, once per dataset version
+CACHED_PAGE_QUERIES = 1    # Dataset version (the page, or its series for a new priority date)
+SITEMAP_QUERIES = 1        # Dataset version
+NEW_BULLETIN_QUERIES = 17  # March 2023 (170 rows), its series and the version
+RESAVE_QUERIES = 4         # Bulletin and its rows; nothing to write
+
+
+def load_page(filename, publication_date, url='/test-url'):
+    with open(f'saved_pages/{filename}', 'r', encoding='utf-8') as f:
+        return PublicationData(url, f.read(), publication_date)
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def march_2023():
+    return load_page('visa-bulletin-for-march-2023.html', datetime(2023, 3, 1))
+
+
+def test_query_budget_reports_the_statements():
+    with query_budget(1) as stats:
+        Bulletin.objects.count()
+    assert stats.count == 1
+
+    with pytest.raises(AssertionError, match=r'2 queries, budget is 1:\n  1\. SELECT'):
+        with query_budget(1):
+            Bulletin.objects.count()
+            Bulletin.objects.first()
+
+
+def test_save_bulletin_budget(march_2023):
+    with query_budget(NEW_BULLETIN_QUERIES):
+        result = bulletin_handler.save_bulletin_to_db(march_2023)
+    assert result.rows_inserted == 170
+
+    with query_budget(RESAVE_QUERIES):
+        result = bulletin_handler.save_bulletin_to_db(march_2023)
+    assert not result.changed
+
+
+def test_dashboard_budget(march_2023):
+    bulletin_handler.save_bulletin_to_db(march_2023)
+    factory = RequestFactory()
+    pages = [
+        ('/', {}),
+        ('/employment-based/india/', {'category': 'employment_based', 'country': 'india'}),
+        ('/family-sponsored/', {'category': 'family_sponsored'}),
+    ]
+    for index, (path, kwargs) in enumerate(pages):
+        with query_budget(DASHBOARD_QUERIES + (CATALOG_QUERIES if index == 0 else 0)):
+            response = dashboard_view(factory.get(path), **kwargs)
+        assert response.status_code == 200
+        with query_budget(CACHED_PAGE_QUERIES):
+            dashboard_view(factory.get(path), **kwargs)
+        with query_budget(CACHED_PAGE_QUERIES):
+            response = dashboard_view(factory.get(path, {'submission_date': '2012-05-01'}), **kwargs)
+        assert response.status_code == 200
+
+
+def test_sitemap_budget(march_2023):
+    bulletin_handler.save_bulletin_to_db(march_2023)
+    with query_budget(SITEMAP_QUERIES):
+        response = sitemap_view(RequestFactory().get('/sitemap.xml'))
+    assert '<lastmod>' in response.content.decode()
+
+
+def test_cutoff_repr_does_not_load_the_bulletin(march_2023):
+    bulletin_handler.save_bulletin_to_db(march_2023)
+    rows = list(VisaCutoffDate.objects.all()[:5])
+    with query_budget(0):
+        text = [repr(row) for row in rows]
+    assert text[0].startswith('<VisaCutoffDate: 2023-03-01 ')
+
+
+def test_middleware_logs_requests_over_budget(caplog):
+    def view(request):
+        Bulletin.objects.count()
+        Bulletin.objects.count()
+        return HttpResponse('ok')
+
+    middleware = QueryBudgetMiddleware(view)
+    request = RequestFactory().get('/slow/')
+    with caplog.at_level(logging.WARNING, logger='lib.query_budget'):
+        response = middleware(request)
+        assert not caplog.records
+        with mock.patch('webapp.middleware.REQUEST_BUDGET', Budget(queries=1, seconds=1.0)):
+            middleware(request)
+    assert response['Server-Timing'].endswith('desc="2 queries"')
+    assert 'GET /slow/: 2 queries' in caplog.records[0].getMessage()
+
+
+def test_ingest_records_queries_when_enabled(march_2023):
+    with mock.patch.dict(os.environ, {QUERY_BUDGET_ENV: '0'}):
+        result = bulletin_handler.save_bulletin_to_db(march_2023)
+    assert result.queries is None
+
+    with mock.patch.dict(os.environ, {QUERY_BUDGET_ENV: '1'}):
+        results = bulletin_handler.save_parsed_bulletins([bulletin_handler.parse_bulletin(march_2023)])
+    assert results[0].queries == results[0].to_dict()['queries'] > 0
+    assert results[0].timings['sql'] > 0
+
+
+def test_collect_queries_ignores_other_blocks():
+    Bulletin.objects.count()
+    with collect_queries() as stats:
+        pass
+    assert stats.count == 0
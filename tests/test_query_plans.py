@@ -0,0 +1,94 @@
+"""
+Query-plan regression tests for the hot read paths
+
+Runs EXPLAIN QUERY PLAN on the SQL the ORM actually sends (captured while
+the read runs) and fails if SQLite stops answering it from the intended
+index: a full table SCAN or a TEMP B-TREE sort means an index or the query
+drifted.
+
+- the dashboard page lookup: lib.series_repository.series_rows
+- the per-bulletin series refresh at ingest: lib.series_store.refresh_bulletin_series
+"""
+
+# Django setup (shared utility for both Bazel and pytest)
+from tests.django_setup import setup_django_for_tests
+setup_django_for_tests()
+
+from datetime import datetime
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from extractors.bulletin_handler import save_bulletin_to_db
+from lib.publication_data import PublicationData
+from lib.series_repository import series_rows
+from lib.series_store import refresh_bulletin_series
+from models.bulletin import Bulletin
+from models.enums.action_type import ActionType
+from models.enums.country import Country
+from models.enums.visa_category import VisaCategory
+
+pytestmark = pytest.mark.skipif(
+    connection.vendor != 'sqlite', reason="EXPLAIN QUERY PLAN output is SQLite-specific"
+)
+
+
+def select_plans(read) -> dict[str, str]:
+    """{table: query plan} of each SELECT issued while read() runs"""
+    with CaptureQueriesContext(connection) as queries:
+        read()
+    plans = {}
+    with connection.cursor() as cursor:
+        for query in queries.captured_queries:
+            sql = query['sql']
+            if not sql.startswith('SELECT'):
+                continue
+            table = sql.split(' FROM ', 1)[1].split()[0].strip('"')
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+            plans[table] = '\n'.join(row[-1] for row in cursor.fetchall())
+    return plans
+
+
+def assert_plan_searches(plan: str, table: str, constraint: str) -> None:
+    """Fail unless the plan is a single index SEARCH on table with no scan or temp sort"""
+    assert 'SCAN' not in plan, f"full scan:\n{plan}"
+    assert 'TEMP B-TREE' not in plan, f"temp sort:\n{plan}"
+    assert f'SEARCH {table} USING INDEX' in plan and constraint in plan, (
+        f"expected an index SEARCH on {table} by {constraint}:\n{plan}"
+    )
+
+
+def save_bulletins():
+    """A few bulletins, so one bulletin's rows are a small share of the table"""
+    for filename, publication_date in [
+        ('visa-bulletin-for-march-2023.html', datetime(2023, 3, 1)),
+        ('visa-bulletin-for-october-2021.html', datetime(2021, 10, 1)),
+        ('visa-bulletin-for-february-2017.html', datetime(2017, 2, 1)),
+        ('visa-bulletin-for-january-2005.html', datetime(2005, 1, 1)),
+    ]:
+        with open(f'saved_pages/{filename}', 'r', encoding='utf-8') as f:
+            save_bulletin_to_db(PublicationData(f'/test-{filename}', f.read(), publication_date))
+    # Planner statistics must not talk SQLite out of the index
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('category', VisaCategory.values)
+def test_series_page_lookup_is_an_index_search(category):
+    """Dashboard page read: SEARCH on the visa_series key, already in canonical class order"""
+    plans = select_plans(lambda: list(series_rows(category, Country.INDIA.value, ActionType.FINAL_ACTION.value)))
+    assert list(plans) == ['visa_series']
+    assert_plan_searches(plans['visa_series'], 'visa_series', '(visa_category=? AND country=? AND action_type=?)')
+
+
+@pytest.mark.django_db
+def test_bulletin_series_refresh_reads_are_index_searches():
+    """Ingest refresh: the bulletin's cutoff rows by bulletin_id, the stored series by key, no join"""
+    save_bulletins()
+    bulletin = Bulletin.objects.get(publication_date=datetime(2023, 3, 1))
+    plans = select_plans(lambda: refresh_bulletin_series([(bulletin, set())]))
+    assert sorted(plans) == ['visa_cutoff_date', 'visa_series']
+    assert_plan_searches(plans['visa_cutoff_date'], 'visa_cutoff_date', '(bulletin_id=?)')
+    assert_plan_searches(plans['visa_series'], 'visa_series', '(visa_category=? AND country=? AND action_type=?)')
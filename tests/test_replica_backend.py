@@ -0,0 +1,140 @@
+"""Tests for the per-process in-memory replica backend"""
+
+# Django setup (shared utility for both Bazel and pytest)
+from tests.django_setup import setup_django_for_tests
+setup_django_for_tests()
+
+import sqlite3
+import tempfile
+import unittest
+from pathlib import Path
+
+import pytest
+from django.db import OperationalError, connection, connections
+
+from django_config.replica_backend.replica import InMemoryReplica, dataset_marker
+from django_config.sqlite_profiles import REPLICA, sqlite_database
+
+# The replica profile is SQLite-only
+pytestmark = pytest.mark.skipif(connection.vendor != 'sqlite', reason="SQLite-only replica backend")
+
+
+def create_database(path: Path) -> None:
+    conn = sqlite3.connect(path)
+    conn.execute('PRAGMA journal_mode=WAL;')
+    conn.execute('CREATE TABLE bulletin (id INTEGER PRIMARY KEY, publication_date TEXT)')
+    conn.execute("INSERT INTO bulletin VALUES (1, '2023-03-01')")
+    conn.commit()
+    conn.close()
+
+
+def add_bulletin(path: Path, bulletin_id: int, publication_date: str) -> None:
+    conn = sqlite3.connect(path)
+    conn.execute('INSERT INTO bulletin VALUES (?, ?)', (bulletin_id, publication_date))
+    conn.commit()
+    conn.close()
+
+
+def read_dates(uri: str) -> list[str]:
+    conn = sqlite3.connect(uri, uri=True)
+    try:
+        return [row[0] for row in conn.execute('SELECT publication_date FROM bulletin ORDER BY id')]
+    finally:
+        conn.close()
+
+
+class TestInMemoryReplica(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = Path(self.tmp.name) / 'visa_bulletin.db'
+        create_database(self.db_path)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_marker_changes_on_write(self):
+        before = dataset_marker(self.db_path)
+        add_bulletin(self.db_path, 2, '2023-04-01')
+        self.assertNotEqual(dataset_marker(self.db_path), before)
+
+    def test_replica_reloads_only_when_marker_changes(self):
+        replica = InMemoryReplica(self.db_path, refresh_interval=0)
+        first_uri = replica.uri
+        self.assertEqual(read_dates(first_uri), ['2023-03-01'])
+        self.assertFalse(replica.refresh())
+        self.assertEqual(replica.loads, 1)
+
+        # A connection open on the old copy keeps working through the reload
+        reader = sqlite3.connect(first_uri, uri=True)
+        add_bulletin(self.db_path, 2, '2023-04-01')
+        self.assertTrue(replica.refresh())
+        self.assertNotEqual(replica.uri, first_uri)
+        self.assertEqual(read_dates(replica.uri), ['2023-03-01', '2023-04-01'])
+        self.assertEqual(reader.execute('SELECT COUNT(*) FROM bulletin').fetchone()[0], 1)
+        reader.close()
+        replica.close()
+
+    def test_refresh_interval_limits_marker_checks(self):
+        replica = InMemoryReplica(self.db_path, refresh_interval=3600)
+        uri = replica.uri
+        add_bulletin(self.db_path, 2, '2023-04-01')
+        self.assertEqual(replica.uri, uri)
+        self.assertTrue(replica.refresh(force=True))
+        replica.close()
+
+
+class TestReplicaBackend(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = Path(self.tmp.name) / 'visa_bulletin.db'
+        create_database(self.db_path)
+        connections.settings[REPLICA] = {
+            **connections.settings['default'],
+            **sqlite_database(self.db_path, REPLICA),
+        }
+        connections.settings[REPLICA]['OPTIONS']['replica_refresh_interval'] = 0
+
+    def tearDown(self):
+        connections[REPLICA].close()
+        del connections[REPLICA]
+        del connections.settings[REPLICA]
+        self.tmp.cleanup()
+
+    def test_django_connection_reads_replica_and_refuses_writes(self):
+        connection = connections[REPLICA]
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT publication_date FROM bulletin')
+            self.assertEqual(cursor.fetchall(), [('2023-03-01',)])
+        self.assertIn('mode=memory', connection.get_connection_params()['database'])
+
+        with self.assertRaises(OperationalError):
+            with connection.cursor() as cursor:
+                cursor.execute("INSERT INTO bulletin VALUES (2, '2023-04-01')")
+
+    def test_new_connection_sees_refreshed_data(self):
+        connection = connections[REPLICA]
+        connection.ensure_connection()
+        connection.close()
+        add_bulletin(self.db_path, 2, '2023-04-01')
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT COUNT(*) FROM bulletin')
+            self.assertEqual(cursor.fetchone()[0], 2)
+
+    def test_persistent_connection_moves_to_the_reloaded_copy(self):
+        connection = connections[REPLICA]
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT COUNT(*) FROM bulletin')
+        self.assertTrue(connection.is_usable())
+        add_bulletin(self.db_path, 2, '2023-04-01')
+        self.assertFalse(connection.is_usable())
+
+        connection.close_if_unusable_or_obsolete()  # Next request: the health check reattaches
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT COUNT(*) FROM bulletin')
+            self.assertEqual(cursor.fetchone()[0], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+"""Tests for the memory-mapped binary series file"""
+
+# Django setup (shared utility for both Bazel and pytest)
+from tests.django_setup import setup_django_for_tests
+setup_django_for_tests()
+
+from datetime import date, datetime
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
+
+from extractors.bulletin_extractor import parse_bulletin
+from extractors.bulletin_handler import save_parsed_bulletin
+from lib.dashboard_service import get_aggregated_visa_class_data
+from lib.dataset_version import current_dataset_version
+from lib.publication_data import PublicationData
+from lib.series_file import MappedSeriesFile, load_series_file, write_series_file
+from models.visa_series import VisaSeries
+
+PAGE = ('employment_based', 'india', 'final_action')
+FAMILY_PAGE = ('family_sponsored', 'mexico', 'final_action')
+
+
+def load_page(filename, publication_date, url='/test-url'):
+    with open(f'saved_pages/{filename}', 'r', encoding='utf-8') as f:
+        return PublicationData(url, f.read(), publication_date)
+
+
+def save(filename, publication_date):
+    save_parsed_bulletin(parse_bulletin(load_page(filename, publication_date)))
+
+
+def export(path):
+    with connection.cursor() as cursor:
+        return write_series_file(cursor, path)
+
+
+@pytest.fixture
+def series_path(tmp_path):
+    save('visa-bulletin-for-march-2023.html', datetime(2023, 3, 1))
+    save('visa-bulletin-for-october-2021.html', datetime(2021, 10, 1))
+    path = tmp_path / 'visa_bulletin.series'
+    export(path)
+    return path
+
+
+def test_file_holds_every_stored_series(series_path):
+    series_file = load_series_file(series_path)
+    assert series_file.token == current_dataset_version().token
+    assert len(series_file) == VisaSeries.objects.count()
+
+    for stored in VisaSeries.objects.all():
+        rows = series_file.series_rows(stored.visa_category, stored.country, stored.action_type)
+        row = next(row for row in rows if row[0] == stored.canonical_class)
+        assert row[1] == stored.visa_class
+        assert bytes(row[2]) == bytes(stored.publication_dates)
+        assert bytes(row[3]) == bytes(stored.cutoff_ordinals)
+        assert bytes(row[4]) == bytes(stored.statuses)
+        assert row[5] == stored.bulletin_urls
+    assert series_file.series_rows('employment_based', 'atlantis', 'final_action') == []
+
+
+def test_dashboard_reads_a_current_file_without_queries(series_path):
+    token = current_dataset_version().token
+    from_database, _ = get_aggregated_visa_class_data(*PAGE, date(2015, 6, 1))
+    with override_settings(SERIES_FILE=series_path):
+        with CaptureQueriesContext(connection) as queries:
+            from_file, has_data = get_aggregated_visa_class_data(*PAGE, date(2015, 6, 1), token)
+    assert has_data
+    assert from_file == from_database
+    assert len(queries) == 0
+
+
+def test_dashboard_ignores_a_stale_file(series_path):
+    save('visa-bulletin-for-january-2005.html', datetime(2005, 1, 1))
+    token = current_dataset_version().token
+    assert load_series_file(series_path).token != token
+
+    from_database, _ = get_aggregated_visa_class_data(*FAMILY_PAGE, date(2015, 6, 1))
+    with override_settings(SERIES_FILE=series_path):
+        with CaptureQueriesContext(connection) as queries:
+            result, _ = get_aggregated_visa_class_data(*FAMILY_PAGE, date(2015, 6, 1), token)
+    assert result == from_database
+    assert len(queries) == 1
+    assert any(date(2005, 1, 1) in data['dates'] for data in result)
+
+
+def test_mapping_follows_an_atomic_replacement(series_path):
+    mapped = MappedSeriesFile(series_path, refresh_interval=0)
+    first = mapped.current()
+    old_rows = [bytes(row[2]) for row in first.series_rows(*PAGE)]
+
+    save('visa-bulletin-for-january-2005.html', datetime(2005, 1, 1))
+    export(series_path)
+    second = mapped.current()
+    assert second is not first
+    assert second.token == current_dataset_version().token
+    assert mapped.loads == 2
+    # Requests still holding the previous mapping keep reading it
+    assert [bytes(row[2]) for row in first.series_rows(*PAGE)] == old_rows
+    assert mapped.current() is second
+
+
+def test_missing_or_foreign_file_is_ignored(tmp_path):
+    path = tmp_path / 'visa_bulletin.series'
+    mapped = MappedSeriesFile(path, refresh_interval=0)
+    assert mapped.current() is None
+    path.write_bytes(b'not a series file' * 10)
+    assert mapped.current() is None
+    with pytest.raises(ValueError, match='not a series file'):
+        load_series_file(path)
@@ -0,0 +1,223 @@
+"""Tests for shadow-database validation and the atomic swap"""
+
+# Django setup (shared utility for both Bazel and pytest)
+from tests.django_setup import setup_django_for_tests
+setup_django_for_tests()
+
+import os
+import sqlite3
+import tempfile
+import unittest
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+from django.db import connection, connections
+
+from extractors.ingest_pipeline import PipelineReport, StageStats
+from extractors.shadow_rebuild import (
+    SHADOW_ALIAS,
+    TableCounts,
+    build_shadow_database,
+    continue_dataset_version,
+    count_rows,
+    finalize_shadow_database,
+    read_dataset_version,
+    swap_into_place,
+    validate_shadow_database,
+)
+from lib.bulletin_url import resolve_bulletin_url
+from lib.publication_data import PublicationData
+
+# The rebuild swaps SQLite files (refresh_data --rebuild refuses to run off SQLite)
+pytestmark = pytest.mark.skipif(connection.vendor != 'sqlite', reason="swaps SQLite files")
+
+
+def create_database(path: Path, march_2023_f1_mexico: str = '2001-04-01', wal: bool = False):
+    """Minimal bulletin/visa_cutoff_date schema with one known cutoff"""
+    conn = sqlite3.connect(path)
+    if wal:
+        conn.execute('PRAGMA journal_mode=WAL;')
+    conn.executescript('''
+        CREATE TABLE bulletin (id INTEGER PRIMARY KEY, publication_date TEXT, url TEXT);
+        CREATE TABLE visa_cutoff_date (
+            id INTEGER PRIMARY KEY, bulletin_id INTEGER, visa_category TEXT, visa_class TEXT,
+            action_type TEXT, country TEXT, cutoff_date TEXT
+        );
+        INSERT INTO bulletin VALUES (1, '2023-03-01', NULL);
+    ''')
+    conn.execute(
+        "INSERT INTO visa_cutoff_date VALUES "
+        "(1, 1, 'family_sponsored', 'F1', 'final_action', 'mexico', ?)",
+        (march_2023_f1_mexico,)
+    )
+    conn.commit()
+    return conn
+
+
+def load_saved_page(url: str) -> PublicationData:
+    """fetch for the ingest pipeline: a bulletin URL answered from saved_pages"""
+    filename = os.path.basename(url)
+    publication_date = datetime.strptime(filename, 'visa-bulletin-for-%B-%Y.html')
+    with open(f'saved_pages/{filename}', 'r', encoding='utf-8') as f:
+        return PublicationData(url, f.read(), publication_date)
+
+
+def make_report(saved: int, errors=None) -> PipelineReport:
+    save_stats = StageStats('save', 1, items=saved)
+    return PipelineReport(wall_seconds=1.0, stages=[save_stats], errors=errors or [])
+
+
+class TestShadowValidation(unittest.TestCase):
+    """validate_shadow_database() gates the swap"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.shadow = Path(self.tmp.name) / 'visa_bulletin.db.shadow'
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_valid_shadow_has_no_problems(self):
+        create_database(self.shadow).close()
+        self.assertEqual(count_rows(self.shadow), TableCounts(1, 1))
+        self.assertEqual(validate_shadow_database(self.shadow, make_report(1), None), [])
+
+    def test_wrong_known_cutoff_is_reported(self):
+        create_database(self.shadow, march_2023_f1_mexico='1999-01-01').close()
+        problems = validate_shadow_database(self.shadow, make_report(1), None)
+        self.assertEqual(len(problems), 1)
+        self.assertIn('March 2023 F1 mexico', problems[0])
+
+    def test_shrinking_dataset_is_reported(self):
+        create_database(self.shadow).close()
+        problems = validate_shadow_database(self.shadow, make_report(1), TableCounts(2, 100))
+        self.assertTrue(any('bulletins shrank' in p for p in problems))
+        self.assertTrue(any('cutoff rows shrank' in p for p in problems))
+
+    def test_pipeline_errors_block_swap(self):
+        create_database(self.shadow).close()
+        report = make_report(1, errors=[('https://example.test/x.html', 'ValueError: boom')])
+        self.assertEqual(len(validate_shadow_database(self.shadow, report, None)), 1)
+
+    def test_read_dataset_version(self):
+        self.assertEqual(read_dataset_version(self.shadow), 0)
+        conn = create_database(self.shadow)
+        self.assertEqual(read_dataset_version(self.shadow), 0)  # Predates the table
+        conn.executescript('''
+            CREATE TABLE dataset_version (id INTEGER PRIMARY KEY, version INTEGER);
+            INSERT INTO dataset_version VALUES (1, 41);
+        ''')
+        conn.close()
+        self.assertEqual(read_dataset_version(self.shadow), 41)
+
+
+class TestSwapIntoPlace(unittest.TestCase):
+    """swap_into_place() replaces the live file under open WAL readers"""
+
+    def test_new_connections_see_new_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            live = Path(tmp) / 'visa_bulletin.db'
+            shadow = Path(tmp) / 'visa_bulletin.db.shadow'
+            reader = create_database(live, march_2023_f1_mexico='1999-01-01', wal=True)
+            create_database(shadow).close()
+
+            swap_into_place(shadow, live)
+
+            self.assertFalse(shadow.exists())
+            fresh = sqlite3.connect(live)
+            try:
+                self.assertEqual(
+                    fresh.execute('SELECT cutoff_date FROM visa_cutoff_date').fetchone()[0],
+                    '2001-04-01'
+                )
+            finally:
+                fresh.close()
+            # A reader opened before the swap keeps its consistent old view
+            self.assertEqual(
+                reader.execute('SELECT cutoff_date FROM visa_cutoff_date').fetchone()[0],
+                '1999-01-01'
+            )
+            reader.close()
+
+    def test_stale_wal_files_are_removed(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            live = Path(tmp) / 'visa_bulletin.db'
+            shadow = Path(tmp) / 'visa_bulletin.db.shadow'
+            reader = create_database(live, march_2023_f1_mexico='1999-01-01', wal=True)
+            create_database(shadow).close()
+
+            swap_into_place(shadow, live)
+
+            self.assertFalse(Path(f"{live}-wal").exists())
+            self.assertFalse(Path(f"{live}-shm").exists())
+            reader.close()
+
+
+class TestShadowRebuildEndToEnd(unittest.TestCase):
+    """Build, validate and swap through the ORM, as refresh_data does"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.live = Path(self.tmp.name) / 'visa_bulletin.db'
+        self.shadow = Path(self.tmp.name) / 'visa_bulletin.db.shadow'
+
+    def tearDown(self):
+        if SHADOW_ALIAS in connections.settings:
+            connections[SHADOW_ALIAS].close()
+            del connections[SHADOW_ALIAS]
+            del connections.settings[SHADOW_ALIAS]
+        self.tmp.cleanup()
+
+    def rebuild(self, months):
+        """One refresh_data rebuild of the given bulletins; returns the validation problems"""
+        urls = [resolve_bulletin_url(month) for month in months]
+        live_counts = count_rows(self.live)
+        report = build_shadow_database(self.shadow, urls, fetch=load_saved_page)
+        problems = validate_shadow_database(self.shadow, report, live_counts)
+        if not problems:
+            continue_dataset_version(self.live)
+            finalize_shadow_database()
+            swap_into_place(self.shadow, self.live)
+        return problems
+
+    def test_rebuild_replaces_live_database(self):
+        self.assertEqual(self.rebuild([datetime(2023, 3, 1)]), [])
+        self.assertEqual(count_rows(self.live).bulletins, 1)
+        first_version = read_dataset_version(self.live)
+        self.assertGreater(first_version, 0)
+
+        # A web worker reading the live file in WAL mode during the next rebuild
+        reader = sqlite3.connect(self.live)
+        self.assertEqual(reader.execute('PRAGMA journal_mode').fetchone()[0], 'wal')
+        reader.execute('SELECT COUNT(*) FROM visa_cutoff_date').fetchone()
+        self.assertTrue(Path(f"{self.live}-shm").exists())
+
+        self.assertEqual(self.rebuild([datetime(2023, 3, 1), datetime(2021, 10, 1)]), [])
+        self.assertFalse(self.shadow.exists())
+        self.assertFalse(Path(f"{self.live}-shm").exists())
+        reader.close()
+
+        self.assertEqual(count_rows(self.live).bulletins, 2)
+        # Continued past the live version, never back to the shadow's own count
+        self.assertGreater(read_dataset_version(self.live), first_version)
+        fresh = sqlite3.connect(self.live)
+        try:
+            # Migrated into the shadow alias, so later `migrate` runs apply cleanly
+            applied = fresh.execute("SELECT COUNT(*) FROM django_migrations WHERE app = 'models'").fetchone()[0]
+            self.assertGreater(applied, 0)
+            self.assertGreater(fresh.execute('SELECT COUNT(*) FROM visa_series').fetchone()[0], 0)
+        finally:
+            fresh.close()
+
+    def test_invalid_rebuild_leaves_live_database(self):
+        self.assertEqual(self.rebuild([datetime(2023, 3, 1), datetime(2021, 10, 1)]), [])
+        version = read_dataset_version(self.live)
+        self.assertIn('bulletins shrank: 2 → 1', self.rebuild([datetime(2023, 3, 1)]))
+        self.assertTrue(self.shadow.exists())
+        self.assertEqual(count_rows(self.live).bulletins, 2)
+        self.assertEqual(read_dataset_version(self.live), version)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,137 @@
+"""Tests for the writer/reader SQLite connection profiles"""
+
+# Django setup (shared utility for both Bazel and pytest)
+from tests.django_setup import setup_django_for_tests
+setup_django_for_tests()
+
+import os
+import sqlite3
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import pytest
+from django.db import OperationalError, connection, connections
+
+from django_config.sqlite_profiles import (
+    CONN_MAX_AGE_ENV,
+    DB_PROFILE_ENV,
+    READER,
+    WRITER,
+    current_profile,
+    sqlite_database,
+)
+
+# PostgreSQL has its own profiles (tests/test_postgres_profiles.py)
+pytestmark = pytest.mark.skipif(connection.vendor != 'sqlite', reason="SQLite connection profiles")
+
+
+class TestSQLiteProfiles(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = Path(self.tmp.name) / 'visa_bulletin.db'
+        self.create(self.db_path, '2023-03-01')
+
+    def tearDown(self):
+        for alias in (WRITER, READER):
+            if alias in connections.settings:
+                connections[alias].close()
+                del connections[alias]
+                del connections.settings[alias]
+        self.tmp.cleanup()
+
+    def create(self, path, publication_date):
+        conn = sqlite3.connect(path)
+        conn.execute('PRAGMA journal_mode=WAL;')
+        conn.execute('CREATE TABLE bulletin (id INTEGER PRIMARY KEY, publication_date TEXT)')
+        conn.execute("INSERT INTO bulletin VALUES (1, ?)", (publication_date,))
+        conn.commit()
+        conn.close()
+
+    def open(self, profile):
+        """Django connection for the temp database under profile"""
+        connections.settings[profile] = {
+            **connections.settings['default'],
+            **sqlite_database(self.db_path, profile),
+        }
+        return connections[profile]
+
+    def pragma(self, connection, name):
+        with connection.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name};')
+            return cursor.fetchone()[0]
+
+    def test_profile_comes_from_environment(self):
+        with mock.patch.dict(os.environ, {DB_PROFILE_ENV: 'Reader'}):
+            self.assertEqual(current_profile(), READER)
+        with mock.patch.dict(os.environ, {}, clear=True):
+            self.assertEqual(current_profile(), WRITER)
+        with mock.patch.dict(os.environ, {DB_PROFILE_ENV: 'primary'}):
+            with self.assertRaises(ValueError):
+                current_profile()
+
+    def test_reader_is_read_only_and_tuned(self):
+        reader = self.open(READER)
+        with reader.cursor() as cursor:
+            cursor.execute('SELECT publication_date FROM bulletin')
+            self.assertEqual(cursor.fetchall(), [('2023-03-01',)])
+        self.assertEqual(self.pragma(reader, 'query_only'), 1)
+        self.assertEqual(self.pragma(reader, 'mmap_size'), 268435456)
+        self.assertEqual(self.pragma(reader, 'temp_store'), 2)  # MEMORY
+
+        with self.assertRaises(OperationalError):
+            with reader.cursor() as cursor:
+                cursor.execute("INSERT INTO bulletin VALUES (2, '2023-04-01')")
+
+    def test_read_connections_are_persistent_and_health_checked(self):
+        database = sqlite_database(self.db_path, READER)
+        self.assertEqual(database['CONN_MAX_AGE'], 600)
+        self.assertTrue(database['CONN_HEALTH_CHECKS'])
+        with mock.patch.dict(os.environ, {CONN_MAX_AGE_ENV: '60'}):
+            self.assertEqual(sqlite_database(self.db_path, READER)['CONN_MAX_AGE'], 60)
+        self.assertNotIn('CONN_MAX_AGE', sqlite_database(self.db_path, WRITER))
+
+    def test_reader_is_reused_across_requests(self):
+        reader = self.open(READER)
+        with reader.cursor() as cursor:
+            cursor.execute('SELECT 1')
+        handle = reader.connection
+        reader.close_if_unusable_or_obsolete()  # request_finished, then request_started
+        reader.close_if_unusable_or_obsolete()
+        with reader.cursor() as cursor:
+            cursor.execute('SELECT 1')
+        self.assertIs(reader.connection, handle)
+
+    def test_reader_reconnects_after_the_file_is_swapped(self):
+        reader = self.open(READER)
+        with reader.cursor() as cursor:
+            cursor.execute('SELECT publication_date FROM bulletin')
+            self.assertEqual(cursor.fetchall(), [('2023-03-01',)])
+        handle = reader.connection
+
+        shadow_path = self.db_path.with_name('visa_bulletin.db.shadow')
+        self.create(shadow_path, '2023-04-01')
+        os.replace(shadow_path, self.db_path)
+        self.assertFalse(reader.is_usable())
+
+        reader.close_if_unusable_or_obsolete()  # Next request: the health check drops the stale handle
+        with reader.cursor() as cursor:
+            cursor.execute('SELECT publication_date FROM bulletin')
+            self.assertEqual(cursor.fetchall(), [('2023-04-01',)])
+        self.assertIsNot(reader.connection, handle)
+        self.assertTrue(reader.is_usable())
+        self.assertEqual(self.pragma(reader, 'query_only'), 1)
+
+    def test_writer_keeps_wal_profile(self):
+        writer = self.open(WRITER)
+        self.assertEqual(self.pragma(writer, 'journal_mode'), 'wal')
+        self.assertEqual(self.pragma(writer, 'synchronous'), 1)  # NORMAL
+        self.assertEqual(self.pragma(writer, 'query_only'), 0)
+        with writer.cursor() as cursor:
+            cursor.execute("INSERT INTO bulletin VALUES (2, '2023-04-01')")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,168 @@
+"""Tests for the Django-free SQLite bulk writer"""
+
+# Django setup (shared utility for both Bazel and pytest)
+from tests.django_setup import setup_django_for_tests
+setup_django_for_tests()
+
+import sqlite3
+from datetime import datetime
+
+import pytest
+from django.db import connection
+
+from extractors.bulletin_extractor import CUTOFF_ROW_COLUMNS, parse_bulletin
+from extractors.bulletin_handler import save_parsed_bulletin
+from extractors.sqlite_writer import SQLiteBulletinWriter, _to_db
+from extractors.write_throttle import WriteThrottle
+from lib.dataset_version import current_dataset_version
+from lib.publication_data import PublicationData
+from lib.series_codec import SERIES_KEY_COLUMNS, SERIES_VALUE_COLUMNS
+from models.visa_cutoff_date import VisaCutoffDate
+
+SELECT_ROWS = (
+    f"SELECT b.publication_date, v.publication_date, v.bulletin_url, "
+    f"{', '.join(f'v.{name}' for name in CUTOFF_ROW_COLUMNS)} "
+    f"FROM visa_cutoff_date v JOIN bulletin b ON b.id = v.bulletin_id"
+)
+SELECT_SERIES = f"SELECT {', '.join(SERIES_KEY_COLUMNS + SERIES_VALUE_COLUMNS)} FROM visa_series"
+SELECT_VERSION = 'SELECT version, latest_bulletin_date FROM dataset_version'
+
+# The writer targets SQLite files; the schema is copied from the test database
+pytestmark = pytest.mark.skipif(connection.vendor != 'sqlite', reason="SQLite-only writer")
+
+
+def create_database(path):
+    """Empty database with the schema the migrations created for the test DB"""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT sql FROM sqlite_master WHERE tbl_name IN ('bulletin', 'visa_cutoff_date', 'visa_series', "
+            "'dataset_version') AND sql IS NOT NULL ORDER BY type DESC"
+        )
+        statements = [row[0] for row in cursor.fetchall()]
+    conn = sqlite3.connect(path)
+    for statement in statements:
+        conn.execute(statement)
+    conn.commit()
+    conn.close()
+
+
+def load_page(filename, publication_date, url='/test-url'):
+    with open(f'saved_pages/{filename}', 'r', encoding='utf-8') as f:
+        return PublicationData(url, f.read(), publication_date)
+
+
+def test_writer_matches_orm_writer(tmp_path):
+    """Writer stores exactly what the ORM path stores"""
+    db_path = tmp_path / 'visa_bulletin.db'
+    create_database(db_path)
+    parsed = parse_bulletin(load_page('visa-bulletin-for-march-2023.html', datetime(2023, 3, 1)))
+    # Saved after a later bulletin: its points are merged into the middle of each series
+    earlier = parse_bulletin(load_page('visa-bulletin-for-january-2005.html', datetime(2005, 1, 1)))
+
+    orm_result = save_parsed_bulletin(parsed)
+    save_parsed_bulletin(earlier)
+    with SQLiteBulletinWriter(db_path) as writer:
+        result = writer.save(parsed)
+        writer.save(earlier)
+
+    assert result.bulletin_created is True
+    assert result.rows_inserted == orm_result.rows_inserted > 0
+    assert result.tables_by_type == orm_result.tables_by_type
+
+    with connection.cursor() as cursor:
+        cursor.execute(SELECT_ROWS)
+        # Django's connection converts dates and booleans; compare stored values
+        orm_rows = sorted(_to_db(row) for row in cursor.fetchall())
+        cursor.execute(SELECT_SERIES)
+        orm_series = sorted(_to_db(row) for row in cursor.fetchall())
+    conn = sqlite3.connect(db_path)
+    writer_rows = sorted(conn.execute(SELECT_ROWS).fetchall())
+    writer_series = sorted(conn.execute(SELECT_SERIES).fetchall())
+    writer_version = conn.execute(SELECT_VERSION).fetchone()
+    conn.close()
+    assert writer_rows == orm_rows
+    assert writer_series == orm_series
+    assert len(writer_series) > 0
+    orm_version = current_dataset_version()
+    assert writer_version == (orm_version.version, orm_version.latest_bulletin_date.isoformat()) == (2, '2023-03-01')
+
+
+def test_writer_is_idempotent_and_reports_updates(tmp_path):
+    """Re-saving changes nothing; a changed value is reported as one update"""
+    db_path = tmp_path / 'visa_bulletin.db'
+    create_database(db_path)
+    parsed = parse_bulletin(load_page('visa-bulletin-for-january-2005.html', datetime(2005, 1, 1), url=''))
+
+    with SQLiteBulletinWriter(db_path) as writer:
+        first = writer.save(parsed)
+
+        again = writer.save(parsed)
+        assert again.bulletin_created is False
+        assert again.rows_inserted == 0
+        assert again.rows_unchanged == first.rows_inserted
+
+        writer.connection.execute(
+            "UPDATE visa_cutoff_date SET cutoff_value = 'U', cutoff_date = NULL WHERE visa_class = 'F4' "
+            "AND country = 'india'"
+        )
+        parsed.publication_data.url = 'https://example.com/january-2005.html'
+        updated = writer.save(parsed)
+
+    assert updated.rows_updated == 1
+    assert updated.rows_inserted == 0
+    # Missing URL is filled in on re-save
+    assert updated.url == 'https://example.com/january-2005.html'
+
+    conn = sqlite3.connect(db_path)
+    # Bumped by the first save and the update, not by the no-op re-save
+    assert conn.execute(SELECT_VERSION).fetchone() == (2, '2005-01-01')
+    assert conn.execute('SELECT DISTINCT bulletin_url FROM visa_cutoff_date').fetchall() == [
+        ('https://example.com/january-2005.html',)
+    ]
+    conn.close()
+
+    conn = sqlite3.connect(db_path)
+    assert conn.execute(
+        "SELECT cutoff_date FROM visa_cutoff_date WHERE visa_class = 'F4' AND country = 'india'"
+    ).fetchone() == ('1992-04-08',)
+    conn.close()
+
+
+def test_failed_batch_is_rolled_back(tmp_path):
+    """A batch is one transaction: an error leaves no partial writes"""
+    db_path = tmp_path / 'visa_bulletin.db'
+    create_database(db_path)
+    good = parse_bulletin(load_page('visa-bulletin-for-march-2023.html', datetime(2023, 3, 1)))
+    bad = parse_bulletin(load_page('visa-bulletin-for-january-2005.html', datetime(2005, 1, 1)))
+    bad.rows = [row[:3] for row in bad.rows]  # Truncated rows cannot be inserted
+
+    with SQLiteBulletinWriter(db_path) as writer:
+        try:
+            writer.save_batch([good, bad])
+        except Exception:
+            pass
+        else:
+            raise AssertionError("save_batch should fail on malformed rows")
+
+        counts = writer.connection.execute(
+            'SELECT (SELECT COUNT(*) FROM bulletin), (SELECT COUNT(*) FROM visa_cutoff_date)'
+        ).fetchone()
+    assert counts == (0, 0)
+    assert VisaCutoffDate.objects.count() == 0
+
+
+def test_throttled_batch_commits_per_bulletin(tmp_path):
+    """A zero hold limit commits after every bulletin"""
+    db_path = tmp_path / 'visa_bulletin.db'
+    create_database(db_path)
+    batch = [
+        parse_bulletin(load_page('visa-bulletin-for-march-2023.html', datetime(2023, 3, 1))),
+        parse_bulletin(load_page('visa-bulletin-for-january-2005.html', datetime(2005, 1, 1))),
+    ]
+
+    throttle = WriteThrottle(max_hold_seconds=0.0)
+    with SQLiteBulletinWriter(db_path, throttle=throttle) as writer:
+        results = writer.save_batch(batch)
+
+    assert throttle.transactions == 2
+    assert [result.bulletin_created for result in results] == [True, True]
@@ -0,0 +1,81 @@
+"""Tests for the visa class catalog cached per dataset version"""
+
+# Django setup (shared utility for both Bazel and pytest)
+from tests.django_setup import setup_django_for_tests
+setup_django_for_tests()
+
+from datetime import date, datetime
+
+import pytest
+from django.core.cache import cache
+from django.test import RequestFactory
+
+from extractors.bulletin_extractor import parse_bulletin
+from extractors.bulletin_handler import save_parsed_bulletin
+from lib.dashboard_service import get_visa_classes_for_category
+from lib.dataset_version import current_dataset_version
+from lib.publication_data import PublicationData
+from lib.query_budget import query_budget
+from lib.visa_class_catalog import get_visa_class_catalog
+from lib.visa_class_utils import get_all_family_visa_classes_from_db
+from models.visa_cutoff_date import VisaCutoffDate
+from webapp.views import dashboard_view
+
+EB1 = 'EB-1: Priority Workers'
+PAGE = ('employment_based', 'india', 'final_action')
+
+
+def load_page(filename, publication_date, url='/test-url'):
+    with open(f'saved_pages/{filename}', 'r', encoding='utf-8') as f:
+        return PublicationData(url, f.read(), publication_date)
+
+
+def save(filename, publication_date):
+    save_parsed_bulletin(parse_bulletin(load_page(filename, publication_date)))
+
+
+@pytest.fixture(autouse=True)
+def bulletins():
+    cache.clear()
+    save('visa-bulletin-for-april-2005.html', datetime(2005, 4, 1))
+    save('visa-bulletin-for-march-2023.html', datetime(2023, 3, 1))
+    yield
+    cache.clear()
+
+
+def test_catalog_lists_aliases_and_first_last_bulletin():
+    catalog = get_visa_class_catalog()
+    page = catalog.page_classes(*PAGE)
+    # Spelled "1 st" in 2005, "1st" from 2007
+    assert page[EB1].aliases == ('1 st', '1st')
+    assert page[EB1].first_seen == date(2005, 4, 1)
+    assert page[EB1].last_seen == date(2023, 3, 1)
+    assert list(page) == sorted(page)
+
+    raw = sorted(set(VisaCutoffDate.objects.filter(visa_category='family_sponsored').values_list('visa_class', flat=True)))
+    assert get_all_family_visa_classes_from_db() == raw
+    classes = dict((label, value) for value, label in get_visa_classes_for_category('employment_based'))
+    assert classes[EB1] == '1 st'
+
+
+def test_catalog_is_built_once_per_dataset_version():
+    token = current_dataset_version().token
+    catalog = get_visa_class_catalog(token)
+    with query_budget(0):
+        assert get_visa_class_catalog(token).pages == catalog.pages
+        get_visa_classes_for_category('employment_based', token)
+
+    save('visa-bulletin-for-october-2021.html', datetime(2021, 10, 1))
+    with query_budget(2):  # Dataset version, the grouped query
+        rebuilt = get_visa_class_catalog()
+    assert rebuilt.pages != catalog.pages
+
+
+def test_dashboard_cards_show_the_catalog():
+    response = dashboard_view(
+        RequestFactory().get('/', {'submission_date': '2012-01-01'}),
+        category=PAGE[0], country=PAGE[1],
+    )
+    content = response.content.decode()
+    assert 'Bulletins Apr 2005 – Mar 2023' in content
+    assert 'title="Listed as: 2 nd, 2nd"' in content
@@ -0,0 +1,245 @@
+"""
+Exhaustive tests for the table-driven visa class classifier
+
+EmploymentPreference.normalize_for_display and
+FamilyPreference.normalize_legacy_name used to be hand-written chains.
+These tests pin the classifier to a frozen copy of that legacy logic over
+every distinct raw class found in saved_pages/.
+"""
+
+import unittest
+from pathlib import Path
+
+import pytest
+
+from tests.django_setup import setup_django_for_tests
+setup_django_for_tests()
+
+from lib.bulletin_parser import extract_tables
+from lib.visa_class_utils import canonical_visa_class
+from models.enums.employment_preference import EmploymentPreference
+from models.enums.family_preference import FamilyPreference
+from models.enums.visa_category import VisaCategory
+
+SAVED_PAGES_DIR = Path(__file__).parent.parent / 'saved_pages'
+
+# Every distinct raw visa_class in saved_pages/ tables (after parsing)
+CORPUS_EMPLOYMENT_CLASSES = [
+    '',
+    '1 st',
+    '1st',
+    '2 nd',
+    '2nd',
+    '3 rd',
+    '3rd',
+    '4 th',
+    '4th',
+    '5 th',
+    '5th',
+    '5th Non-Regional Center (C5 and T5)',
+    '5th Non-Regional\xa0Center (C5 and T5)',
+    '5th Pilot Progams',
+    '5th Pilot Programs',
+    '5th Regional Center (I5 and R5)',
+    '5th Regional\xa0Center (I5 and R5)',
+    '5th Set Aside: (High Unemployment - 10%)',
+    '5th Set Aside: (High Unemployment: NH, RH - 10%)',
+    '5th Set Aside: (Infrastructure - 2%)',
+    '5th Set Aside: (Infrastructure: RI - 2%)',
+    '5th Set Aside: (Rural - 20%)',
+    '5th Set Aside: (Rural: NR, RR - 20%)',
+    '5th Set Aside: High Unemployment (10%)',
+    '5th Set Aside: High Unemployment (10%, including NH, RH)',
+    '5th Set Aside: Infrastructure (2%)',
+    '5th Set Aside: Infrastructure (2%, including RI)',
+    '5th Set Aside: Rural (20%)',
+    '5th Set Aside: Rural (20%, including NR, RR)',
+    '5th Targeted Employment Areas/ Regional Centers and Pilot Programs',
+    '5th Targeted Employment Areas/ Regional Centers and Pilot\xa0Programs',
+    '5th Targeted Employment Areas/Regional Centers and Pilot Programs',
+    '5th Targeted EmploymentAreas/ Regional Centers and Pilot Programs',
+    '5th Targeted\xa0Employment Areas/ Regional Centers and Pilot Programs',
+    '5th Unreserved (C5, T5, and all others)',
+    '5th Unreserved (including C5, T5, I5, R5)',
+    '5th Unreserved (including C5, T5, I5, R5, NU, RU)',
+    '5th\xa0Non-Regional\xa0Center (C5 and T5)',
+    '5th\xa0Regional\xa0Center (I5 and R5)',
+    '5th\xa0Unreserved (I5 and R5)',
+    'C',
+    'Certain Religious Workers',
+    'Certain Religious\xa0Workers',
+    'Employment-Based',
+    'Iraqi & Afghani Translators',
+    'Other Workers',
+    'Other Workers*',
+    'Other\xa0Workers',
+    'Schedule A Workers',
+    'Schedule A\xa0Workers',
+    'Schedule\xa0A\xa0Workers',
+    'Targeted Employ- ment Areas/ Regional Centers',
+    'Targeted Employ-ment Areas/Regional Centers',
+    'Targeted Employment Areas / Regional Centers',
+    'Targeted Employment Areas/ Regional Centers',
+    'Targeted Employment Areas/Regional Centers',
+    'Targeted\xa0Employment Areas',
+    'Targeted\xa0Employment Areas/ Regional Centers',
+    'Targeted\xa0Employment Areas/Regional Centers',
+    'U',
+]
+
+CORPUS_FAMILY_CLASSES = [
+    '1991-12-15',
+    '1992-01-15',
+    '1992-02-01',
+    '1992-06-15',
+    '1992-07-08',
+    '1995-05-01',
+    '1995-05-15',
+    '1995-06-15',
+    '1997-07-01',
+    '1997-08-01',
+    '1997-08-15',
+    '1997-10-15',
+    '1998-09-15',
+    '1998-10-08',
+    '1998-10-22',
+    '1998-11-15',
+    '1999-10-15',
+    '1999-12-08',
+    '2000-01-15',
+    '2000-05-15',
+    '2000-07-15',
+    '2000-10-22',
+    '2001-04-15',
+    '2002-11-15',
+    '2004-12-22',
+    '2A*',
+    'F1',
+    'F2A',
+    'F2A*',
+    'F2B',
+    'F3',
+    'F4',
+    'Family',
+]
+
+# Spellings not in the corpus that exercise the remaining rule branches
+EXTRA_CLASSES = [
+    '1 ST', 'EB-1', 'EB-5', 'eb-5 pilot', '3rd Other Workers', '4th Certain Religious',
+    'Targeted Employ - ment Areas', '5th Set Aside: RURAL (20%)', '5th (RI)', '5th (NH)',
+    'Schedule a', 'Afghani Translators', 'c', 'u', '  ', 'Unknown Category',
+    '2 A', '2 B', '3 rd', '4 th', '1st',
+]
+
+
+def legacy_normalize_for_display(visa_class: str) -> str:
+    """Frozen copy of EmploymentPreference.normalize_for_display before the classifier"""
+    clean = ' '.join(visa_class.split())
+    clean = clean.replace(' -', '-').replace('- ', '-')
+    clean_lower = clean.lower()
+    
+    if clean.startswith('1') or '1 st' in clean or '1st' in clean:
+        return 'EB-1: Priority Workers'
+    if clean.startswith('2') or '2 nd' in clean or '2nd' in clean:
+        return 'EB-2: Professionals with Advanced Degrees'
+    if clean.startswith('3') or '3 rd' in clean or '3rd' in clean:
+        if 'other worker' in clean_lower:
+            return 'EB-3: Other Workers'
+        return 'EB-3: Skilled Workers, Professionals'
+    if clean.startswith('4') or '4 th' in clean or '4th' in clean:
+        if 'religious' in clean_lower:
+            return 'EB-4: Religious Workers'
+        return 'EB-4: Special Immigrants'
+    
+    if '5' in clean or 'eb-5' in clean_lower:
+        if 'high unemployment' in clean_lower or '(nh' in clean_lower or 'rh' in clean_lower or 'nh,' in clean_lower:
+            return 'EB-5: High Unemployment (10%)'
+        if 'infrastructure' in clean_lower or '(ri' in clean_lower or 'ri)' in clean_lower:
+            return 'EB-5: Infrastructure (2%)'
+        if 'rural' in clean_lower or '(nr' in clean_lower or 'rr' in clean_lower or 'nr,' in clean_lower:
+            return 'EB-5: Rural (20%)'
+        if 'unreserved' in clean_lower or 'all others' in clean_lower:
+            return 'EB-5: Unreserved'
+        if 'non-regional' in clean_lower:
+            return 'EB-5: Non-Regional Center'
+        if 'targeted' in clean_lower or 'regional' in clean_lower or 'employ-ment' in clean_lower or 'employmentareas' in clean_lower:
+            return 'EB-5: Targeted Employment Areas / Regional Centers'
+        if 'pilot' in clean_lower:
+            return 'EB-5: Pilot Programs'
+        return 'EB-5: All Categories'
+    
+    if 'other worker' in clean_lower:
+        return 'EB-3: Other Workers'
+    if 'religious' in clean_lower:
+        return 'EB-4: Religious Workers'
+    if 'schedule a' in clean_lower:
+        return 'Schedule A Workers'
+    if 'iraqi' in clean_lower or 'afghani' in clean_lower:
+        return 'Iraqi & Afghani Translators'
+    if clean in ('C', 'U'):
+        return clean
+    return clean
+
+
+def legacy_normalize_legacy_name(visa_class: str) -> str:
+    """Frozen copy of FamilyPreference.normalize_legacy_name before the classifier"""
+    return {
+        '1st': 'F1', '1 st': 'F1',
+        '2A': 'F2A', '2 A': 'F2A',
+        '2B': 'F2B', '2 B': 'F2B',
+        '3rd': 'F3', '3 rd': 'F3',
+        '4th': 'F4', '4 th': 'F4',
+    }.get(visa_class, visa_class)
+
+
+ALL_CLASSES = CORPUS_EMPLOYMENT_CLASSES + CORPUS_FAMILY_CLASSES + EXTRA_CLASSES
+
+
+class TestVisaClassClassifier(unittest.TestCase):
+    """Classifier output must match the legacy normalizers exactly"""
+    
+    def test_employment_matches_legacy(self):
+        """Every raw class normalizes to the same display name as before"""
+        for visa_class in ALL_CLASSES:
+            with self.subTest(visa_class=visa_class):
+                self.assertEqual(
+                    EmploymentPreference.normalize_for_display(visa_class),
+                    legacy_normalize_for_display(visa_class)
+                )
+    
+    def test_family_matches_legacy(self):
+        """Every raw class maps to the same family class as before"""
+        for visa_class in ALL_CLASSES:
+            with self.subTest(visa_class=visa_class):
+                self.assertEqual(
+                    FamilyPreference.normalize_legacy_name(visa_class),
+                    legacy_normalize_legacy_name(visa_class)
+                )
+    
+    def test_canonical_class_matches_legacy(self):
+        """Stored canonical classes are unchanged by the classifier"""
+        for visa_class in CORPUS_EMPLOYMENT_CLASSES:
+            display_name = legacy_normalize_for_display(visa_class)
+            expected = display_name if display_name and display_name != visa_class else ''
+            self.assertEqual(canonical_visa_class(VisaCategory.EMPLOYMENT_BASED.value, visa_class), expected)
+        for visa_class in CORPUS_FAMILY_CLASSES:
+            normalized = legacy_normalize_legacy_name(visa_class)
+            expected = normalized if normalized in FamilyPreference.values else ''
+            self.assertEqual(canonical_visa_class(VisaCategory.FAMILY_SPONSORED.value, visa_class), expected)
+    
+    @pytest.mark.slow
+    def test_corpus_classes_are_covered(self):
+        """The frozen class lists above include every class in saved_pages/"""
+        known = {
+            VisaCategory.EMPLOYMENT_BASED: set(CORPUS_EMPLOYMENT_CLASSES),
+            VisaCategory.FAMILY_SPONSORED: set(CORPUS_FAMILY_CLASSES),
+        }
+        for path in sorted(SAVED_PAGES_DIR.glob('visa-bulletin-for-*.html')):
+            for table in extract_tables(path.read_text(encoding='utf-8')):
+                category = VisaCategory.from_table_title(table.title)
+                for row in table.rows:
+                    self.assertIn(str(row[0]), known[category], f"{path.name}: new visa class {row[0]!r}")
+
+
+if __name__ == '__main__':
+    unittest.main()
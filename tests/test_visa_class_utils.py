@@ -1,12 +1,18 @@
 """Tests for visa class utility functions"""
 
 import unittest
-from unittest.mock import patch, Mock
+from datetime import date
+from unittest.mock import patch
 
 # Django setup (shared utility for both Bazel and pytest)
 from tests.django_setup import setup_django_for_tests
 setup_django_for_tests()
-from lib.visa_class_utils import get_deduplicated_employment_classes
+from lib.visa_class_catalog import catalog_from_rows
+from lib.visa_class_utils import (
+    canonical_visa_class,
+    get_all_employment_visa_classes_from_db,
+    get_deduplicated_employment_classes,
+)
 
 
 class TestVisaClassUtils(unittest.TestCase):
@@ -27,13 +33,21 @@ class TestVisaClassUtils(unittest.TestCase):
             '5th Rural',
             '5th Infrastructure'
         ]
+        
+        # What the catalog's grouped query returns for those rows (one page)
+        self.mock_rows = [
+            ('employment_based', 'india', 'final_action', canonical_visa_class('employment_based', raw_class),
+             raw_class, date(2005, 1, 1), date(2023, 3, 1))
+            for raw_class in self.mock_visa_classes
+        ]
+    
+    def _mock_catalog(self):
+        """Serve the catalog built from mock_rows instead of querying"""
+        return patch('lib.visa_class_catalog.get_visa_class_catalog', return_value=catalog_from_rows(self.mock_rows))
     
     def test_deduplicated_employment_classes_no_duplicates(self):
         """Test that deduplicated list has no duplicate display names"""
-        with patch('models.visa_cutoff_date.VisaCutoffDate') as mock_model:
-            # Return mock query results
-            mock_model.objects.filter.return_value.values_list.return_value.distinct.return_value = self.mock_visa_classes
-            
+        with self._mock_catalog():
             classes = get_deduplicated_employment_classes()
             
             # Extract display names
@@ -45,9 +59,7 @@ class TestVisaClassUtils(unittest.TestCase):
     
     def test_deduplicated_employment_classes_format(self):
         """Test that result has correct format"""
-        with patch('models.visa_cutoff_date.VisaCutoffDate') as mock_model:
-            mock_model.objects.filter.return_value.values_list.return_value.distinct.return_value = self.mock_visa_classes
-            
+        with self._mock_catalog():
             classes = get_deduplicated_employment_classes()
             
             # Should be list of tuples
@@ -63,9 +75,7 @@ class TestVisaClassUtils(unittest.TestCase):
     
     def test_deduplicated_employment_classes_sorted(self):
         """Test that results are sorted by display name"""
-        with patch('models.visa_cutoff_date.VisaCutoffDate') as mock_model:
-            mock_model.objects.filter.return_value.values_list.return_value.distinct.return_value = self.mock_visa_classes
-            
+        with self._mock_catalog():
             classes = get_deduplicated_employment_classes()
             display_names = [display for raw, display in classes]
             
@@ -75,9 +85,7 @@ class TestVisaClassUtils(unittest.TestCase):
     
     def test_deduplicated_employment_classes_has_common_categories(self):
         """Test that common EB categories are present"""
-        with patch('models.visa_cutoff_date.VisaCutoffDate') as mock_model:
-            mock_model.objects.filter.return_value.values_list.return_value.distinct.return_value = self.mock_visa_classes
-            
+        with self._mock_catalog():
             classes = get_deduplicated_employment_classes()
             display_names = [display for raw, display in classes]
             
@@ -90,9 +98,7 @@ class TestVisaClassUtils(unittest.TestCase):
     
     def test_deduplicated_eb5_variations(self):
         """Test that multiple EB-5 variations are deduplicated"""
-        with patch('models.visa_cutoff_date.VisaCutoffDate') as mock_model:
-            mock_model.objects.filter.return_value.values_list.return_value.distinct.return_value = self.mock_visa_classes
-            
+        with self._mock_catalog():
             classes = get_deduplicated_employment_classes()
             display_names = [display for raw, display in classes]
             
@@ -112,6 +118,29 @@ class TestVisaClassUtils(unittest.TestCase):
             self.assertLessEqual(eb5_infrastructure_count, 1,
                                f"EB-5: Infrastructure appears {eb5_infrastructure_count} times")
 
+    
+    def test_lowest_spelling_represents_a_class(self):
+        """Each display name maps to its smallest raw value; raw listings keep every spelling"""
+        with self._mock_catalog():
+            classes = dict((display, raw) for raw, display in get_deduplicated_employment_classes())
+            raw_classes = get_all_employment_visa_classes_from_db()
+        self.assertEqual(classes['EB-1: Priority Workers'], '1st')
+        self.assertEqual(raw_classes, sorted(self.mock_visa_classes))
+    
+    def test_canonical_visa_class(self):
+        """Test canonical classes stored at ingest"""
+        self.assertEqual(canonical_visa_class('employment_based', '1 st'), 'EB-1: Priority Workers')
+        self.assertEqual(canonical_visa_class('employment_based', '5th\xa0Unreserved (I5 and R5)'),
+                         'EB-5: Unreserved')
+        self.assertEqual(canonical_visa_class('family_sponsored', '2A'), 'F2A')
+        self.assertEqual(canonical_visa_class('family_sponsored', 'F4'), 'F4')
+        
+        # Unrecognized classes are never charted
+        self.assertEqual(canonical_visa_class('employment_based', 'C'), '')
+        self.assertEqual(canonical_visa_class('employment_based', ''), '')
+        self.assertEqual(canonical_visa_class('family_sponsored', '2A*'), '')
+        self.assertEqual(canonical_visa_class('family_sponsored', '1995-05-01'), '')
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,258 @@
+"""Tests for the packed per-class series table (VisaSeries)"""
+
+# Django setup (shared utility for both Bazel and pytest)
+from tests.django_setup import setup_django_for_tests
+setup_django_for_tests()
+
+import json
+from datetime import date, datetime
+
+import pytest
+from django.core.cache import cache
+from django.test import RequestFactory
+
+from extractors.bulletin_extractor import CUTOFF_ROW_COLUMNS, parse_bulletin
+from extractors.bulletin_handler import save_parsed_bulletin
+from lib.bulletin_url import resolve_bulletin_url
+from lib.chart_builder import build_multi_class_chart_with_projections
+from lib.dashboard_service import get_aggregated_visa_class_data, get_dashboard_series
+from lib.dataset_version import current_dataset_version
+from lib.projection import calculate_projection
+from lib.publication_data import PublicationData
+from lib.query_budget import query_budget
+from lib.series_codec import (
+    STATUS_CURRENT,
+    STATUS_DATE,
+    STATUS_UNAVAILABLE,
+    SeriesPoint,
+    decode_points,
+    decode_series,
+    encode_points,
+    group_series_points,
+    merge_points,
+)
+from lib.series_repository import SERIES_FIELDS, series_rows
+from lib.series_store import rebuild_series
+from models.enums.action_type import ActionType
+from models.enums.country import Country
+from models.enums.visa_category import VisaCategory
+from models.visa_cutoff_date import VisaCutoffDate
+from models.visa_series import VisaSeries
+from webapp.views import dashboard_view
+
+KEY = ('employment_based', 'india', 'final_action', 'EB-1: Priority Workers')
+
+
+def load_page(filename, publication_date, url='/test-url'):
+    with open(f'saved_pages/{filename}', 'r', encoding='utf-8') as f:
+        return PublicationData(url, f.read(), publication_date)
+
+
+def series_snapshot():
+    return {
+        series.key: series.points()
+        for series in VisaSeries.objects.all()
+    }
+
+
+def test_codec_round_trip():
+    """Points survive encoding; URLs equal to the standard one are stored empty"""
+    points = [
+        SeriesPoint(date(2023, 1, 1), '1st', date(2012, 4, 1), STATUS_DATE, resolve_bulletin_url(date(2023, 1, 1))),
+        SeriesPoint(date(2023, 2, 1), 'EB-1', None, STATUS_CURRENT, 'https://example.com/feb.html'),
+        SeriesPoint(date(2023, 3, 1), '1st', None, STATUS_UNAVAILABLE, resolve_bulletin_url(date(2023, 3, 1))),
+    ]
+    columns = encode_points(points)
+
+    assert columns['visa_class'] == '1st'
+    assert columns['first_publication_date'] == date(2023, 1, 1)
+    assert columns['last_publication_date'] == date(2023, 3, 1)
+    assert len(columns['publication_dates']) == 12
+    assert columns['statuses'] == bytes([STATUS_DATE, STATUS_CURRENT, STATUS_UNAVAILABLE])
+    assert columns['bulletin_urls'] == '\nhttps://example.com/feb.html\n'
+
+    assert decode_points(
+        columns['publication_dates'], columns['cutoff_ordinals'], columns['statuses'],
+        columns['visa_classes'], columns['bulletin_urls']
+    ) == points
+
+    dates, cutoff_dates, urls = decode_series(
+        columns['publication_dates'], columns['cutoff_ordinals'], columns['statuses'], columns['bulletin_urls']
+    )
+    assert dates == [date(2023, 1, 1), date(2023, 2, 1), date(2023, 3, 1)]
+    # Current charts at the publication date, unavailable as a gap
+    assert cutoff_dates == [date(2012, 4, 1), date(2023, 2, 1), None]
+    assert urls == [point.bulletin_url for point in points]
+
+
+def test_lowest_spelling_wins_a_date():
+    """Two spellings of one class in a bulletin yield one point"""
+    published = date(2005, 1, 1)
+    rows = [
+        (*KEY, published, 'EB-1', date(2004, 1, 1), False, False, 'u'),
+        (*KEY, published, '1st', None, True, False, 'u'),
+    ]
+    points = group_series_points(rows)[KEY]
+    assert points == [SeriesPoint(published, '1st', None, STATUS_CURRENT, 'u')]
+
+
+
+def test_collision_winner_does_not_depend_on_row_order():
+    """A spelling listed twice keeps the same point whichever row comes first"""
+    published = date(2005, 1, 1)
+    rows = [
+        (*KEY, published, 'EB-1', date(2004, 1, 1), False, False, 'u'),
+        (*KEY, published, 'EB-1', date(2003, 1, 1), False, False, 'u'),
+        (*KEY, published, 'EB-1', None, True, False, 'u'),
+        (*KEY, date(2004, 1, 1), 'EB-1', None, False, True, 'u'),
+    ]
+    expected = [
+        SeriesPoint(date(2004, 1, 1), 'EB-1', None, STATUS_UNAVAILABLE, 'u'),
+        SeriesPoint(published, 'EB-1', date(2003, 1, 1), STATUS_DATE, 'u'),
+    ]
+    assert group_series_points(rows)[KEY] == expected
+    assert group_series_points(reversed(rows))[KEY] == expected
+
+
+def test_merge_points_applies_updates_in_date_order():
+    """Inserts, replacements and removals come out sorted by publication date"""
+    def point(month, visa_class='1st'):
+        published = date(2023, month, 1)
+        return SeriesPoint(published, visa_class, date(2012, month, 1), STATUS_DATE, resolve_bulletin_url(published))
+
+    stored = encode_points([point(2), point(4), point(6)])
+    merged = merge_points(stored, {
+        date(2023, 6, 1): None,
+        date(2023, 5, 1): point(5),
+        date(2023, 1, 1): point(1, 'EB-1'),
+        date(2023, 4, 1): point(4),
+        date(2023, 3, 1): None,
+    })
+    assert merged == encode_points([point(1, 'EB-1'), point(2), point(4), point(5)])
+    assert merge_points(stored, {date(2023, 4, 1): point(4), date(2023, 3, 1): None}) is stored
+    assert merge_points(stored, dict.fromkeys((date(2023, 2, 1), date(2023, 4, 1), date(2023, 6, 1)))) is None
+
+@pytest.mark.django_db
+def test_incremental_series_match_full_rebuild():
+    """Series maintained at ingest equal series derived from scratch"""
+    march_2023 = parse_bulletin(load_page('visa-bulletin-for-march-2023.html', datetime(2023, 3, 1)))
+    january_2005 = parse_bulletin(load_page('visa-bulletin-for-january-2005.html', datetime(2005, 1, 1)))
+    october_2021 = parse_bulletin(load_page('visa-bulletin-for-october-2021.html', datetime(2021, 10, 1)))
+
+    # Out of date order, then a re-save where one value changed
+    for parsed in (march_2023, january_2005, october_2021):
+        save_parsed_bulletin(parsed)
+    f4_india = (VisaCategory.FAMILY_SPONSORED.value, 'F4', ActionType.FINAL_ACTION.value, Country.INDIA.value)
+    changed = []
+    for row in january_2005.rows:
+        values = dict(zip(CUTOFF_ROW_COLUMNS, row))
+        key = (values['visa_category'], values['visa_class'], values['action_type'], values['country'])
+        if key == f4_india:
+            values.update(cutoff_value='C', cutoff_date=None, is_current=True)
+        changed.append(tuple(values[name] for name in CUTOFF_ROW_COLUMNS))
+    january_2005.rows = changed
+    assert save_parsed_bulletin(january_2005).rows_updated == 1
+
+    incremental = series_snapshot()
+    assert rebuild_series() == len(incremental)
+    assert series_snapshot() == incremental
+
+    f4 = VisaSeries.objects.get(
+        visa_category=VisaCategory.FAMILY_SPONSORED.value, country=Country.INDIA.value,
+        action_type=ActionType.FINAL_ACTION.value, canonical_class='F4'
+    )
+    assert f4.first_publication_date == date(2005, 1, 1)
+    assert f4.last_publication_date == date(2023, 3, 1)
+    assert [point.status for point in f4.points()][0] == STATUS_CURRENT
+
+
+@pytest.mark.django_db
+def test_dashboard_reads_series():
+    """Each charted class on a page is one decoded VisaSeries row"""
+    for filename, published in (
+        ('visa-bulletin-for-march-2023.html', datetime(2023, 3, 1)),
+        ('visa-bulletin-for-october-2021.html', datetime(2021, 10, 1)),
+    ):
+        save_parsed_bulletin(parse_bulletin(load_page(filename, published)))
+
+    visa_class_data, has_data = get_aggregated_visa_class_data(
+        VisaCategory.EMPLOYMENT_BASED.value, Country.INDIA.value,
+        ActionType.FINAL_ACTION.value, date(2015, 6, 1)
+    )
+    assert has_data
+    stored = VisaSeries.objects.filter(
+        visa_category=VisaCategory.EMPLOYMENT_BASED.value, country=Country.INDIA.value,
+        action_type=ActionType.FINAL_ACTION.value
+    )
+    assert sorted(data['visa_class_label'] for data in visa_class_data) == sorted(
+        series.canonical_class for series in stored
+    )
+    for data in visa_class_data:
+        series = stored.get(canonical_class=data['visa_class_label'])
+        assert data['visa_class'] == series.visa_class
+        assert (data['dates'], data['cutoff_dates'], data['bulletin_urls']) == series.chart_lists()
+        assert set(data['dates']) <= {date(2021, 10, 1), date(2023, 3, 1)}
+    assert [date(2021, 10, 1), date(2023, 3, 1)] in [data['dates'] for data in visa_class_data]
+
+
+@pytest.mark.django_db
+def test_repository_streams_plain_tuples():
+    """Page reads yield tuples in field order, never model instances"""
+    save_parsed_bulletin(parse_bulletin(load_page('visa-bulletin-for-march-2023.html', datetime(2023, 3, 1))))
+    page = (VisaCategory.EMPLOYMENT_BASED.value, Country.INDIA.value, ActionType.FINAL_ACTION.value)
+
+    stream = series_rows(*page)
+    assert iter(stream) is stream
+    rows = list(stream)
+    assert rows and all(type(row) is tuple and len(row) == len(SERIES_FIELDS) for row in rows)
+    cutoff_classes = VisaCutoffDate.objects.filter(
+        visa_category=page[0], country=page[1], action_type=page[2]
+    ).exclude(canonical_class='').values_list('canonical_class', flat=True).distinct()
+    assert [row[0] for row in rows] == sorted(cutoff_classes)
+
+
+@pytest.mark.django_db
+def test_cached_series_layer_serves_any_priority_date():
+    """The date-independent layer is cached; projections and chart match a full build"""
+    for filename, published in (
+        ('visa-bulletin-for-march-2023.html', datetime(2023, 3, 1)),
+        ('visa-bulletin-for-october-2021.html', datetime(2021, 10, 1)),
+    ):
+        save_parsed_bulletin(parse_bulletin(load_page(filename, published)))
+    page = (VisaCategory.EMPLOYMENT_BASED.value, Country.INDIA.value, ActionType.FINAL_ACTION.value)
+    token = current_dataset_version().token
+    cache.clear()
+
+    get_dashboard_series(*page, token)
+    with query_budget(0):
+        series = get_dashboard_series(*page, token)
+
+    for submission_date in (date(2005, 1, 1), date(2015, 6, 1), date(2030, 1, 1)):
+        visa_class_data = series.visa_class_data(submission_date)
+        assert visa_class_data == get_aggregated_visa_class_data(*page, submission_date)[0]
+        for data in visa_class_data:
+            assert data['projection'] == calculate_projection(data['dates'], data['cutoff_dates'], submission_date)
+
+        chart_data = series.chart_data(visa_class_data, submission_date)
+        expected = build_multi_class_chart_with_projections(
+            visa_class_data, submission_date, Country.INDIA.value, VisaCategory.EMPLOYMENT_BASED.label
+        )
+        assert json.loads(chart_data.pop('chart_json')) == json.loads(expected.pop('chart_json'))
+        assert chart_data == expected
+    cache.clear()
+
+
+def test_rendered_chart_data_has_no_raw_markup():
+    """The chart JSON inlined in the page's <script> keeps Plotly's escaping"""
+    save_parsed_bulletin(parse_bulletin(load_page('visa-bulletin-for-march-2023.html', datetime(2023, 3, 1))))
+    response = dashboard_view(
+        RequestFactory().get('/', {'submission_date': '2012-01-01'}),
+        category=VisaCategory.EMPLOYMENT_BASED.value, country=Country.INDIA.value,
+    )
+    content = response.content.decode()
+    line = next(line for line in content.splitlines() if 'var chartData = ' in line)
+    chart_json = line.split('var chartData = ', 1)[1].rstrip().rstrip(';')
+    assert '</' not in chart_json and '<' not in chart_json
+    chart = json.loads(chart_json)
+    assert any('<extra></extra>' in trace['hovertemplate'] for trace in chart['data'])
+    cache.clear()
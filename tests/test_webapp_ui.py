@@ -9,6 +9,8 @@ from django.test import RequestFactory
 from tests.django_setup import setup_django_for_tests
 setup_django_for_tests()
 
+from lib.dashboard_service import DashboardSeries
+
 
 class TestDashboardUIBehavior(unittest.TestCase):
     """Test UI interaction patterns in the dashboard"""
@@ -40,9 +42,9 @@ class TestDashboardUIBehavior(unittest.TestCase):
         
         with patch('webapp.views.render') as mock_render:
             # Mock the dashboard service to return empty data
-            with patch('webapp.views.get_aggregated_visa_class_data') as mock_service:
-                # Return empty visa class data and has_any_data=False
-                mock_service.return_value = ([], False)
+            with patch('webapp.views.get_dashboard_series') as mock_service:
+                # Return a page without any visa class series
+                mock_service.return_value = DashboardSeries()
                 
                 dashboard_view(request)
                 
@@ -93,9 +95,9 @@ class TestDashboardUIBehavior(unittest.TestCase):
         })
         
         with patch('webapp.views.render') as mock_render:
-            with patch('webapp.views.get_aggregated_visa_class_data') as mock_service:
-                # Return empty visa class data
-                mock_service.return_value = ([], False)
+            with patch('webapp.views.get_dashboard_series') as mock_service:
+                # Return a page without any visa class series
+                mock_service.return_value = DashboardSeries()
                 
                 # Should not raise exception, should use today's date as fallback
                 dashboard_view(request)
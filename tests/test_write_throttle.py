@@ -0,0 +1,79 @@
+"""Tests for chunked commits under a write-lock hold limit"""
+
+import contextlib
+import unittest
+from unittest import mock
+
+from extractors.write_throttle import WriteThrottle
+
+
+class RecordingTransactions:
+    """Stand-in transaction factory that records which items share a commit"""
+
+    def __init__(self):
+        self.commits = []
+        self._open = None
+
+    @contextlib.contextmanager
+    def __call__(self):
+        self._open = []
+        yield
+        self.commits.append(self._open)
+
+    def save(self, item):
+        self._open.append(item)
+        return item * 10
+
+
+class TestWriteThrottle(unittest.TestCase):
+
+    def test_unthrottled_batch_is_one_transaction(self):
+        transactions = RecordingTransactions()
+        throttle = WriteThrottle()
+        results = throttle.run([1, 2, 3], transactions, transactions.save)
+        self.assertEqual(results, [10, 20, 30])
+        self.assertEqual(transactions.commits, [[1, 2, 3]])
+        self.assertEqual(throttle.transactions, 1)
+
+    def test_hold_limit_commits_between_items(self):
+        transactions = RecordingTransactions()
+        throttle = WriteThrottle(max_hold_seconds=0.0, pause_seconds=0.001)
+        results = throttle.run([1, 2, 3], transactions, transactions.save)
+        self.assertEqual(results, [10, 20, 30])
+        self.assertEqual(transactions.commits, [[1], [2], [3]])
+        self.assertAlmostEqual(throttle.paused_seconds, 0.002)
+
+    def test_items_are_never_split_across_transactions(self):
+        transactions = RecordingTransactions()
+        throttle = WriteThrottle(max_hold_seconds=10.0)
+        clock = [0.0]
+
+        def slow_save(item):
+            clock[0] += 6.0  # Each save holds the lock for 6 "seconds"
+            return transactions.save(item)
+
+        with mock.patch('extractors.write_throttle.time.perf_counter', lambda: clock[0]):
+            throttle.run([1, 2, 3, 4, 5], transactions, slow_save)
+        self.assertEqual(transactions.commits, [[1, 2], [3, 4], [5]])
+        self.assertEqual(throttle.longest_hold_seconds, 12.0)
+
+    def test_failed_transaction_propagates(self):
+        throttle = WriteThrottle()
+
+        def failing_save(item):
+            raise ValueError(item)
+
+        with self.assertRaises(ValueError):
+            throttle.run([1], contextlib.nullcontext, failing_save)
+        self.assertEqual(throttle.transactions, 0)
+
+    def test_from_env(self):
+        with mock.patch.dict('os.environ', {'INGEST_MAX_LOCK_HOLD_MS': '250', 'INGEST_LOCK_PAUSE_MS': '40'}):
+            throttle = WriteThrottle.from_env()
+        self.assertEqual((throttle.max_hold_seconds, throttle.pause_seconds), (0.25, 0.04))
+        with mock.patch.dict('os.environ', {}, clear=True):
+            self.assertFalse(WriteThrottle.from_env().enabled)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,22 @@
+"""
+Request middleware
+
+QueryBudgetMiddleware is installed by the settings when QUERY_BUDGET_LOG=1
+(lib/query_budget.py).
+"""
+
+from lib.query_budget import REQUEST_BUDGET, collect_queries, log_over_budget
+
+
+class QueryBudgetMiddleware:
+    """Count each request's queries, log outliers, report them in Server-Timing"""
+    
+    def __init__(self, get_response):
+        self.get_response = get_response
+    
+    def __call__(self, request):
+        with collect_queries() as stats:
+            response = self.get_response(request)
+        log_over_budget(stats, REQUEST_BUDGET, f"{request.method} {request.path}")
+        response.headers['Server-Timing'] = f'db;dur={stats.seconds * 1000:.1f};desc="{stats.count} queries"'
+        return response
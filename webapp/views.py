@@ -7,16 +7,19 @@ from datetime import date, datetime
 from django.shortcuts import render
 from django.http import HttpResponse
 from django.urls import reverse
+from django.utils import timezone
 from django.views.decorators.cache import cache_page
 
 from models.enums.visa_category import VisaCategory
 from models.enums.action_type import ActionType
 from models.enums.country import Country
-from lib.chart_builder import build_multi_class_chart_with_projections
 from lib.dashboard_service import (
-    get_aggregated_visa_class_data,
+    get_dashboard_series,
     build_seo_metadata,
 )
+from lib.dataset_version import current_dataset_version
+from lib.visa_class_catalog import get_visa_class_catalog
+from webapp.caching import dataset_cache_page
 
 logger = logging.getLogger(__name__)
 
@@ -40,7 +43,15 @@ def _parse_submission_date(date_str: str) -> date:
         return date.today()
 
 
-@cache_page(60 * 60 * 3)  # Cache for 3 hours (bulletins update monthly)
+def _data_modified_date(request) -> date | None:
+    """Day the dataset last changed (None before the first ingest)"""
+    # dataset_cache_page already read the version for this request
+    version = getattr(request, 'dataset_version', None) or current_dataset_version()
+    updated_at = version.updated_at
+    return timezone.localdate(updated_at) if updated_at else None
+
+
+@dataset_cache_page()  # Until the next ingest (or midnight)
 def dashboard_view(request, category=None, country=None):
     """
     Main dashboard view with filters and time-series chart
@@ -57,21 +68,23 @@ def dashboard_view(request, category=None, country=None):
     action_type = request.GET.get('action_type', ActionType.FINAL_ACTION.value)
     submission_date = _parse_submission_date(request.GET.get('submission_date', ''))
     
-    # Get aggregated visa class data
-    visa_class_data, has_data = get_aggregated_visa_class_data(
-        category, country, action_type, submission_date
-    )
+    # Series, projection trends and base chart are cached per dataset version;
+    # only the projections for this priority date are computed per request
+    version = getattr(request, 'dataset_version', None) or current_dataset_version()
+    series = get_dashboard_series(category, country, action_type, version.token)
+    visa_class_data = series.visa_class_data(submission_date)
+    has_data = bool(visa_class_data)
+    chart_data = series.chart_data(visa_class_data, submission_date)
     
-    # Build chart
-    chart_data = None
-    if has_data:
-        cat_label = VisaCategory(category).label if category in [c.value for c in VisaCategory] else category
-        chart_data = build_multi_class_chart_with_projections(
-            visa_class_data, submission_date, country, cat_label
-        )
+    # Spellings and first/last bulletin of each class, from the per-version catalog
+    catalog = get_visa_class_catalog(version.token).page_classes(category, country, action_type)
+    for data in visa_class_data:
+        data['catalog'] = catalog.get(data['canonical_class'])
     
     # Build SEO metadata
-    seo = build_seo_metadata(category, country, request.build_absolute_uri())
+    seo = build_seo_metadata(
+        category, country, request.build_absolute_uri(), date_modified=_data_modified_date(request)
+    )
     action_type_display = ActionType(action_type).label if action_type in [c.value for c in ActionType] else action_type
     
     context = {
@@ -119,9 +132,9 @@ def robots_view(request):
     return HttpResponse("\n".join(lines), content_type="text/plain")
 
 
-@cache_page(60 * 60 * 24)
+@dataset_cache_page()
 def sitemap_view(request):
-    """Generate XML sitemap"""
+    """Generate XML sitemap (lastmod is the day the data last changed)"""
     base_url = request.build_absolute_uri('/')[:-1]
     
     urls = [
@@ -146,10 +159,13 @@ def sitemap_view(request):
     xml_parts = ['<?xml version="1.0" encoding="UTF-8"?>']
     xml_parts.append('<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">')
     
+    modified = _data_modified_date(request)
+    lastmod = [f'    <lastmod>{modified.isoformat()}</lastmod>'] if modified else []
     for url in urls:
         xml_parts.extend([
             '  <url>',
             f'    <loc>{url}</loc>',
+            *lastmod,
             '    <changefreq>monthly</changefreq>',
             '    <priority>0.8</priority>',
             '  </url>'